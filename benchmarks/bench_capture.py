@@ -0,0 +1,48 @@
+"""
+各截图后端的帧率基准：python benchmarks/bench_capture.py [--frames N]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from genshin_mummy.tools.capture import CaptureBackend, create_frame_source
+
+
+def bench_backend(backend: CaptureBackend, frames: int):
+    with create_frame_source(backend) as source:
+        # 预热一帧，排除首帧初始化开销
+        reference = source.grab()
+        start = time.perf_counter()
+        for _ in range(frames):
+            source.grab()
+        elapsed = time.perf_counter() - start
+    return frames / elapsed, reference
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=50)
+    args = parser.parse_args()
+
+    references = {}
+    for backend in CaptureBackend:
+        if backend == CaptureBackend.AUTO:
+            continue
+        try:
+            fps, reference = bench_backend(backend, args.frames)
+        except Exception as error:
+            print(f'{backend.value:>10}: unavailable ({error!r})')
+            continue
+        references[backend] = reference
+        print(f'{backend.value:>10}: {fps:8.2f} fps {reference.shape}')
+
+    if len(references) > 1:
+        frames = list(references.values())
+        # 静止画面下各后端的像素应完全一致
+        identical = all(np.array_equal(frames[0], fr) for fr in frames[1:])
+        print(f'pixel identical: {identical}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+变化检测的微基准：python benchmarks/bench_diff.py [--repeat N]
+
+naive 为改写前逐通道相减再逐行逐列扫描的实现，用于对照。
+"""
+import argparse
+import time
+
+import numpy as np
+
+from genshin_mummy.opt import ChangeDetector, locate_roi_location_from_diffs
+from genshin_mummy.type import Box
+
+RESOLUTIONS = {
+    '1080p': (1080, 1920),
+    '1440p': (1440, 2560),
+    '4K': (2160, 3840),
+}
+
+
+def naive_diff(im1: np.ndarray, im2: np.ndarray):
+    diff = np.sum(im1 - im2, axis=-1)
+    mask = np.full(im1.shape[:2], 255, dtype=np.uint8)
+    mask[diff == 0] = 0
+    return mask
+
+
+def naive_bounds(diffs: np.ndarray, diff_thres_ratio: float):
+    row_num, col_num = diffs.shape
+    col_diffs = np.count_nonzero(diffs, axis=0)
+    row_diffs = np.count_nonzero(diffs, axis=1)
+    cols = [
+        i for i, value in enumerate(col_diffs)
+        if value > diff_thres_ratio * col_num
+    ]
+    rows = [
+        i for i, value in enumerate(row_diffs)
+        if value > diff_thres_ratio * row_num
+    ]
+    if not cols or not rows:
+        return None
+    return Box(
+        left=cols[0],
+        top=rows[0],
+        width=cols[-1] + 1 - cols[0],
+        height=rows[-1] + 1 - rows[0],
+    )
+
+
+def create_pair(height: int, width: int):
+    rng = np.random.default_rng(0)
+    im1 = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    im2 = im1.copy()
+    roi = Box(
+        left=width // 10,
+        top=height // 6,
+        width=width // 2,
+        height=height * 2 // 3,
+    )
+    im2[roi.top:roi.bottom, roi.left:roi.right] ^= 0x5a
+    return im1, im2, roi
+
+
+def timeit(func, repeat: int):
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--ratio', type=float, default=0.1)
+    args = parser.parse_args()
+
+    for name, (height, width) in RESOLUTIONS.items():
+        im1, im2, roi = create_pair(height, width)
+        full = ChangeDetector()
+        half = ChangeDetector(scale=2)
+        ratio = args.ratio
+
+        def naive():
+            return naive_bounds(naive_diff(im1, im2), ratio)
+
+        def vectorized():
+            return locate_roi_location_from_diffs(full.diff(im1, im2), ratio)
+
+        def downsampled():
+            return half.locate_roi(half.diff(im1, im2), ratio)
+
+        def batch():
+            return full.locate_roi_batch([(im1, im2)] * 4, ratio)
+
+        cases = {
+            'naive': naive,
+            'vectorized': vectorized,
+            'scale=2': downsampled,
+            'batch x4': batch,
+        }
+        for case, func in cases.items():
+            elapsed, result = timeit(func, args.repeat)
+            if isinstance(result, list):
+                elapsed /= len(result)
+                result = result[0]
+            print(f'{name:>6} {case:>10}: {elapsed:8.2f} ms '
+                  f'roi match: {result == roi}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+字形模板与PaddleOCR在数值行上的对比：
+python benchmarks/bench_glyph_ocr.py SESSION_FD [--train N] [--region l,t,w,h]
+
+SESSION_FD 为 --record 录制的会话目录，默认取出现次数最多的竖长区域截图作为描述区。
+先用PaddleOCR完整检测学到文本行位置，再把等级、星级、主词条数值与副词条的
+数值行裁剪出来；以PaddleOCR的识别结果为准，前N张截图用于学习字形，
+其余截图上统计字形模板的准确率、拒识率与单行耗时。
+"""
+import argparse
+import time
+from collections import Counter
+
+import numpy as np
+
+from genshin_mummy.artifact_helper.line_slots import (
+    ROLE_KINDS,
+    LineSlotLayout,
+)
+from genshin_mummy.artifact_helper import unlock_shit_artifact
+from genshin_mummy.ocr.backend import FieldKind, PaddleBackend
+from genshin_mummy.ocr.engine import create_warm_ocr
+from genshin_mummy.ocr.glyph import PLUS_CHAR, GlyphRecognizer
+from genshin_mummy.tools.session import SessionReader
+
+
+def load_panels(session_fd: str, region=None):
+    reader = SessionReader(session_fd)
+    if region is None:
+        counts = Counter(
+            tuple(event['region']) for event in reader.frame_events
+            if event['region'] and event['region'][3] > event['region'][2])
+        if not counts:
+            return []
+        region = counts.most_common(1)[0][0]
+    return [
+        np.array(reader.load_frame(event)) for event in reader.frame_events
+        if event['region'] and tuple(event['region']) == tuple(region)
+    ]
+
+
+def numeric_suffix(text: str):
+    idx = text.rfind(PLUS_CHAR)
+    return text[idx:] if idx >= 0 else text
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('session_fd')
+    parser.add_argument('--train', type=int, default=10)
+    parser.add_argument('--region', default=None)
+    args = parser.parse_args()
+
+    region = None
+    if args.region:
+        region = [int(value) for value in args.region.split(',')]
+    panels = load_panels(args.session_fd, region)
+    print(f'{len(panels)} description panels')
+
+    backend = PaddleBackend(create_warm_ocr())
+    layout = LineSlotLayout()
+    for panel in panels:
+        if layout.ready:
+            break
+        try:
+            unlock_shit_artifact.recognize_artifact_informations(
+                backend, panel, layout)
+        except Exception:
+            continue
+    if not layout.ready:
+        print('failed to learn line slots')
+        return
+
+    # (截图序号, 字段类型, 裁剪图, PaddleOCR结果)
+    samples = []
+    paddle_seconds = 0.0
+    for panel_idx, panel in enumerate(panels):
+        boxes = layout.slot_boxes(panel.shape)
+        if boxes is None:
+            continue
+        crops = []
+        kinds = []
+        for role, box in boxes:
+            if ROLE_KINDS[role] == FieldKind.TEXT:
+                continue
+            crops.append(panel[box.top:box.bottom, box.left:box.right])
+            kinds.append(ROLE_KINDS[role])
+        start = time.perf_counter()
+        results = backend.recognize(crops)
+        paddle_seconds += time.perf_counter() - start
+        for crop, kind, (text, _) in zip(crops, kinds, results):
+            samples.append((panel_idx, kind, crop, text.strip()))
+
+    recognizer = GlyphRecognizer()
+    for panel_idx, kind, crop, text in samples:
+        if panel_idx >= args.train:
+            break
+        if kind == FieldKind.NUMERIC:
+            recognizer.learn(crop, text)
+        else:
+            recognizer.learn_suffix(crop, text)
+    print(f'learned glyphs: {recognizer.known_chars} '
+          f'(ready={recognizer.ready})')
+
+    tests = [sample for sample in samples if sample[0] >= args.train]
+    correct = 0
+    rejected = 0
+    start = time.perf_counter()
+    outputs = []
+    for _, kind, crop, _ in tests:
+        if kind == FieldKind.NUMERIC:
+            outputs.append(recognizer.recognize(crop))
+        else:
+            outputs.append(recognizer.recognize_suffix(crop))
+    glyph_seconds = time.perf_counter() - start
+    for (_, kind, _, text), output in zip(tests, outputs):
+        if output is None:
+            rejected += 1
+            continue
+        expected = text if kind == FieldKind.NUMERIC else numeric_suffix(text)
+        correct += output[0] == expected
+
+    total = max(len(tests), 1)
+    accepted = max(len(tests) - rejected, 1)
+    paddle_us = paddle_seconds / max(len(samples), 1) * 1e6
+    glyph_us = glyph_seconds / total * 1e6
+    print(f'lines: {len(samples)} ({len(tests)} evaluated)')
+    print(f'paddle: {paddle_us:10.1f} us/line (batched per panel)')
+    print(f'glyph : {glyph_us:10.1f} us/line')
+    print(f'accuracy on accepted {correct / accepted:.2%}, '
+          f'rejected {rejected / total:.2%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+基于模拟页面的端到端遍历基准：python benchmarks/bench_pipeline.py [--num N]
+
+wall 为实际耗时，反映截图与图像处理的开销；
+virtual 为虚拟时钟耗时，反映等待渲染、鼠标移动等在真实游戏里会花掉的时间。
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from genshin_mummy.artifact_helper.page_manager import ArtifactPage
+from genshin_mummy.artifact_helper.simulator import (
+    SyntheticArtifactPage,
+    random_artifacts,
+)
+from genshin_mummy.tools.logger import create_logger
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--num', type=int, default=200)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--render-latency', type=float, default=0.1)
+    parser.add_argument(
+        '--fixed-waits',
+        action='store_true',
+        help='使用固定的rendering_time等待，而不是等待画面稳定',
+    )
+    parser.add_argument(
+        '--profile',
+        default=None,
+        help='标定档案路径，档案存在且校验通过时跳过标定',
+    )
+    args = parser.parse_args()
+
+    sim = SyntheticArtifactPage(
+        random_artifacts(args.num),
+        screen_size=(args.width, args.height),
+        render_latency=args.render_latency,
+    )
+    logger = create_logger(
+        'bench_pipeline',
+        Path(tempfile.mkdtemp()),
+        overlay=False,
+    )
+
+    start = time.perf_counter()
+    page = ArtifactPage(
+        logger=logger,
+        frame_source=sim,
+        controller=sim,
+        clock=sim.clock,
+        adaptive_waiting=not args.fixed_waits,
+        profile_fp=args.profile and Path(args.profile),
+    )
+    calibration_wall = time.perf_counter() - start
+    calibration_virtual = sim.clock.time()
+
+    start = time.perf_counter()
+    count = 0
+    for _ in page.iter_artifacts():
+        count += 1
+    wall = time.perf_counter() - start
+    virtual = sim.clock.time() - calibration_virtual
+
+    print(f'calibration: wall {calibration_wall:.2f}s, '
+          f'virtual {calibration_virtual:.2f}s')
+    print(f'iteration: {count} artifacts, wall {wall:.2f}s '
+          f'({count / wall:.1f}/s), virtual {virtual:.2f}s '
+          f'({count / virtual:.2f}/s)')
+    print(f'clicks {sim.click_count}, scrolls {sim.scroll_count}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+先截图后识别的批处理模式。
+
+第一遍只遍历列表并把每个圣遗物的描述区截图写入内存映射文件，
+随后在进程池中并行识别全部截图，最后只回到需要调整锁定状态的格子。
+"""
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import attrs
+
+from genshin_mummy.artifact_helper.grid import GridCell
+from genshin_mummy.artifact_helper.ocr_cache import panel_hash
+from genshin_mummy.artifact_helper.page_manager import ArtifactPage
+from genshin_mummy.tools.frame_store import FrameStore
+
+FRAME_STORE_FILENAME = 'desc_frames.bin'
+
+
+@attrs.define
+class ScannedArtifact:
+    # 截图在FrameStore中的序号
+    index: int = attrs.field()
+    cell: GridCell = attrs.field()
+    panel_key: str = attrs.field()
+
+
+def scan_artifacts(
+    artifact_page: ArtifactPage,
+    store_fp: Path,
+    max_num: Optional[int] = None,
+) -> Tuple[Optional[FrameStore], List[ScannedArtifact]]:
+    """遍历列表，只截取描述区，不做任何识别。"""
+    store = None
+    scanned = []
+    for cell in artifact_page.iter_artifacts(max_num):
+        image = artifact_page.frame_source.grab_region(
+            artifact_page.desc_loc).image
+        if store is None:
+            store = FrameStore(store_fp, frame_shape=image.shape)
+        index = store.append(image)
+        scanned.append(
+            ScannedArtifact(
+                index=index,
+                cell=cell,
+                panel_key=panel_hash(image),
+            ))
+    if store:
+        store.flush()
+    return store, scanned
@@ -0,0 +1,116 @@
+"""
+圣遗物页面的标定档案。
+
+标定结果按 ``屏幕分辨率@布局指纹`` 保存在同一个 JSON 文件中，
+布局指纹由影响标定的粗略区域比例等参数计算，参数变化后旧档案自动失效。
+"""
+import hashlib
+import json
+import os
+from os import PathLike
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import attrs
+
+from genshin_mummy.type import Box
+
+PROFILE_VERSION = 1
+PROFILE_FILENAME = 'calibration.json'
+
+
+def box_to_list(box: Box):
+    return [int(box.left), int(box.top), int(box.width), int(box.height)]
+
+
+def list_to_box(values: List[int]):
+    left, top, width, height = values
+    return Box(left=left, top=top, width=width, height=height)
+
+
+def layout_fingerprint(**layout) -> str:
+    payload = json.dumps(
+        dict(layout, version=PROFILE_VERSION),
+        sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def profile_key(screen_size: Tuple[int, int], fingerprint: str) -> str:
+    width, height = screen_size
+    return f'{width}x{height}@{fingerprint}'
+
+
+@attrs.define
+class CalibrationProfile:
+    desc_loc: Box = attrs.field()
+    list_loc: Box = attrs.field()
+    first_artifact_loc: Box = attrs.field()
+    col_points: List[int] = attrs.field()
+    x_offset: Optional[int] = attrs.field()
+    y_offset: Optional[int] = attrs.field()
+    px_per_click: Optional[float] = attrs.field(default=None)
+
+    def to_dict(self):
+        return {
+            'desc_loc': box_to_list(self.desc_loc),
+            'list_loc': box_to_list(self.list_loc),
+            'first_artifact_loc': box_to_list(self.first_artifact_loc),
+            'col_points': [int(x) for x in self.col_points],
+            'x_offset': None if self.x_offset is None else int(self.x_offset),
+            'y_offset': None if self.y_offset is None else int(self.y_offset),
+            'px_per_click': self.px_per_click,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(
+            desc_loc=list_to_box(data['desc_loc']),
+            list_loc=list_to_box(data['list_loc']),
+            first_artifact_loc=list_to_box(data['first_artifact_loc']),
+            col_points=list(data['col_points']),
+            x_offset=data['x_offset'],
+            y_offset=data['y_offset'],
+            px_per_click=data.get('px_per_click'),
+        )
+
+
+def read_profiles(profile_fp: PathLike) -> dict:
+    profile_fp = Path(profile_fp)
+    if not profile_fp.exists():
+        return {}
+    try:
+        with open(profile_fp, 'r', encoding='utf-8') as fin:
+            profiles = json.load(fin)
+    except (OSError, ValueError):
+        # 档案损坏时当作没有档案，重新标定后会覆盖
+        return {}
+    if not isinstance(profiles, dict):
+        return {}
+    return profiles
+
+
+def load_profile(profile_fp: PathLike,
+                 key: str) -> Optional[CalibrationProfile]:
+    data = read_profiles(profile_fp).get(key)
+    if data is None:
+        return None
+    try:
+        return CalibrationProfile.from_dict(data)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def save_profile(
+    profile_fp: PathLike,
+    key: str,
+    profile: CalibrationProfile,
+):
+    profile_fp = Path(profile_fp)
+    profiles = read_profiles(profile_fp)
+    profiles[key] = profile.to_dict()
+    profile_fp.parent.mkdir(parents=True, exist_ok=True)
+    tmp_fp = profile_fp.with_suffix('.tmp')
+    with open(tmp_fp, 'w', encoding='utf-8') as fout:
+        json.dump(profiles, fout, ensure_ascii=False, indent=2)
+    os.replace(tmp_fp, profile_fp)
@@ -171,3 +171,15 @@ class BadConclusion(RowValueError):
                    f"{colored(reason, 'red')}\n"
                    f"{colored(resolution, 'green')}\n")
         return message
+
+
+class SelectedArtifactNotFound(Exception):
+
+    def __init__(self, frames: int = 0):
+        self.frames = frames
+
+    def __str__(self):
+        message = (f"\n\n{colored('(｡・`ω´･)找不到当前选中的圣遗物', 'red')}\n"
+                   f"连续 {colored(str(self.frames), 'blue')} 帧都没有检测到闪烁的选中边框，"
+                   '请确认圣遗物页面没有被遮挡')
+        return message
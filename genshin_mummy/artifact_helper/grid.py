@@ -0,0 +1,52 @@
+from typing import List
+
+import attrs
+
+from genshin_mummy.type import Box, Point
+
+
+@attrs.frozen
+class GridCell:
+    """圣遗物在整个列表中的行列号，列表滚动后依然有效。"""
+    row_idx: int = attrs.field()
+    col_idx: int = attrs.field()
+
+
+@attrs.define
+class ArtifactGrid:
+    """标定得到的圣遗物网格模型，直接推算每个格子在屏幕上的中心点。
+
+    row_idx 是当前行在整个列表中的行号，row_y 是它在屏幕上的中心纵坐标。
+    列表滚动后只需用滚动位移修正 row_y，不必重新视觉定位。
+    """
+    col_points: List[int] = attrs.field()
+    y_offset: int = attrs.field()
+    cell_height: int = attrs.field()
+    list_loc: Box = attrs.field()
+    row_y: int = attrs.field()
+    row_idx: int = attrs.field(default=0)
+
+    def cell_center(self, col_idx: int) -> Point:
+        return Point(x=self.col_points[col_idx], y=self.row_y)
+
+    def cell_center_at(self, cell: GridCell) -> Point:
+        """按当前行的位置推算任意一行格子的中心点，可能已不在可视区内。"""
+        row_y = self.row_y + (cell.row_idx - self.row_idx) * self.y_offset
+        return Point(x=self.col_points[cell.col_idx], y=row_y)
+
+    @property
+    def next_row_y(self):
+        return self.row_y + self.y_offset
+
+    def row_fits(self, row_y: int):
+        half_height = self.cell_height // 2
+        return (row_y - half_height > self.list_loc.top
+                and row_y + half_height < self.list_loc.bottom)
+
+    def advance(self, row_y: int):
+        self.row_idx += 1
+        self.row_y = row_y
+
+    def shift(self, displacement: int):
+        # 列表内容向上移动displacement像素
+        self.row_y -= displacement
@@ -0,0 +1,240 @@
+"""
+圣遗物描述区的文本行槽位。
+
+描述区的版式在圣遗物之间基本固定：名称、类型、主词条、主词条数值、星级、
+等级与至多4条副词条。前几次完整检测后记录各行的位置，之后只把这些行裁剪出来
+一次性交给识别模型（不做文本检测）；识别结果校验失败时再回退到完整检测。
+"""
+import re
+from enum import Enum, unique
+from typing import Dict, List, Optional
+
+import attrs
+import numpy as np
+
+from genshin_mummy.artifact_helper.type import (
+    DOT_CHAR,
+    PERCENT_CHAR,
+    PLUS_CHAR,
+    STAR_CHAR,
+    ArtifactType,
+)
+from genshin_mummy.ocr.backend import FieldKind, OcrBackend
+from genshin_mummy.ocr.type import TextChunk
+from genshin_mummy.type import Box
+
+MAX_SUBENTRIES = 4
+# 副词条要完整匹配，截断的数值会导致校验失败
+SUBENTRY_FULL_PATTERN = re.compile(
+    f'{DOT_CHAR}.+\\{PLUS_CHAR}\\d+(\\.\\d+)?{PERCENT_CHAR}?')
+LEVEL_PATTERN = re.compile(f'\\{PLUS_CHAR}\\d+')
+ARTIFACT_TYPE_TEXTS = {artifact_type.value for artifact_type in ArtifactType}
+
+
+@unique
+class LineRole(Enum):
+    NAME = 'name'
+    TYPE = 'type'
+    ENTRY = 'entry'
+    ENTRY_VALUE = 'entry_value'
+    STARS = 'stars'
+    LEVEL = 'level'
+    SUBENTRY = 'subentry'
+
+
+# 右侧没有其他内容的行，裁剪到描述区右边缘
+FULL_WIDTH_ROLES = (LineRole.NAME, LineRole.SUBENTRY)
+# 只含数字与符号的行可以用字形模板识别
+ROLE_KINDS = {
+    LineRole.NAME: FieldKind.TEXT,
+    LineRole.TYPE: FieldKind.TEXT,
+    LineRole.ENTRY: FieldKind.TEXT,
+    LineRole.ENTRY_VALUE: FieldKind.NUMERIC,
+    LineRole.STARS: FieldKind.NUMERIC,
+    LineRole.LEVEL: FieldKind.NUMERIC,
+    LineRole.SUBENTRY: FieldKind.SUFFIXED,
+}
+# 长度随圣遗物变化的行，右侧是圣遗物图片或锁图标，只留出余量，
+# 且宽度至少为行高的若干倍，避免按较短的样本截断
+MIN_WIDTH_IN_HEIGHTS = {
+    LineRole.ENTRY: 4,
+    LineRole.ENTRY_VALUE: 4,
+    LineRole.LEVEL: 2,
+}
+
+
+@attrs.define
+class ArtifactChunks:
+    """描述区中各行对应的文本块。"""
+    name: TextChunk = attrs.field()
+    type: TextChunk = attrs.field()
+    entry: TextChunk = attrs.field()
+    entry_value: TextChunk = attrs.field()
+    stars: TextChunk = attrs.field()
+    level: TextChunk = attrs.field()
+    subentries: List[TextChunk] = attrs.field(factory=list)
+
+
+def union_boxes(boxes: List[Box]):
+    # PaddleOCR 给出的坐标是浮点数，裁剪时需要整数
+    left = int(min(box.left for box in boxes))
+    top = int(min(box.top for box in boxes))
+    right = int(max(box.right for box in boxes))
+    bottom = int(max(box.bottom for box in boxes))
+    return Box(left=left, top=top, width=right - left, height=bottom - top)
+
+
+@attrs.define
+class LineSlotLayout:
+    # 学习几次完整检测的结果后开始只做识别
+    learn_count: int = attrs.field(default=3)
+    # 连续校验失败这么多次说明版式变了，重新学习
+    relearn_after: int = attrs.field(default=5)
+    width_slack: float = attrs.field(default=1.6)
+    hits: int = attrs.field(init=False, default=0)
+    misses: int = attrs.field(init=False, default=0)
+    _samples: List[Dict[LineRole, Box]] = attrs.field(init=False, factory=list)
+    _pitches: List[int] = attrs.field(init=False, factory=list)
+    _slots: Optional[Dict[LineRole, Box]] = attrs.field(init=False,
+                                                        default=None)
+    _pitch: int = attrs.field(init=False, default=0)
+    _failures: int = attrs.field(init=False, default=0)
+
+    @property
+    def ready(self):
+        return self._slots is not None
+
+    def reset(self):
+        self._samples.clear()
+        self._pitches.clear()
+        self._slots = None
+        self._failures = 0
+
+    def learn(self, chunks: ArtifactChunks):
+        """记录一次完整检测的结果，副词条少于2条时无法推算行距，跳过。"""
+        if self.ready or len(chunks.subentries) < 2:
+            return
+        self._samples.append({
+            LineRole.NAME:
+            chunks.name,
+            LineRole.TYPE:
+            chunks.type,
+            LineRole.ENTRY:
+            chunks.entry,
+            LineRole.ENTRY_VALUE:
+            chunks.entry_value,
+            LineRole.STARS:
+            chunks.stars,
+            LineRole.LEVEL:
+            chunks.level,
+            LineRole.SUBENTRY:
+            union_boxes(chunks.subentries[:1]),
+        })
+        self._pitches.append(
+            int(chunks.subentries[1].top - chunks.subentries[0].top))
+        if len(self._samples) >= self.learn_count:
+            self._slots = {
+                role: union_boxes([sample[role] for sample in self._samples])
+                for role in LineRole
+            }
+            self._pitch = int(np.median(self._pitches))
+
+    def slot_width(self, role: LineRole, slot: Box, image_width: int):
+        if role in FULL_WIDTH_ROLES:
+            return image_width - slot.left
+        if role in MIN_WIDTH_IN_HEIGHTS:
+            return max(int(slot.width * self.width_slack),
+                       MIN_WIDTH_IN_HEIGHTS[role] * slot.height)
+        return slot.width
+
+    def slot_boxes(self, image_shape):
+        """按学到的位置给出各行的裁剪框，副词条按行距依次下移。"""
+        image_height, image_width = image_shape[:2]
+        boxes = []
+        for role in LineRole:
+            slot = self._slots[role]
+            rows = MAX_SUBENTRIES if role == LineRole.SUBENTRY else 1
+            for row in range(rows):
+                pad = max(slot.height // 4, 2)
+                left = max(slot.left - pad, 0)
+                top = max(slot.top + row * self._pitch - pad, 0)
+                right = min(
+                    slot.left + self.slot_width(role, slot, image_width) + pad,
+                    image_width)
+                bottom = min(slot.top + row * self._pitch + slot.height + pad,
+                             image_height)
+                if right <= left or bottom <= top:
+                    return None
+                boxes.append((role,
+                              Box(left=left,
+                                  top=top,
+                                  width=right - left,
+                                  height=bottom - top)))
+        return boxes
+
+    def read(
+        self,
+        backend: OcrBackend,
+        image: np.ndarray,
+    ) -> Optional[ArtifactChunks]:
+        """只做识别，结果未通过校验时返回None。"""
+        boxes = self.slot_boxes(image.shape)
+        if boxes is None:
+            return self.fail()
+        crops = [
+            image[box.top:box.bottom, box.left:box.right] for _, box in boxes
+        ]
+        results = backend.recognize(
+            crops,
+            [ROLE_KINDS[role] for role, _ in boxes],
+        )
+        if not results or len(results) != len(boxes):
+            return self.fail()
+        chunks = {}
+        subentries = []
+        stopped = False
+        for (role, box), (text, _) in zip(boxes, results):
+            text = text.strip()
+            chunk = TextChunk(box.left, box.top, box.width, box.height, text)
+            if role != LineRole.SUBENTRY:
+                chunks[role] = chunk
+                continue
+            # 副词条不足4条时，后面是套装效果等其他文本
+            if stopped or not text.startswith(DOT_CHAR):
+                stopped = True
+                continue
+            subentries.append(chunk)
+        artifact_chunks = ArtifactChunks(
+            name=chunks[LineRole.NAME],
+            type=chunks[LineRole.TYPE],
+            entry=chunks[LineRole.ENTRY],
+            entry_value=chunks[LineRole.ENTRY_VALUE],
+            stars=chunks[LineRole.STARS],
+            level=chunks[LineRole.LEVEL],
+            subentries=subentries,
+        )
+        if not self.validate(artifact_chunks):
+            return self.fail()
+        return artifact_chunks
+
+    def validate(self, chunks: ArtifactChunks):
+        return (chunks.name.text != ''
+                and chunks.type.text in ARTIFACT_TYPE_TEXTS
+                and chunks.entry_value.text != ''
+                and chunks.stars.text.startswith(STAR_CHAR)
+                and LEVEL_PATTERN.fullmatch(chunks.level.text) is not None
+                and len(chunks.subentries) > 0 and all(
+                    SUBENTRY_FULL_PATTERN.fullmatch(chunk.text)
+                    for chunk in chunks.subentries))
+
+    def accept(self):
+        """识别结果被采用后调用。"""
+        self._failures = 0
+        self.hits += 1
+
+    def fail(self):
+        self.misses += 1
+        self._failures += 1
+        if self._failures >= self.relearn_after:
+            self.reset()
+        return None
@@ -0,0 +1,166 @@
+"""
+圣遗物描述区的OCR结果缓存。
+
+以描述区截图的感知哈希为键，缓存解析后的圣遗物与等级文本框，
+点击未生效、滚动恢复后重复访问或重新运行时，相同的描述区直接跳过OCR。
+缓存按LRU淘汰，并保存为JSON文件跨运行复用。
+"""
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from os import PathLike
+from pathlib import Path
+from typing import Optional, Tuple
+
+import attrs
+import cv2
+import numpy as np
+
+from genshin_mummy.artifact_helper.calibration import box_to_list, list_to_box
+from genshin_mummy.artifact_helper.type import (
+    Artifact,
+    ArtifactType,
+    EntryType,
+)
+from genshin_mummy.type import Box
+
+CACHE_VERSION = 1
+OCR_CACHE_FILENAME = 'ocr_cache.json'
+# 哈希前统一缩放到的尺寸（宽，高），需要能分辨出单个数字的差异
+HASH_SIZE = (128, 256)
+# 相邻像素差超过该值才记为边缘，避免背景的细微噪声影响哈希
+HASH_MARGIN = 8
+
+
+def panel_hash(image: np.ndarray) -> str:
+    """对描述区截图计算差值哈希，截图尺寸也计入键中。"""
+    height, width = image.shape[:2]
+    gray = image
+    if gray.ndim == 3:
+        gray = cv2.cvtColor(gray, cv2.COLOR_RGB2GRAY)
+    hash_width, hash_height = HASH_SIZE
+    small = cv2.resize(
+        gray,
+        (hash_width + 1, hash_height),
+        interpolation=cv2.INTER_AREA,
+    ).astype(np.int16)
+    bits = (small[:, 1:] - small[:, :-1]) > HASH_MARGIN
+    digest = hashlib.blake2b(np.packbits(bits).tobytes(),
+                             digest_size=16).hexdigest()
+    return f'{width}x{height}:{digest}'
+
+
+def entry_to_record(entry_type: Optional[EntryType], value: str):
+    return [None if entry_type is None else entry_type.value, value]
+
+
+def record_to_entry(record):
+    entry_type, value = record
+    return (None if entry_type is None else EntryType(entry_type)), value
+
+
+def artifact_to_record(artifact: Artifact, level_box: Box):
+    return {
+        'name':
+        artifact.name,
+        'type':
+        artifact.type.value,
+        'entry': [entry_to_record(*item) for item in artifact.entry.items()],
+        'stars':
+        artifact.stars,
+        'level':
+        artifact.level,
+        'subentries':
+        [entry_to_record(*item) for item in artifact.subentries.items()],
+        'level_box':
+        box_to_list(level_box),
+    }
+
+
+def record_to_artifact(record: dict) -> Tuple[Artifact, Box]:
+    artifact = Artifact(
+        name=record['name'],
+        type=ArtifactType(record['type']),
+        entry=dict(record_to_entry(item) for item in record['entry']),
+        stars=record['stars'],
+        level=record['level'],
+        subentries=dict(
+            record_to_entry(item) for item in record['subentries']),
+    )
+    return artifact, list_to_box(record['level_box'])
+
+
+@attrs.define
+class OcrResultCache:
+    capacity: int = attrs.field(default=4096)
+    cache_fp: Optional[Path] = attrs.field(default=None)
+    hits: int = attrs.field(init=False, default=0)
+    misses: int = attrs.field(init=False, default=0)
+    _records: OrderedDict = attrs.field(init=False, factory=OrderedDict)
+    _dirty: bool = attrs.field(init=False, default=False)
+
+    def __attrs_post_init__(self):
+        if self.cache_fp:
+            self.load(self.cache_fp)
+
+    def __len__(self):
+        return len(self._records)
+
+    def get(self, key: str) -> Optional[Tuple[Artifact, Box]]:
+        record = self._records.get(key)
+        if record is None:
+            self.misses += 1
+            return None
+        try:
+            result = record_to_artifact(record)
+        except (KeyError, TypeError, ValueError):
+            del self._records[key]
+            self.misses += 1
+            return None
+        self._records.move_to_end(key)
+        self.hits += 1
+        # 使用顺序变化也需要保存
+        self._dirty = True
+        return result
+
+    def put(self, key: str, artifact: Artifact, level_box: Box):
+        self._records[key] = artifact_to_record(artifact, level_box)
+        self._records.move_to_end(key)
+        while len(self._records) > self.capacity:
+            self._records.popitem(last=False)
+        self._dirty = True
+
+    def load(self, cache_fp: PathLike):
+        cache_fp = Path(cache_fp)
+        if not cache_fp.exists():
+            return
+        try:
+            with open(cache_fp, 'r', encoding='utf-8') as fin:
+                data = json.load(fin)
+        except (OSError, ValueError):
+            # 缓存损坏时当作没有缓存
+            return
+        if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+            return
+        for key, record in data['records']:
+            self._records[key] = record
+        while len(self._records) > self.capacity:
+            self._records.popitem(last=False)
+
+    def save(self, cache_fp: Optional[PathLike] = None):
+        cache_fp = cache_fp or self.cache_fp
+        if cache_fp is None or not self._dirty:
+            return
+        cache_fp = Path(cache_fp)
+        data = {
+            'version': CACHE_VERSION,
+            # 列表按最近使用顺序保存，加载后LRU顺序不变
+            'records': list(self._records.items()),
+        }
+        cache_fp.parent.mkdir(parents=True, exist_ok=True)
+        tmp_fp = cache_fp.with_suffix('.tmp')
+        with open(tmp_fp, 'w', encoding='utf-8') as fout:
+            json.dump(data, fout, ensure_ascii=False)
+        os.replace(tmp_fp, cache_fp)
+        self._dirty = False
@@ -0,0 +1,68 @@
+"""
+导航与OCR重叠执行的流水线。
+
+主进程截取描述区后立即把截图提交给进程池识别，随即继续点击下一个圣遗物；
+识别结果按提交顺序取回，锁定状态的修正按记录的网格位置回头完成。
+待识别的截图数量有上限，队列满时等待最早的结果，避免截图堆积。
+"""
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Callable, Deque, List, Optional, Tuple
+
+import attrs
+import numpy as np
+
+from genshin_mummy.artifact_helper.grid import GridCell
+from genshin_mummy.artifact_helper.type import Artifact
+from genshin_mummy.tools.capture import RegionFrame
+from genshin_mummy.type import Box
+
+# 输入描述区截图，返回圣遗物与等级文本框，需要可以被pickle
+Recognizer = Callable[[np.ndarray], Tuple[Artifact, Box]]
+
+
+@attrs.define
+class ArtifactJob:
+    index: int = attrs.field()
+    cell: GridCell = attrs.field()
+    desc_frame: RegionFrame = attrs.field()
+    panel_key: str = attrs.field()
+    future: Optional[Future] = attrs.field(default=None)
+
+
+@attrs.define
+class OcrQueue:
+    executor: Executor = attrs.field()
+    recognize: Recognizer = attrs.field()
+    max_pending: int = attrs.field(default=4)
+    _pending: Deque[ArtifactJob] = attrs.field(init=False, factory=deque)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def submit(self, job: ArtifactJob) -> List[ArtifactJob]:
+        """提交识别任务，队列已满时先返回等到的最早任务。"""
+        finished = []
+        while len(self._pending) >= self.max_pending:
+            oldest = self._pending.popleft()
+            oldest.future.exception()
+            finished.append(oldest)
+        job.future = self.executor.submit(self.recognize, job.desc_frame.image)
+        self._pending.append(job)
+        return finished
+
+    def completed(self) -> List[ArtifactJob]:
+        """不阻塞，按提交顺序取出已经完成的任务。"""
+        finished = []
+        while self._pending and self._pending[0].future.done():
+            finished.append(self._pending.popleft())
+        return finished
+
+    def drain(self) -> List[ArtifactJob]:
+        """等待并取出全部任务。"""
+        finished = []
+        while self._pending:
+            oldest = self._pending.popleft()
+            oldest.future.exception()
+            finished.append(oldest)
+        return finished
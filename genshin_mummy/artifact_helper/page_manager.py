@@ -1,32 +1,68 @@
-import time
-from typing import List, Optional, Tuple
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
 
 import attrs
-import cv2
 import numpy as np
-import pyautogui
 
 from genshin_mummy.opt import (
-    diff_two_images,
+    ChangeDetector,
     ensure_mouse_in_safe_location,
     locate_roi_location_from_diffs,
 )
+from genshin_mummy.artifact_helper.calibration import (
+    CalibrationProfile,
+    layout_fingerprint,
+    load_profile,
+    profile_key,
+    save_profile,
+)
+from genshin_mummy.artifact_helper.exception import SelectedArtifactNotFound
+from genshin_mummy.artifact_helper.grid import ArtifactGrid, GridCell
 from genshin_mummy.type import Box, Direction, Point
-from genshin_mummy.tools.logger import ExLogger, ScreenHandler
+from genshin_mummy.tools.blink import BlinkDetector
+from genshin_mummy.tools.capture import FrameSource, create_frame_source
+from genshin_mummy.tools.clock import Clock
+from genshin_mummy.tools.controller import Controller, create_controller
+from genshin_mummy.tools.logger import ExLogger
+from genshin_mummy.tools.scroll_tracker import ScrollTracker
+from genshin_mummy.tools.tile_hash import TileHasher
+from genshin_mummy.tools.waiter import (
+    take_thumbnail,
+    to_thumbnail,
+    wait_until_stable,
+    wait_until_tiles_changed,
+)
 
 
 @attrs.define
 class ArtifactPage:
     logger: ExLogger = attrs.field()
+    frame_source: FrameSource = attrs.field(factory=create_frame_source)
+    controller: Controller = attrs.field(factory=create_controller)
+    clock: Clock = attrs.field(factory=Clock)
 
     mouse_move_time: float = attrs.field(default=0.2)
     rendering_time: float = attrs.field(default=0.5)
+    # 开启后按画面稳定与否等待渲染，rendering_time只作为超时上限
+    adaptive_waiting: bool = attrs.field(default=True)
+    stable_frames: int = attrs.field(default=3)
+    blink_latency_budget: float = attrs.field(default=1.0)
     scroll_steps: int = attrs.field(default=5)
     first_artifact_loc: Box = attrs.field(default=None)
     x_offset: Optional[int] = attrs.field(default=None)
     y_offset: Optional[int] = attrs.field(default=None)
     loc_iou_thres: float = attrs.field(default=0.1)
     diff_thres_ratio: float = attrs.field(default=0.1)
+    # 滚动前后变化的块占所有块的比例低于该值时认为列表已经到底，
+    # 选中圣遗物的闪烁边框只会让少数块变化
+    tile_change_thres: float = attrs.field(default=0.1)
+    # 标定档案路径，为None时每次都完整标定
+    profile_fp: Optional[Path] = attrs.field(default=None)
+    profile_iou_thres: float = attrs.field(default=0.5)
+    # 不读取档案，标定后只覆盖当前分辨率与布局对应的记录
+    recalibrate: bool = attrs.field(default=False)
+    # 列表滚动前调用，流水线借此处理仍在可视区内的圣遗物
+    before_scroll: Optional[Callable[[], None]] = attrs.field(default=None)
 
     screen_width: int = attrs.field(init=False)
     screen_height: int = attrs.field(init=False)
@@ -34,8 +70,6 @@ class ArtifactPage:
 
     desc_loc: Box = attrs.field(init=False)
     list_loc: Box = attrs.field(init=False)
-    list_loc_mask: np.ndarray = attrs.field(init=False)
-    desc_loc_mask: np.ndarray = attrs.field(init=False)
 
     rough_list_loc_ratio: Tuple[float, float, float,
                                 float] = attrs.field(default=(0.1, 0.17, 0.6,
@@ -47,11 +81,24 @@ class ArtifactPage:
     rough_desc_loc: Box = attrs.field(init=False)
 
     col_points: List[int] = attrs.field(init=False, factory=list)
+    blink_detector: BlinkDetector = attrs.field(init=False)
+    grid: Optional[ArtifactGrid] = attrs.field(init=False, default=None)
+    selected_cell: Optional[GridCell] = attrs.field(init=False, default=None)
+    scroll_tracker: ScrollTracker = attrs.field(init=False,
+                                                factory=ScrollTracker)
+    change_detector: ChangeDetector = attrs.field(init=False,
+                                                  factory=ChangeDetector)
+    tile_hasher: TileHasher = attrs.field(init=False, factory=TileHasher)
 
     def __attrs_post_init__(self):
         # 需处于切换圣遗物页签后的初始状态
-        self.screen_width, self.screen_height = pyautogui.size()
+        self.screen_width, self.screen_height = self.controller.size()
         self.screen_area = self.screen_height * self.screen_width
+        self.blink_detector = BlinkDetector(
+            frame_source=self.frame_source,
+            clock=self.clock,
+            latency_budget=self.blink_latency_budget,
+        )
         self.rough_desc_loc = Box(
             left=self.screen_width * self.rough_desc_loc_ratio[0],
             top=self.screen_height * self.rough_desc_loc_ratio[1],
@@ -65,17 +112,85 @@ class ArtifactPage:
             height=self.screen_height * self.rough_list_loc_ratio[3],
         )
 
+        if (self.profile_fp and not self.recalibrate
+                and self.apply_calibration_profile()):
+            self.logger.add_screen_handler()
+            return
+        self.calibrate()
+        if self.profile_fp:
+            self.save_calibration_profile()
+
+    def calibrate(self):
         self.locate_artifact_description()
         self.locate_artifact_list()
 
         # 标定前不要添加屏幕日志，不然影响CV的差分算法
-        self.logger.addHandler(ScreenHandler())
+        self.logger.add_screen_handler()
 
         # TODO: 双向校验圣遗物列表区域和描述区域的坐标位置准确性
         self.first_artifact_loc = self.locate_selected_artifact()
         self.logger.show_bbox(self.first_artifact_loc, '首行首个圣遗物')
         self.locate_artifact_rows_and_columns()
 
+    @property
+    def profile_key(self):
+        fingerprint = layout_fingerprint(
+            rough_list_loc_ratio=list(self.rough_list_loc_ratio),
+            rough_desc_loc_ratio=list(self.rough_desc_loc_ratio),
+            scroll_steps=self.scroll_steps,
+        )
+        return profile_key((self.screen_width, self.screen_height),
+                           fingerprint)
+
+    def apply_calibration_profile(self):
+        profile = load_profile(self.profile_fp, self.profile_key)
+        if profile is None:
+            self.logger.info('没有当前分辨率的标定档案，开始标定...')
+            return False
+        if not self.verify_calibration_profile(profile):
+            self.logger.warning('标定档案与当前画面不一致，重新标定...')
+            return False
+        self.desc_loc = profile.desc_loc
+        self.list_loc = profile.list_loc
+        self.first_artifact_loc = profile.first_artifact_loc
+        self.col_points = list(profile.col_points)
+        self.x_offset = profile.x_offset
+        self.y_offset = profile.y_offset
+        if profile.px_per_click:
+            self.scroll_tracker.px_per_click = profile.px_per_click
+            self.scroll_tracker.samples = [profile.px_per_click]
+        self.logger.info('已加载标定档案，跳过标定。')
+        return True
+
+    def verify_calibration_profile(self, profile: CalibrationProfile):
+        # 唯一的廉价校验：首个圣遗物的闪烁边框应出现在档案记录的位置
+        loc = profile.first_artifact_loc
+        region = Box(
+            left=max(loc.left - loc.width // 2, 0),
+            top=max(loc.top - loc.height // 2, 0),
+            width=loc.width * 2,
+            height=loc.height * 2,
+        )
+        result = self.blink_detector.detect(region)
+        if result.box is None:
+            return False
+        return result.box.overlap(loc) > self.profile_iou_thres
+
+    def save_calibration_profile(self):
+        profile = CalibrationProfile(
+            desc_loc=self.desc_loc,
+            list_loc=self.list_loc,
+            first_artifact_loc=self.first_artifact_loc,
+            col_points=self.col_points,
+            x_offset=self.x_offset,
+            y_offset=self.y_offset,
+            px_per_click=self.scroll_tracker.px_per_click,
+        )
+        try:
+            save_profile(self.profile_fp, self.profile_key, profile)
+        except OSError as error:
+            self.logger.warning(f'保存标定档案失败：{error}')
+
     def is_same_artifact(self, loc_a: Box, loc_b: Box):
         iou = loc_a.overlap(loc_b)
         return iou > self.loc_iou_thres
@@ -118,6 +233,7 @@ class ArtifactPage:
         direction: Direction,
         clicks: int = 1,
         times: int = 1,
+        region: Optional[Box] = None,
     ):
         if direction == Direction.UP:
             clicks = abs(clicks)
@@ -125,21 +241,26 @@ class ArtifactPage:
             clicks = -abs(clicks)
         else:
             raise NotImplementedError()
+        reference = None
+        if self.adaptive_waiting:
+            reference = take_thumbnail(self.frame_source, region)
         for _ in range(self.scroll_steps * times):
-            pyautogui.scroll(clicks)
-        self.wait_rendering()
+            self.controller.scroll(clicks)
+        self.wait_rendering(region=region, reference=reference)
 
     def move_to_artifact_list(self):
         if getattr(self, 'list_loc', None):
             ensure_mouse_in_safe_location(
                 loc=self.list_loc,
                 duration=self.mouse_move_time,
+                controller=self.controller,
             )
         else:
             ensure_mouse_in_safe_location(
                 loc=self.rough_list_loc,
                 duration=self.mouse_move_time,
                 use_box_center=True,
+                controller=self.controller,
             )
 
     def _scroll_artifact_list(
@@ -149,17 +270,87 @@ class ArtifactPage:
         only_scrolling: bool = True,
     ):
         self.move_to_artifact_list()
+        list_loc = getattr(self, 'list_loc', None)
+        region = list_loc or self.rough_list_loc
         if only_scrolling:
-            self.scroll(direction=direction, clicks=1, times=times)
-            self.wait_rendering()
+            self.scroll(
+                direction=direction,
+                clicks=1,
+                times=times,
+                region=region,
+            )
             return False
-        prev_screen = pyautogui.screenshot()
-        self.scroll(direction=direction, clicks=1, times=times)
-        self.wait_rendering()
-        next_screen = pyautogui.screenshot()
-        diff = diff_two_images(prev_screen, next_screen)
-        diff_num = np.count_nonzero(diff)
-        return diff_num / self.screen_area < self.diff_thres_ratio
+        if list_loc:
+            prev_screen = self.frame_source.grab_region(list_loc).image
+        else:
+            prev_screen = self.frame_source.grab()
+        self.scroll(direction=direction, clicks=1, times=times, region=region)
+        if list_loc:
+            next_screen = self.frame_source.grab_region(list_loc).image
+            displacement = self.track_scroll(
+                prev_screen,
+                next_screen,
+                clicks=self.signed_clicks(direction,
+                                          self.scroll_steps * times),
+            )
+            if displacement is not None:
+                # 位移为零说明列表已经到底或到顶
+                return displacement == 0
+        else:
+            next_screen = self.frame_source.grab()
+        # 无法测量位移时只用分块哈希判断是否到底，不需要完整的差分图
+        changed_ratio = self.tile_hasher.changed_ratio(
+            self.tile_hasher.hash(prev_screen),
+            next_screen,
+        )
+        return changed_ratio < self.tile_change_thres
+
+    def signed_clicks(self, direction: Direction, clicks: int):
+        # 与内容位移同号：向下滚动时内容上移，记为正
+        if direction == Direction.DOWN:
+            return abs(clicks)
+        elif direction == Direction.UP:
+            return -abs(clicks)
+        else:
+            raise NotImplementedError()
+
+    def track_scroll(
+        self,
+        prev_image: np.ndarray,
+        next_image: np.ndarray,
+        clicks: int,
+    ):
+        displacement = self.scroll_tracker.measure(
+            prev_image,
+            next_image,
+            clicks=clicks,
+        )
+        if displacement is None:
+            self.logger.warning('无法测量列表滚动位移。')
+            return None
+        self.scroll_tracker.learn(displacement, clicks)
+        if self.grid:
+            self.grid.shift(displacement)
+        return displacement
+
+    def scroll_rows(self, rows: int):
+        """按学到的每格像素数精确滚动rows行，正数向下，返回实测位移。"""
+        clicks = self.scroll_tracker.clicks_for(rows * self.y_offset)
+        if clicks is None:
+            return None
+        direction = Direction.DOWN if rows > 0 else Direction.UP
+        self.move_to_artifact_list()
+        prev_screen = self.frame_source.grab_region(self.list_loc).image
+        reference = to_thumbnail(prev_screen)
+        for _ in range(clicks):
+            self.controller.scroll(-self.signed_clicks(direction, 1))
+        self.wait_rendering(region=self.list_loc, reference=reference)
+        next_screen = self.frame_source.grab_region(self.list_loc).image
+        return self.track_scroll(
+            prev_screen,
+            next_screen,
+            clicks=self.signed_clicks(direction, clicks),
+        )
 
     def scroll_artifact_list(
         self,
@@ -187,85 +378,199 @@ class ArtifactPage:
             )
             return reach_boundary
 
-    def iter_artifacts(self, max_num: Optional[int] = None):
-        count = 0
+    def reset_grid(self):
+        """把列表移到顶部，网格回到第一行。"""
         self.logger.info('正在移动圣遗物列表页至顶...')
         self.scroll_artifact_list(
             direction=Direction.UP,
             times=1,
             until_boundary=True,
         )
+        self.grid = ArtifactGrid(
+            col_points=self.col_points,
+            y_offset=self.y_offset,
+            cell_height=self.first_artifact_loc.height,
+            list_loc=self.list_loc,
+            row_y=self.first_artifact_loc.center_y,
+        )
 
-        row_head_loc = self.first_artifact_loc
-        excced_max_num = False
+    def iter_artifacts(self, max_num: Optional[int] = None):
+        count = 0
+        self.reset_grid()
+        head_selected = False
         while True:
-            for x in self.col_points:
+            for col_idx in range(len(self.col_points)):
                 count += 1
                 if max_num and count > max_num:
-                    excced_max_num = True
-                    break
-                pyautogui.leftClick(x=x, y=row_head_loc.center_y)
-                yield
+                    return
+                # 行首已在换行校验时选中，无需再次点击
+                if col_idx > 0 or not head_selected:
+                    point = self.grid.cell_center(col_idx)
+                    self.controller.leftClick(x=point.x, y=point.y)
+                self.selected_cell = GridCell(
+                    row_idx=self.grid.row_idx,
+                    col_idx=col_idx,
+                )
+                yield self.selected_cell
 
-            if excced_max_num:
+            if not self.move_to_next_row():
+                self.logger.info('已到达圣遗物列表底部，结束当前任务。')
                 break
+            head_selected = True
 
-            loc = self.locate_selected_artifact()
+    def scroll_to_cell(self, cell: GridCell):
+        """按实测滚动位移把格子所在行滚入可视区。"""
+        max_rows = max(self.list_loc.height // self.y_offset - 1, 1)
+        while True:
+            point = self.grid.cell_center_at(cell)
+            if self.grid.row_fits(point.y):
+                return True
+            rows = round((point.y - self.list_loc.center_y) / self.y_offset)
+            rows = min(max(rows, -max_rows), max_rows)
+            if rows == 0:
+                return False
+            displacement = self.scroll_rows(rows)
+            if not displacement:
+                self.logger.warning('滚动位移无法测量或已到达边界。')
+                return False
+
+    def iter_cells(self, cells: List[GridCell]):
+        """从列表顶部开始按行依次选中给定的格子。"""
+        self.reset_grid()
+        for cell in sorted(cells, key=lambda c: (c.row_idx, c.col_idx)):
+            if not self.scroll_to_cell(cell) or not self.select_cell(cell):
+                self.logger.warning(f'无法回到第{cell.row_idx + 1}行'
+                                    f'第{cell.col_idx + 1}列的圣遗物。')
+                continue
+            yield cell
+
+    def hash_description(self):
+        desc_image = self.frame_source.grab_region(self.desc_loc).image
+        return self.tile_hasher.hash(desc_image)
+
+    def click_and_check(self, point: Point):
+        # 廉价校验：点击后描述区发生变化即认为选中了新的圣遗物
+        reference = self.hash_description()
+        self.controller.leftClick(x=point.x, y=point.y)
+        return wait_until_tiles_changed(
+            frame_source=self.frame_source,
+            clock=self.clock,
+            hasher=self.tile_hasher,
+            reference=reference,
+            region=self.desc_loc,
+            timeout=self.rendering_time,
+        )
 
-            if loc.bottom + self.y_offset < self.list_loc.bottom:
-                row_head_loc = self.locate_aim_artifact_based_on_point(
-                    aim_x=self.col_points[0],
-                    aim_y=loc.center_y + self.y_offset,
-                )
-                self.logger.info(f'当前圣遗物：{str(loc.to_tuple())}')
-                if row_head_loc:
-                    self.logger.info(f'下一行：{str(row_head_loc.to_tuple())}')
-                else:
-                    self.logger.warning('未能正确定位出下一行圣遗物。')
-            else:
-                row_head_loc = None
-
-            reach_end = False
-            while row_head_loc is None:
-                self.logger.info('超过圣遗物列表区域，开始滚动下移...')
-                reach_end = self.scroll_artifact_list(
-                    direction=Direction.DOWN,
-                    only_scrolling=False,
-                )
-                if reach_end:
-                    break
-                loc = self.locate_selected_artifact()
-                row_head_loc = self.locate_aim_artifact_based_on_point(
-                    aim_x=self.col_points[0],
-                    aim_y=loc.center_y + self.y_offset,
-                )
-            if reach_end:
-                self.logger.info('已到达圣遗物列表底部，结束当前任务。')
+    def select_cell(self, cell: GridCell):
+        """重新选中之前访问过的格子，格子已滚出可视区或点击无效时返回False。"""
+        if cell == self.selected_cell:
+            return True
+        point = self.grid.cell_center_at(cell)
+        if not self.grid.row_fits(point.y):
+            return False
+        if not self.click_and_check(point):
+            return False
+        self.selected_cell = cell
+        return True
+
+    def notify_before_scroll(self):
+        if self.before_scroll:
+            self.before_scroll()
+
+    def relocate_next_row(self):
+        loc = self.locate_selected_artifact()
+        row_head_loc = self.locate_aim_artifact_based_on_point(
+            aim_x=self.col_points[0],
+            aim_y=loc.center_y + self.y_offset,
+        )
+        self.logger.info(f'当前圣遗物：{str(loc.to_tuple())}')
+        if row_head_loc:
+            self.logger.info(f'下一行：{str(row_head_loc.to_tuple())}')
+        else:
+            self.logger.warning('未能正确定位出下一行圣遗物。')
+        return row_head_loc
+
+    def scroll_to_next_row(self):
+        # 保留当前行在可视区内，一次翻过尽可能多的行
+        rows = max(self.list_loc.height // self.y_offset - 1, 1)
+        while not self.grid.row_fits(self.grid.next_row_y):
+            displacement = self.scroll_rows(rows)
+            if displacement is None:
                 break
+            if displacement == 0:
+                return False
+        return True
+
+    def move_to_next_row(self):
+        if not self.grid.row_fits(self.grid.next_row_y):
+            self.logger.info('超过圣遗物列表区域，开始滚动下移...')
+            self.notify_before_scroll()
+            if not self.scroll_to_next_row():
+                return False
+        next_row_y = self.grid.next_row_y
+        if self.grid.row_fits(next_row_y):
+            point = Point(x=self.col_points[0], y=next_row_y)
+            if self.click_and_check(point):
+                self.grid.advance(next_row_y)
+                return True
+            self.logger.warning('按网格推算的下一行点击无效，改为视觉定位。')
+            row_head_loc = self.relocate_next_row()
+        else:
+            row_head_loc = None
+
+        while row_head_loc is None:
+            self.logger.info('超过圣遗物列表区域，开始滚动下移...')
+            self.notify_before_scroll()
+            reach_end = self.scroll_artifact_list(
+                direction=Direction.DOWN,
+                only_scrolling=False,
+            )
+            if reach_end:
+                return False
+            row_head_loc = self.relocate_next_row()
+        self.grid.advance(row_head_loc.center_y)
+        return True
 
-    def wait_rendering(self, count: int = 1):
-        time.sleep(count * self.rendering_time)
-
-    def generate_roi_mask(self, roi: Box):
-        mask = np.zeros(
-            shape=(self.screen_height, self.screen_width),
-            dtype=np.uint8,
+    def wait_rendering(
+        self,
+        count: int = 1,
+        region: Optional[Box] = None,
+        reference: Optional[np.ndarray] = None,
+    ):
+        timeout = count * self.rendering_time
+        if not self.adaptive_waiting:
+            self.clock.sleep(timeout)
+            return
+        wait_until_stable(
+            frame_source=self.frame_source,
+            clock=self.clock,
+            region=region,
+            timeout=timeout,
+            stable_frames=self.stable_frames,
+            reference=reference,
         )
-        mask[roi.top:roi.bottom, roi.left:roi.right] = 255
-        return mask
 
     def locate_artifact_description(self):
         self.logger.info('正在标定圣遗物详情区...')
         ensure_mouse_in_safe_location(
             loc=self.rough_desc_loc,
             use_box_center=True,
+            controller=self.controller,
         )
         clicks = 5
-        prev_screen = pyautogui.screenshot()
-        self.scroll(direction=Direction.DOWN, clicks=clicks)
-        after_screen = pyautogui.screenshot()
-        self.scroll(direction=Direction.UP, clicks=2 * clicks)
-        diffs = diff_two_images(prev_screen, after_screen)
+        prev_screen = self.frame_source.grab()
+        self.scroll(
+            direction=Direction.DOWN,
+            clicks=clicks,
+            region=self.rough_desc_loc,
+        )
+        after_screen = self.frame_source.grab()
+        self.scroll(
+            direction=Direction.UP,
+            clicks=2 * clicks,
+            region=self.rough_desc_loc,
+        )
+        diffs = self.change_detector.diff(prev_screen, after_screen)
         # 左半侧存在选中圣遗物的闪烁区域，不属于ROI
         diffs[:, :diffs.shape[1] // 2] = 0
 
@@ -279,26 +584,31 @@ class ArtifactPage:
         else:
             self.logger.show_bbox(roi, '圣遗物详情区')
         self.desc_loc = roi
-        self.desc_loc_mask = self.generate_roi_mask(roi)
 
     def locate_artifact_list(self):
         self.logger.info('正在标定圣遗物列表区...')
         self.move_to_artifact_list()
-        prev_screen = pyautogui.screenshot()
+        prev_screen = self.frame_source.grab()
         reach_end = self.scroll_artifact_list(
             direction=Direction.DOWN,
             times=1,
             only_scrolling=False,
         )
-        after_screen = pyautogui.screenshot()
+        after_screen = self.frame_source.grab()
         self.scroll_artifact_list(direction=Direction.UP, times=3)
-        diffs = diff_two_images(prev_screen, after_screen)
+        diffs = self.change_detector.diff(prev_screen, after_screen)
 
         roi = locate_roi_location_from_diffs(diffs, self.diff_thres_ratio)
         self.logger.show_bbox(roi, '圣遗物列表区')
 
         if roi and not reach_end:
             self.list_loc = roi
+            # 用标定时的这次滚动学习每格滚轮对应的像素数
+            self.track_scroll(
+                prev_screen[roi.top:roi.bottom, roi.left:roi.right],
+                after_screen[roi.top:roi.bottom, roi.left:roi.right],
+                clicks=self.signed_clicks(Direction.DOWN, self.scroll_steps),
+            )
         elif roi and reach_end:
             # TODO:
             raise NotImplementedError()
@@ -306,28 +616,15 @@ class ArtifactPage:
             # TODO:
             raise NotImplementedError()
 
-        self.list_loc_mask = self.generate_roi_mask(roi)
-
-    def locate_selected_artifact(self, delay: float = 0):
+    def locate_selected_artifact(self):
         # 基于被选中圣遗物有闪烁效果，获取选中圣遗物外边框
         self.logger.info('正在定位当前选中的圣遗物...')
-        prev_screen = pyautogui.screenshot()
-        prev_screen = np.asarray(prev_screen)
-        if delay > 0:
-            time.sleep(delay)
-        after_screen = pyautogui.screenshot()
-        after_screen = np.asarray(after_screen)
-        diffs = diff_two_images(prev_screen, after_screen)
-        diffs = cv2.bitwise_and(diffs, diffs, mask=self.list_loc_mask)
-        diffs = cv2.morphologyEx(diffs, cv2.MORPH_OPEN, kernel=(3, 3))
-        x, y, w, h = cv2.boundingRect(diffs)
-
-        if x + y + w + h == 0:
-            # 可能是CPU性能过好，导致前后两次截图时差过小，未能得到差分图
-            return self.locate_selected_artifact(delay=0.1)
-        else:
-            artifact_loc = Box(left=x, top=y, width=w, height=h)
-            return artifact_loc
+        result = self.blink_detector.detect(self.list_loc)
+        if result.box is None:
+            raise SelectedArtifactNotFound(result.frames)
+        self.logger.debug(f'选中圣遗物定位用了{result.frames}帧，'
+                          f'{result.elapsed:.3f}秒')
+        return result.box
 
     def locate_aim_artifact_based_on_point(
         self,
@@ -335,7 +632,7 @@ class ArtifactPage:
         aim_y: int,
     ):
         aim_point = Point(x=aim_x, y=aim_y)
-        pyautogui.leftClick(aim_point.x, aim_point.y)
+        self.controller.leftClick(aim_point.x, aim_point.y)
         selected_loc = self.locate_selected_artifact()
         if selected_loc.contain(aim_point):
             return selected_loc
@@ -369,11 +666,21 @@ class ArtifactPage:
         else:
             raise NotImplementedError()
 
-        pyautogui.leftClick(aim_x, aim_y)
+        reference = self.hash_description()
+        self.controller.leftClick(aim_x, aim_y)
         next_artifact_loc = self.locate_selected_artifact()
         if not self.is_same_artifact(
                 loc_a=basic_artifact_loc,
                 loc_b=next_artifact_loc,
         ):
             return next_artifact_loc
+        # 边框还在原处但描述区已经变化，说明边框尚未重绘，需要重新定位
+        desc_image = self.frame_source.grab_region(self.desc_loc).image
+        if self.tile_hasher.any_changed(reference, desc_image):
+            next_artifact_loc = self.locate_selected_artifact()
+            if not self.is_same_artifact(
+                    loc_a=basic_artifact_loc,
+                    loc_b=next_artifact_loc,
+            ):
+                return next_artifact_loc
         return None
@@ -0,0 +1,446 @@
+"""
+模拟的圣遗物页面，用于在没有游戏的环境下跑通 ArtifactPage 的标定与遍历。
+
+它同时实现了 FrameSource 和 Controller：截图时按当前状态画出列表区和描述区，
+点击与滚轮则改变选中项、列表和描述区的滚动位置以及锁定状态。
+选中圣遗物的边框随时间呼吸闪烁，时间由 VirtualClock 推进。
+"""
+import math
+import random
+from typing import Dict, List, Optional, Tuple
+
+import attrs
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from genshin_mummy.artifact_helper.type import (
+    Artifact,
+    ArtifactType,
+    EntryType,
+)
+from genshin_mummy.tools.capture import FrameSource
+from genshin_mummy.tools.clock import VirtualClock
+from genshin_mummy.tools.controller import Controller
+from genshin_mummy.type import Box, Point
+
+SCREEN_COLOR = (28, 32, 44)
+LIST_COLOR = (234, 228, 218)
+DESC_COLOR = (236, 229, 216)
+STARS_COLOR = (255, 204, 50)
+TEXT_COLOR = (74, 83, 102)
+HEADER_TEXT_COLOR = (255, 255, 255)
+LOCKED_COLOR = (220, 80, 80)
+UNLOCKED_COLOR = (150, 150, 150)
+BORDER_COLOR = (255, 255, 255)
+
+RARITY_COLORS = {
+    1: (114, 119, 139),
+    2: (42, 143, 114),
+    3: (81, 128, 203),
+    4: (161, 86, 224),
+    5: (188, 105, 50),
+}
+
+MAIN_ENTRY_TYPES = {
+    ArtifactType.FLOWER_OF_LIFE: [EntryType.HP],
+    ArtifactType.PLUME_OF_DEATH: [EntryType.ATK],
+    ArtifactType.SANDS_OF_EON: [
+        EntryType.HP_PERCENTAGE,
+        EntryType.ATK_PERCENTAGE,
+        EntryType.DEF_PERCENTAGE,
+        EntryType.ELEMENTAL_MASTERY,
+        EntryType.ENERGY_RECHARGE,
+    ],
+    ArtifactType.GOBLETS_OF_EONOTHEM: [
+        EntryType.HP_PERCENTAGE,
+        EntryType.ATK_PERCENTAGE,
+        EntryType.PYRO_DMG_BONUS,
+        EntryType.HYDRO_DMG_BONUS,
+        EntryType.PHYSICAL_DMG_BONUS,
+    ],
+    ArtifactType.CERCLETS_OF_LOGOS: [
+        EntryType.CRIT_RATE,
+        EntryType.CRIT_DMG,
+        EntryType.HEALING_BONUS,
+        EntryType.ATK_PERCENTAGE,
+    ],
+}
+
+SUBENTRY_TYPES = [
+    EntryType.HP,
+    EntryType.HP_PERCENTAGE,
+    EntryType.ATK,
+    EntryType.ATK_PERCENTAGE,
+    EntryType.DEF,
+    EntryType.DEF_PERCENTAGE,
+    EntryType.CRIT_RATE,
+    EntryType.CRIT_DMG,
+    EntryType.ELEMENTAL_MASTERY,
+    EntryType.ENERGY_RECHARGE,
+]
+
+PERCENTAGE_TYPES = [
+    EntryType.HP_PERCENTAGE,
+    EntryType.ATK_PERCENTAGE,
+    EntryType.DEF_PERCENTAGE,
+    EntryType.CRIT_RATE,
+    EntryType.CRIT_DMG,
+    EntryType.ENERGY_RECHARGE,
+    EntryType.PYRO_DMG_BONUS,
+    EntryType.HYDRO_DMG_BONUS,
+    EntryType.PHYSICAL_DMG_BONUS,
+    EntryType.HEALING_BONUS,
+]
+
+
+def entry_text(entry_type: EntryType, value: float):
+    if entry_type in PERCENTAGE_TYPES:
+        return f'{value:.1f}%'
+    return f'{int(value)}'
+
+
+def entry_name(entry_type: EntryType):
+    # 游戏里百分比词条和固定值词条同名，靠数值的%区分
+    return entry_type.value.replace('百分比', '')
+
+
+def random_artifacts(num: int, seed: int = 0) -> List[Artifact]:
+    rng = random.Random(seed)
+    artifacts = []
+    for idx in range(num):
+        artifact_type = rng.choice(list(ArtifactType))
+        main_entry_type = rng.choice(MAIN_ENTRY_TYPES[artifact_type])
+        stars = rng.choice([4, 5, 5, 5])
+        level = rng.choice([0, 0, 0, 4, 8, 12, 16, 20])
+        subentry_types = [tp for tp in SUBENTRY_TYPES if tp != main_entry_type]
+        subentry_num = rng.choice([3, 4]) if level < 4 else 4
+        subentries = {}
+        for tp in rng.sample(subentry_types, subentry_num):
+            subentries[tp] = entry_text(tp, rng.uniform(2, 40))
+        artifacts.append(
+            Artifact(
+                name=f'模拟圣遗物{idx}',
+                type=artifact_type,
+                entry={
+                    main_entry_type:
+                    entry_text(main_entry_type, rng.uniform(7, 47))
+                },
+                stars=stars,
+                level=level,
+                subentries=subentries,
+            ))
+    return artifacts
+
+
+@attrs.frozen
+class PageState:
+    selected: int = attrs.field(default=0)
+    list_offset: int = attrs.field(default=0)
+    desc_offset: int = attrs.field(default=0)
+    locks: Tuple[bool, ...] = attrs.field(default=())
+
+
+@attrs.define
+class SyntheticArtifactPage(FrameSource, Controller):
+    artifacts: List[Artifact] = attrs.field()
+    clock: VirtualClock = attrs.field(factory=VirtualClock)
+    screen_size: Tuple[int, int] = attrs.field(default=(1280, 720))
+    cols: int = attrs.field(default=8)
+    cell_size: Tuple[int, int] = attrs.field(default=(66, 80))
+    cell_pitch: Tuple[int, int] = attrs.field(default=(80, 96))
+    list_padding: int = attrs.field(default=8)
+    list_scroll_px: int = attrs.field(default=20)
+    desc_scroll_px: int = attrs.field(default=4)
+    desc_extra_height: int = attrs.field(default=200)
+    border_width: int = attrs.field(default=3)
+    blink_period: float = attrs.field(default=0.8)
+    # 每次截图消耗的时间，保证连续两帧处于不同的闪烁相位
+    frame_interval: float = attrs.field(default=1 / 60)
+    # 滚动后画面需要多久才会刷新，模拟游戏的渲染延迟；点击则立即生效
+    render_latency: float = attrs.field(default=0.0)
+    font_path: Optional[str] = attrs.field(default=None)
+
+    list_box: Box = attrs.field(init=False)
+    desc_box: Box = attrs.field(init=False)
+    mouse: Point = attrs.field(init=False)
+    state: PageState = attrs.field(init=False)
+    click_count: int = attrs.field(init=False, default=0)
+    scroll_count: int = attrs.field(init=False, default=0)
+
+    _prev_state: PageState = attrs.field(init=False)
+    _changed_at: float = attrs.field(init=False)
+    _background: np.ndarray = attrs.field(init=False)
+    _list_content: np.ndarray = attrs.field(init=False)
+    _desc_contents: Dict[int, np.ndarray] = attrs.field(init=False,
+                                                        factory=dict)
+    _font: ImageFont.ImageFont = attrs.field(init=False)
+    _big_font: ImageFont.ImageFont = attrs.field(init=False)
+
+    def __attrs_post_init__(self):
+        width, height = self.screen_size
+        self.list_box = Box(
+            left=int(width * 0.1),
+            top=int(height * 0.17),
+            width=int(width * 0.5),
+            height=int(height * 0.7),
+        )
+        self.desc_box = Box(
+            left=int(width * 0.68),
+            top=int(height * 0.17),
+            width=int(width * 0.26),
+            height=int(height * 0.7),
+        )
+        self.mouse = Point(x=width // 2, y=height // 2)
+        self.state = PageState(locks=tuple(art.level > 0
+                                           for art in self.artifacts))
+        self._prev_state = self.state
+        self._changed_at = -math.inf
+        if self.font_path:
+            self._font = ImageFont.truetype(self.font_path, 18)
+            self._big_font = ImageFont.truetype(self.font_path, 26)
+        else:
+            self._font = ImageFont.load_default()
+            self._big_font = self._font
+        self._background = np.full((height, width, 3),
+                                   SCREEN_COLOR,
+                                   dtype=np.uint8)
+        self._list_content = self._render_list_content()
+
+    @property
+    def rows(self):
+        return math.ceil(len(self.artifacts) / self.cols)
+
+    @property
+    def max_list_offset(self):
+        content_height = self._list_content.shape[0]
+        return max(content_height - self.list_box.height, 0)
+
+    @property
+    def max_desc_offset(self):
+        return self.desc_extra_height
+
+    def cell_box(self, idx: int) -> Box:
+        """第 idx 个圣遗物在列表内容坐标系中的位置。"""
+        row, col = divmod(idx, self.cols)
+        cell_width, cell_height = self.cell_size
+        pitch_x, pitch_y = self.cell_pitch
+        return Box(
+            left=col * pitch_x + (pitch_x - cell_width) // 2,
+            top=self.list_padding + row * pitch_y +
+            (pitch_y - cell_height) // 2,
+            width=cell_width,
+            height=cell_height,
+        )
+
+    def cell_screen_box(self, idx: int, state: Optional[PageState] = None):
+        state = state or self.state
+        box = self.cell_box(idx)
+        return Box(
+            left=box.left + self.list_box.left,
+            top=box.top + self.list_box.top - state.list_offset,
+            width=box.width,
+            height=box.height,
+        )
+
+    def lock_icon_box(self) -> Box:
+        """锁图标在描述区内容坐标系中的位置，与等级行同高。"""
+        return Box(left=self.desc_box.width - 50, top=212, width=22, height=22)
+
+    # ---------------------------- 绘制 ----------------------------
+
+    def _draw_text(self, draw: ImageDraw.ImageDraw, xy, text, font, fill):
+        try:
+            draw.text(xy, text, font=font, fill=fill)
+        except UnicodeEncodeError:
+            # 位图字体不支持中文，只在没有矢量字体时才会走到这里
+            text = text.encode('latin-1', 'replace').decode('latin-1')
+            draw.text(xy, text, font=font, fill=fill)
+
+    def _render_list_content(self):
+        pitch_y = self.cell_pitch[1]
+        content_height = self.rows * pitch_y + 2 * self.list_padding
+        content = np.full((content_height, self.list_box.width, 3),
+                          LIST_COLOR,
+                          dtype=np.uint8)
+        for idx, artifact in enumerate(self.artifacts):
+            box = self.cell_box(idx)
+            # 每个格子用不同的纹理，保证滚动后差分足够明显
+            rng = np.random.default_rng(idx)
+            base = np.array(RARITY_COLORS[artifact.stars], dtype=np.int16)
+            noise = rng.integers(-40, 40, size=(box.height, box.width, 1))
+            cell = np.clip(base + noise, 0, 255).astype(np.uint8)
+            content[box.top:box.bottom, box.left:box.right] = cell
+        return content
+
+    def _render_desc_content(self, idx: int):
+        artifact = self.artifacts[idx]
+        width = self.desc_box.width
+        height = self.desc_box.height + self.desc_extra_height
+        # 底色使用纵向渐变，滚动时每个像素都会变化，又不会干扰锁图标的阈值分割
+        gradient = np.linspace(0, 60, height, dtype=np.float32)[:, None, None]
+        content = np.clip(
+            np.array(DESC_COLOR, dtype=np.float32) - gradient, 0, 255)
+        content = np.broadcast_to(content, (height, width, 3))
+        content = content.astype(np.uint8)
+
+        header_height = 170
+        rng = np.random.default_rng(10000 + idx)
+        base = np.array(RARITY_COLORS[artifact.stars], dtype=np.int16)
+        noise = rng.integers(-30, 30, size=(header_height, width, 1))
+        content[:header_height] = np.clip(base + noise, 0, 255)
+
+        image = Image.fromarray(content)
+        draw = ImageDraw.Draw(image)
+        (main_entry_type, main_entry_value), = artifact.entry.items()
+        self._draw_text(draw, (12, 10), artifact.name, self._big_font,
+                        HEADER_TEXT_COLOR)
+        self._draw_text(draw, (12, 52), artifact.type.value, self._font,
+                        HEADER_TEXT_COLOR)
+        self._draw_text(draw, (12, 96), entry_name(main_entry_type),
+                        self._font, HEADER_TEXT_COLOR)
+        self._draw_text(draw, (12, 122), main_entry_value, self._big_font,
+                        HEADER_TEXT_COLOR)
+        self._draw_text(draw, (12, 180), '★' * artifact.stars, self._font,
+                        STARS_COLOR)
+        self._draw_text(draw, (12, 214), f'+{artifact.level}', self._font,
+                        TEXT_COLOR)
+        for sub_idx, (entry_type,
+                      value) in enumerate(artifact.subentries.items()):
+            self._draw_text(draw, (12, 252 + 30 * sub_idx),
+                            f'·{entry_name(entry_type)}+{value}', self._font,
+                            TEXT_COLOR)
+        for line_idx in range(6):
+            self._draw_text(draw, (12, 400 + 30 * line_idx),
+                            f'两件套：模拟套装效果{line_idx}', self._font, TEXT_COLOR)
+        return np.asarray(image).copy()
+
+    def _visible_state(self):
+        if self.clock.time() - self._changed_at < self.render_latency:
+            return self._prev_state
+        return self.state
+
+    def grab(self) -> np.ndarray:
+        self.clock.sleep(self.frame_interval)
+        state = self._visible_state()
+        screen = self._background.copy()
+
+        list_view = self._list_content[state.list_offset:state.list_offset +
+                                       self.list_box.height]
+        screen[self.list_box.top:self.list_box.top + list_view.shape[0],
+               self.list_box.left:self.list_box.right] = list_view
+
+        for idx, locked in enumerate(state.locks):
+            if not locked:
+                continue
+            box = self.cell_screen_box(idx, state)
+            self._fill(screen, Box(box.right - 12, box.top + 4, 8, 8),
+                       LOCKED_COLOR)
+
+        # 选中边框随时间呼吸闪烁
+        phase = math.sin(2 * math.pi * self.clock.time() / self.blink_period)
+        brightness = 0.5 + 0.5 * phase
+        border_color = tuple(
+            int(c * (0.5 + 0.5 * brightness)) for c in BORDER_COLOR)
+        box = self.cell_screen_box(state.selected, state)
+        bw = self.border_width
+        self._fill(screen, Box(box.left, box.top, box.width, bw), border_color)
+        self._fill(screen, Box(box.left, box.bottom - bw, box.width, bw),
+                   border_color)
+        self._fill(screen, Box(box.left, box.top, bw, box.height),
+                   border_color)
+        self._fill(screen, Box(box.right - bw, box.top, bw, box.height),
+                   border_color)
+
+        if state.selected not in self._desc_contents:
+            self._desc_contents[state.selected] = self._render_desc_content(
+                state.selected)
+        desc_content = self._desc_contents[state.selected].copy()
+        icon = self.lock_icon_box()
+        icon_color = LOCKED_COLOR if state.locks[
+            state.selected] else UNLOCKED_COLOR
+        desc_content[icon.top:icon.bottom, icon.left:icon.right] = icon_color
+        desc_view = desc_content[state.desc_offset:state.desc_offset +
+                                 self.desc_box.height]
+        screen[self.desc_box.top:self.desc_box.bottom,
+               self.desc_box.left:self.desc_box.right] = desc_view
+        return screen
+
+    def _fill(self, screen: np.ndarray, box: Box, color):
+        # 只在列表区内绘制，超出部分被列表区裁剪
+        top = max(box.top, self.list_box.top)
+        bottom = min(box.bottom, self.list_box.bottom)
+        if top >= bottom:
+            return
+        screen[top:bottom, box.left:box.right] = color
+
+    # ---------------------------- 输入 ----------------------------
+
+    def _update_state(self, delayed: bool = False, **changes):
+        if not delayed:
+            self._prev_state = attrs.evolve(self._prev_state, **changes)
+            self.state = attrs.evolve(self.state, **changes)
+            return
+        now = self.clock.time()
+        if now - self._changed_at >= self.render_latency:
+            self._prev_state = self.state
+        self.state = attrs.evolve(self.state, **changes)
+        self._changed_at = now
+
+    def _hit_artifact(self, point: Point):
+        if not self.list_box.contain(point):
+            return None
+        content_x = point.x - self.list_box.left
+        content_y = point.y - self.list_box.top + self.state.list_offset
+        for idx in range(len(self.artifacts)):
+            box = self.cell_box(idx)
+            if (box.left <= content_x < box.right
+                    and box.top <= content_y < box.bottom):
+                return idx
+        return None
+
+    def size(self):
+        return self.screen_size
+
+    def position(self):
+        return self.mouse.x, self.mouse.y
+
+    def moveTo(self, x: int, y: int, duration: float = 0.0):
+        self.clock.sleep(duration)
+        self.mouse = Point(x=int(x), y=int(y))
+
+    def leftClick(self, x: int, y: int, duration: float = 0.0):
+        self.moveTo(x, y, duration)
+        self.click_count += 1
+        idx = self._hit_artifact(self.mouse)
+        if idx is not None:
+            if idx != self.state.selected:
+                self._update_state(selected=idx, desc_offset=0)
+            return
+        if self.desc_box.contain(self.mouse):
+            icon = self.lock_icon_box()
+            content_point = Point(
+                x=self.mouse.x - self.desc_box.left,
+                y=self.mouse.y - self.desc_box.top + self.state.desc_offset,
+            )
+            if (icon.left <= content_point.x < icon.right
+                    and icon.top <= content_point.y < icon.bottom):
+                locks = list(self.state.locks)
+                locks[self.state.selected] = not locks[self.state.selected]
+                self._update_state(locks=tuple(locks))
+
+    def scroll(self, clicks: int):
+        self.scroll_count += 1
+        # pyautogui中正数为向上滚动
+        if self.list_box.contain(self.mouse):
+            offset = self.state.list_offset - clicks * self.list_scroll_px
+            offset = min(max(offset, 0), self.max_list_offset)
+            if offset != self.state.list_offset:
+                self._update_state(delayed=True, list_offset=offset)
+        elif self.desc_box.contain(self.mouse):
+            offset = self.state.desc_offset - clicks * self.desc_scroll_px
+            offset = min(max(offset, 0), self.max_desc_offset)
+            if offset != self.state.desc_offset:
+                self._update_state(delayed=True, desc_offset=offset)
+
+    def press(self, key: str, interval: float = 0.0):
+        self.clock.sleep(interval)
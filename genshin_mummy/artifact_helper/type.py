@@ -6,6 +6,14 @@ import numpy as np
 
 from genshin_mummy.ocr.type import TextChunkCollection
 
+# TODO: 视PADDLE OCR结果可能要归一化
+SPACE_CHAR = ' '
+STAR_CHAR = '★'
+PLUS_CHAR = '+'
+DOT_CHAR = '·'
+PERCENT_CHAR = '%'
+SUBENTRY_PATTERN = f'{DOT_CHAR}.*?\{PLUS_CHAR}[\d.]*[{PERCENT_CHAR}]?'  # noqa
+
 
 @unique
 class EntryType(Enum):
@@ -1,24 +1,61 @@
+import argparse
 import ctypes
 import os
 import platform
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 import cv2
-import iolite
 import numpy as np
-import pyautogui
-from paddleocr import PaddleOCR
 
+from genshin_mummy.artifact_helper.batch import (
+    FRAME_STORE_FILENAME,
+    scan_artifacts,
+)
+from genshin_mummy.artifact_helper.calibration import PROFILE_FILENAME
+from genshin_mummy.artifact_helper.line_slots import (
+    ArtifactChunks,
+    LineSlotLayout,
+)
+from genshin_mummy.artifact_helper.ocr_cache import (
+    OCR_CACHE_FILENAME,
+    OcrResultCache,
+    panel_hash,
+)
+from genshin_mummy.artifact_helper.ocr_pipeline import ArtifactJob, OcrQueue
 from genshin_mummy.artifact_helper.page_manager import ArtifactPage
 from genshin_mummy.artifact_helper.judge import ArtifactJudge, Conclusion
 from genshin_mummy.artifact_helper.type import (
+    DOT_CHAR,
+    PERCENT_CHAR,
+    PLUS_CHAR,
+    SPACE_CHAR,
+    STAR_CHAR,
+    SUBENTRY_PATTERN,
     Artifact,
     ArtifactType,
     EntryType,
 )
+from genshin_mummy.ocr.backend import (
+    GlyphBackend,
+    OcrBackend,
+    PaddleBackend,
+    as_backend,
+)
+from genshin_mummy.ocr.daemon import (
+    DEFAULT_ADDRESS,
+    OcrClient,
+    connect_or_create_ocr,
+)
+from genshin_mummy.ocr.engine import (
+    OcrLoader,
+    create_warm_ocr,
+    warm_up_pool,
+)
 from genshin_mummy.ocr.opt import are_text_chunks_aligned_vertically
 from genshin_mummy.ocr.type import (
     Alignment,
@@ -26,17 +63,27 @@ from genshin_mummy.ocr.type import (
     TextChunkCollection,
     build_text_chunks_from_paddle_ocr,
 )
+from genshin_mummy.tools.capture import (
+    FrameSource,
+    RegionFrame,
+    create_frame_source,
+)
+from genshin_mummy.tools.clock import Clock
+from genshin_mummy.tools.controller import Controller, create_controller
+from genshin_mummy.tools.frame_store import read_frame
 from genshin_mummy.tools.logger import create_logger
+from genshin_mummy.tools.session import (
+    RecordingClock,
+    RecordingController,
+    RecordingFrameSource,
+    ReplayClock,
+    ReplayController,
+    ReplayFrameSource,
+    SessionReader,
+    SessionWriter,
+)
 from genshin_mummy.type import Box, Direction, Point
 
-# TODO: 视PADDLE OCR结果可能要归一化
-SPACE_CHAR = ' '
-STAR_CHAR = '★'
-PLUS_CHAR = '+'
-DOT_CHAR = '·'
-PERCENT_CHAR = '%'
-SUBENTRY_PATTERN = f'{DOT_CHAR}.*?\{PLUS_CHAR}[\d.]*[{PERCENT_CHAR}]?'  # noqa
-
 
 def get_entry_type(entry_key: str, entry_value: str):
     entry_type = None
@@ -57,12 +104,12 @@ def get_entry_type(entry_key: str, entry_value: str):
     return entry_type
 
 
-def recognize_artifact_informations(ocr, screen: np.ndarray):
+def detect_artifact_chunks(backend: OcrBackend, screen: np.ndarray):
     # TODO: 移到ArtifactDescription里去
 
     # 移除显著游离余左对齐的文本，规避OCR噪声字符
     sigma = 3
-    ocr_items = ocr.ocr(screen, cls=False)
+    ocr_items = backend.detect(screen)
     text_chunks = build_text_chunks_from_paddle_ocr(ocr_items)
     lefts = [tc.left for tc in text_chunks]
     left_std = np.std(lefts)
@@ -116,13 +163,25 @@ def recognize_artifact_informations(ocr, screen: np.ndarray):
         subentry_chunks = chunk_clct.find_pattern(SUBENTRY_PATTERN)
         # TODO: 校验值正确性，若不正确切换模板策略抽取
 
-    entry_type = get_entry_type(entry_chunk.text, entry_value_chunk.text)
+    return ArtifactChunks(
+        name=name_chunk,
+        type=type_chunk,
+        entry=entry_chunk,
+        entry_value=entry_value_chunk,
+        stars=stars_chunk,
+        level=level_chunk,
+        subentries=subentry_chunks,
+    )
+
+
+def build_artifact(chunks: ArtifactChunks):
+    entry_type = get_entry_type(chunks.entry.text, chunks.entry_value.text)
 
     # TODO
     assert entry_type
 
     subentries = {}
-    for chunk in subentry_chunks:
+    for chunk in chunks.subentries:
         # TODO: 想办法规避下OCR稳定性影响, 目前好像没问题
         text = chunk.text.strip(f'{DOT_CHAR}{SPACE_CHAR}')
         subentry_key, subentry_value = text.split(PLUS_CHAR)
@@ -131,34 +190,92 @@ def recognize_artifact_informations(ocr, screen: np.ndarray):
 
     artifact_type = None
     for _item in ArtifactType:
-        if _item.value == type_chunk.text:
+        if _item.value == chunks.type.text:
             artifact_type = _item
             break
     assert artifact_type
 
-    artifact = Artifact(
-        name=name_chunk.text,
+    return Artifact(
+        name=chunks.name.text,
         type=artifact_type,
-        entry={entry_type: entry_value_chunk.text},
-        stars=stars_chunk.text.count(STAR_CHAR),
-        level=int(level_chunk.text.lstrip(PLUS_CHAR)),
+        entry={entry_type: chunks.entry_value.text},
+        stars=chunks.stars.text.count(STAR_CHAR),
+        level=int(chunks.level.text.lstrip(PLUS_CHAR)),
         subentries=subentries,
     )
-    assert isinstance(level_chunk, TextChunk)
-    return artifact, level_chunk
+
+
+def recognize_artifact_informations(
+    ocr,
+    screen: np.ndarray,
+    layout: Optional[LineSlotLayout] = None,
+):
+    backend = as_backend(ocr)
+    if layout and layout.ready:
+        # 版式已知时只识别固定的文本行，校验失败再做完整检测
+        chunks = layout.read(backend, screen)
+        if chunks is not None:
+            try:
+                artifact = build_artifact(chunks)
+            except (AssertionError, ValueError):
+                layout.fail()
+            else:
+                layout.accept()
+                return artifact, chunks.level
+    chunks = detect_artifact_chunks(backend, screen)
+    artifact = build_artifact(chunks)
+    assert isinstance(chunks.level, TextChunk)
+    if layout:
+        layout.learn(chunks)
+    return artifact, chunks.level
+
+
+# 进程池中每个工作进程各自持有的OCR实例与行槽位
+worker_ocr = None
+worker_layout = None
+
+
+def create_backend(ocr, glyph_ocr: bool = True):
+    if glyph_ocr:
+        # 数值行用字形模板识别，中文行按图像缓存文本
+        return GlyphBackend(ocr)
+    return PaddleBackend(ocr)
+
+
+def init_ocr_worker(glyph_ocr: bool = True):
+    global worker_ocr, worker_layout
+    worker_ocr = create_backend(create_warm_ocr(), glyph_ocr)
+    worker_layout = LineSlotLayout()
+
+
+def recognize_in_worker(image: np.ndarray):
+    artifact, level_chunk = recognize_artifact_informations(
+        worker_ocr,
+        image,
+        worker_layout,
+    )
+    # 文本框之间互相引用，只把等级文本框的位置传回主进程
+    level_box = Box(
+        left=level_chunk.left,
+        top=level_chunk.top,
+        width=level_chunk.width,
+        height=level_chunk.height,
+    )
+    return artifact, level_box
+
+
+def recognize_stored_frame(store_fp: Path, frame_shape, idx: int):
+    return recognize_in_worker(read_frame(store_fp, frame_shape, idx))
 
 
 def locate_lock_icon(
     top_limit: int,
     bottom_limit: int,
     left_limit: int,
-    screen: np.ndarray,
-    desc_loc_mask: np.ndarray,
+    desc_frame: RegionFrame,
 ):
-    desc_loc_mask[:, :left_limit] = 0
-    desc_loc_mask[:top_limit, :] = 0
-    desc_loc_mask[bottom_limit:, :] = 0
-    gray = cv2.cvtColor(screen, cv2.COLOR_RGB2GRAY)
+    # 限制范围均为描述区内的局部坐标
+    gray = cv2.cvtColor(desc_frame.image, cv2.COLOR_RGB2GRAY)
     thres = cv2.adaptiveThreshold(
         src=gray,
         maxValue=255,
@@ -167,10 +284,12 @@ def locate_lock_icon(
         blockSize=11,
         C=2,
     )
-    thres = cv2.bitwise_and(thres, thres, mask=desc_loc_mask)
+    thres = thres[top_limit:bottom_limit, left_limit:]
     roi_left, roi_top, roi_width, roi_height = cv2.boundingRect(thres)
-    center_point = Box(roi_left, roi_top, roi_width, roi_height)
-    roi = screen[roi_top:roi_top + roi_height, roi_left:roi_left + roi_width]
+    roi_left += left_limit
+    roi_top += top_limit
+    roi = desc_frame.image[roi_top:roi_top + roi_height,
+                           roi_left:roi_left + roi_width]
     channel_red_roi = roi[:, :, 0]
     # TODO: 经验值有效但不太保险
     THRESH = 20
@@ -182,7 +301,7 @@ def locate_lock_icon(
         x=roi_left + roi_width // 2,
         y=roi_top + roi_height // 2,
     )
-    return lock_status, center_point
+    return lock_status, desc_frame.to_screen(center_point)
 
 
 def scan_strategy_file(app_folder: Path):
@@ -191,7 +310,49 @@ def scan_strategy_file(app_folder: Path):
     return None
 
 
-def run_pipeline(max_num: int, app_fd: str):
+def create_recording_page(
+    logger,
+    session_writer: SessionWriter,
+    frame_source: Optional[FrameSource] = None,
+    controller: Optional[Controller] = None,
+    clock: Optional[Clock] = None,
+):
+    return ArtifactPage(
+        logger=logger,
+        frame_source=RecordingFrameSource(
+            frame_source or create_frame_source(),
+            session_writer,
+        ),
+        controller=RecordingController(
+            controller or create_controller(),
+            session_writer,
+        ),
+        clock=RecordingClock(clock or Clock(), session_writer),
+    )
+
+
+def create_replay_page(logger, session_reader: SessionReader):
+    # 等待参数需与录制时一致；时钟读数取自会话，sleep 不占用时间，
+    # 回放按CPU能力跑满，可直接当作吞吐基准
+    return ArtifactPage(
+        logger=logger,
+        frame_source=ReplayFrameSource(session_reader),
+        controller=ReplayController(session_reader),
+        clock=ReplayClock(session_reader),
+    )
+
+
+def run_pipeline(
+    max_num: int,
+    app_fd: str,
+    record: bool = False,
+    replay_fd: Optional[str] = None,
+    recalibrate: bool = False,
+    ocr_workers: int = 0,
+    batch: bool = False,
+    ocr_daemon: Optional[str] = DEFAULT_ADDRESS,
+    glyph_ocr: bool = True,
+):
     app_folder = Path(app_fd)
     strategy_fp = scan_strategy_file(app_folder)
 
@@ -200,7 +361,44 @@ def run_pipeline(max_num: int, app_fd: str):
 
     artifact_infos = []
 
-    logger = create_logger('unlock_those_shit', logger_folder)
+    replaying = replay_fd is not None
+    logger = create_logger(
+        'unlock_those_shit',
+        logger_folder,
+        overlay=not replaying,
+    )
+
+    ocr_loader = None
+    ocr_queue = None
+    batch_executor = None
+    # 结果返回的先后不确定，录制与回放需要固定的事件顺序，只能串行识别
+    overlapped = ocr_workers > 0 and not batch and not replaying and not record
+    # 模型加载与预热和倒计时、页面标定同时进行
+    if overlapped:
+        # 每个工作进程初始化一次OCR，队列长度为进程数的两倍
+        ocr_queue = OcrQueue(
+            executor=ProcessPoolExecutor(
+                max_workers=ocr_workers,
+                initializer=init_ocr_worker,
+                initargs=(glyph_ocr, ),
+            ),
+            recognize=recognize_in_worker,
+            max_pending=ocr_workers * 2,
+        )
+        warm_up_pool(ocr_queue.executor, ocr_workers)
+    elif batch:
+        # 批处理模式的主进程不需要OCR，工作进程在扫描期间完成预热
+        batch_workers = ocr_workers or os.cpu_count()
+        batch_executor = ProcessPoolExecutor(
+            max_workers=batch_workers,
+            initializer=init_ocr_worker,
+            initargs=(glyph_ocr, ),
+        )
+        warm_up_pool(batch_executor, batch_workers)
+    else:
+        # 有常驻的OCR服务时直接连接，否则在进程内加载
+        ocr_loader = OcrLoader(
+            factory=partial(connect_or_create_ocr, ocr_daemon)).start()
 
     delay_seconds = 10
     logger.notify(
@@ -209,67 +407,236 @@ def run_pipeline(max_num: int, app_fd: str):
     )
     logger.notify_countdown(delay_seconds)
 
-    ocr = PaddleOCR(use_angle_cls=False, lang="ch")
+    line_layout = LineSlotLayout()
+    ocr_cache = OcrResultCache(cache_fp=app_folder / OCR_CACHE_FILENAME)
 
-    artifact_page = ArtifactPage(logger=logger)
+    session_writer = None
+    if replaying:
+        artifact_page = create_replay_page(logger, SessionReader(replay_fd))
+    elif record:
+        session_writer = SessionWriter(logger_folder / 'session')
+        artifact_page = create_recording_page(logger, session_writer)
+    else:
+        # 录制与回放需要完整的标定流程才能对齐事件，只在普通运行时使用档案
+        artifact_page = ArtifactPage(
+            logger=logger,
+            profile_fp=app_folder / PROFILE_FILENAME,
+            recalibrate=recalibrate,
+        )
     artifact_judge = ArtifactJudge(config_fp=strategy_fp, logger=logger)
 
-    try:
-        for idx, _ in enumerate(artifact_page.iter_artifacts(max_num)):
-            logger.info(f'正在处理第{idx + 1}个圣遗物...')
-            screen = pyautogui.screenshot()
-            screen = np.asarray(screen)
-            screen = cv2.bitwise_and(
-                screen,
-                screen,
-                mask=artifact_page.desc_loc_mask,
+    def judge_artifact(artifact: Artifact):
+        logger.info(f'圣遗物信息：{str(artifact)}')
+        expect_status = artifact_judge.judge(artifact)
+        info = list(artifact.to_dict().values())
+        padding_col = 9 - len(info)
+        for _ in range(padding_col):
+            info.append('')
+        info.append(expect_status.value)
+        artifact_infos.append(info)
+        return expect_status
+
+    def correct_lock_status(
+        expect_status: Conclusion,
+        level_box: Box,
+        desc_frame: RegionFrame,
+    ):
+        lock_status, icon_center = locate_lock_icon(
+            top_limit=int(level_box.top),
+            bottom_limit=int(level_box.bottom),
+            left_limit=artifact_page.desc_loc.width // 2,
+            desc_frame=desc_frame,
+        )
+
+        logger.info(f'当前圣遗物状态为{lock_status}，期望为{expect_status}')
+        if lock_status != expect_status:
+            logger.info(f'前往坐标x={icon_center.x}，y={icon_center.y}调整锁定状态')
+            artifact_page.controller.leftClick(
+                icon_center.x,
+                icon_center.y,
+                duration=artifact_page.mouse_move_time,
             )
-            try:
-                artifact, level_chunk = recognize_artifact_informations(
-                    ocr,
-                    screen,
+
+    def finish_job(job: ArtifactJob):
+        """取回识别结果，需要时回到该圣遗物的格子修正锁定状态。"""
+        try:
+            artifact, level_box = job.future.result()
+        except Exception as error:
+            logger.error(f'识别第{job.index + 1}个圣遗物信息失败：{error}')
+            return
+        ocr_cache.put(job.panel_key, artifact, level_box)
+        expect_status = judge_artifact(artifact)
+        if expect_status == Conclusion.UNKNOWN:
+            return
+        current_cell = artifact_page.selected_cell
+        if not artifact_page.select_cell(job.cell):
+            logger.warning(f'第{job.index + 1}个圣遗物已不在可视区内，跳过锁定调整')
+            return
+        # 截图可能早于之前的修正，按当前画面判断锁定状态
+        desc_frame = artifact_page.frame_source.grab_region(
+            artifact_page.desc_loc)
+        correct_lock_status(expect_status, level_box, desc_frame)
+        artifact_page.select_cell(current_cell)
+        artifact_page.move_to_artifact_list()
+
+    def finish_jobs(jobs: List[ArtifactJob]):
+        for job in jobs:
+            finish_job(job)
+
+    if ocr_queue:
+        # 滚动后之前的格子可能不再可见，滚动前处理完所有结果
+        artifact_page.before_scroll = lambda: finish_jobs(ocr_queue.drain())
+
+    def recognize_stored_frames(store, scanned):
+        """并行识别全部截图，返回需要调整锁定状态的格子。"""
+        logger.info(f'扫描结束，共{len(scanned)}张截图，开始并行识别...')
+        results = {}
+        futures = {}
+        with batch_executor as executor:
+            for item in scanned:
+                if item.panel_key in results or item.panel_key in futures:
+                    continue
+                cached = ocr_cache.get(item.panel_key)
+                if cached:
+                    results[item.panel_key] = cached
+                    continue
+                futures[item.panel_key] = executor.submit(
+                    recognize_stored_frame,
+                    store.fp,
+                    store.frame_shape,
+                    item.index,
                 )
-                logger.info(f'圣遗物信息：{str(artifact)}')
-            except Exception as error:
-                logger.error(f'识别圣遗物信息失败：{error}')
+            for panel_key, future in futures.items():
+                try:
+                    results[panel_key] = future.result()
+                except Exception as error:
+                    logger.error(f'识别圣遗物信息失败：{error}')
+                    continue
+                ocr_cache.put(panel_key, *results[panel_key])
+
+        corrections = {}
+        for item in scanned:
+            if item.panel_key not in results:
                 continue
-
-            expect_status = artifact_judge.judge(artifact)
-
-            info = list(artifact.to_dict().values())
-            padding_col = 9 - len(info)
-            for _ in range(padding_col):
-                info.append('')
-            info.append(expect_status.value)
-            artifact_infos.append(info)
-
+            artifact, level_box = results[item.panel_key]
+            expect_status = judge_artifact(artifact)
             if expect_status == Conclusion.UNKNOWN:
                 continue
-
-            lock_status, icon_center = locate_lock_icon(
-                top_limit=int(level_chunk.top),
-                bottom_limit=int(level_chunk.bottom),
-                left_limit=int(artifact_page.desc_loc.left +
-                               artifact_page.desc_loc.width // 2),
-                screen=screen,
-                desc_loc_mask=artifact_page.desc_loc_mask.copy(),
+            lock_status, _ = locate_lock_icon(
+                top_limit=int(level_box.top),
+                bottom_limit=int(level_box.bottom),
+                left_limit=artifact_page.desc_loc.width // 2,
+                desc_frame=RegionFrame(store[item.index],
+                                       artifact_page.desc_loc),
             )
-
-            logger.info(f'当前圣遗物状态为{lock_status}，期望为{expect_status}')
             if lock_status != expect_status:
-                logger.info(f'前往坐标x={icon_center.x}，y={icon_center.y}调整锁定状态')
-                pyautogui.leftClick(
-                    icon_center.x,
-                    icon_center.y,
-                    duration=artifact_page.mouse_move_time,
+                corrections[item.cell] = (expect_status, level_box)
+        return corrections
+
+    def run_batch():
+        logger.info('开始扫描圣遗物列表，只截取描述区...')
+        store, scanned = scan_artifacts(
+            artifact_page,
+            logger_folder / FRAME_STORE_FILENAME,
+            max_num,
+        )
+        if store is None:
+            return
+        try:
+            corrections = recognize_stored_frames(store, scanned)
+        finally:
+            store.close(delete=True)
+
+        logger.info(f'识别结束，需要调整{len(corrections)}个圣遗物的锁定状态')
+        for cell in artifact_page.iter_cells(list(corrections)):
+            expect_status, level_box = corrections[cell]
+            desc_frame = artifact_page.frame_source.grab_region(
+                artifact_page.desc_loc)
+            correct_lock_status(expect_status, level_box, desc_frame)
+            artifact_page.move_to_artifact_list()
+
+    backend = None
+
+    def get_backend():
+        nonlocal backend
+        if backend is None:
+            if not ocr_loader.ready:
+                logger.info('等待OCR模型加载完成...')
+            backend = create_backend(ocr_loader.get(), glyph_ocr)
+        return backend
+
+    def run_serially():
+        for idx, cell in enumerate(artifact_page.iter_artifacts(max_num)):
+            logger.info(f'正在处理第{idx + 1}个圣遗物...')
+            desc_frame = artifact_page.frame_source.grab_region(
+                artifact_page.desc_loc)
+            panel_key = panel_hash(desc_frame.image)
+            cached = ocr_cache.get(panel_key)
+            if ocr_queue and not cached:
+                job = ArtifactJob(
+                    index=idx,
+                    cell=cell,
+                    desc_frame=desc_frame,
+                    panel_key=panel_key,
                 )
+                finish_jobs(ocr_queue.submit(job))
+                finish_jobs(ocr_queue.completed())
+                continue
+            try:
+                if cached:
+                    # 同样的描述区已经识别过，等级文本框用于定位锁图标
+                    artifact, level_chunk = cached
+                else:
+                    artifact, level_chunk = recognize_artifact_informations(
+                        get_backend(),
+                        desc_frame.image,
+                        line_layout,
+                    )
+                    ocr_cache.put(panel_key, artifact, level_chunk)
+            except Exception as error:
+                logger.error(f'识别圣遗物信息失败：{error}')
+                continue
 
+            expect_status = judge_artifact(artifact)
+            if expect_status == Conclusion.UNKNOWN:
+                continue
+            correct_lock_status(expect_status, level_chunk, desc_frame)
             artifact_page.move_to_artifact_list()
+        if ocr_queue:
+            finish_jobs(ocr_queue.drain())
+
+    start_time = time.perf_counter()
+    try:
+        if batch:
+            run_batch()
+        else:
+            run_serially()
     except Exception as error:
         logger.error(f'意外结束程序：{error}')
     finally:
+        if session_writer:
+            session_writer.close()
+        if ocr_queue:
+            ocr_queue.executor.shutdown(cancel_futures=True)
+        if batch_executor:
+            batch_executor.shutdown(cancel_futures=True)
+        if ocr_loader and isinstance(ocr_loader.loaded, OcrClient):
+            logger.info(f'识别由OCR服务完成：{ocr_loader.loaded.address}')
+            ocr_loader.loaded.close()
+        ocr_cache.save()
+        logger.info(f'OCR缓存命中{ocr_cache.hits}次，未命中{ocr_cache.misses}次')
+        logger.info(f'只识别固定文本行{line_layout.hits}次，'
+                    f'校验失败{line_layout.misses}次')
+        if isinstance(backend, GlyphBackend):
+            logger.info(f'字形模板识别{backend.glyph_hits}行，'
+                        f'文本缓存命中{backend.text_hits}次，'
+                        f'调用通用OCR{backend.base_calls}次')
+        elapsed = time.perf_counter() - start_time
+        logger.info(f'共处理{len(artifact_infos)}个圣遗物，耗时{elapsed:.2f}秒，'
+                    f'{len(artifact_infos) / max(elapsed, 1e-6):.2f}个/秒')
         if artifact_infos:
-            headers = list(artifact.to_dict().keys())[:5]
+            # 流水线模式下圣遗物在回调中解析，表头不依赖循环变量
+            headers = ['圣遗物名称', '类型', '主词条', '星级', '等级']
             headers += [
                 '副词条1',
                 '副词条2',
@@ -278,6 +645,8 @@ def run_pipeline(max_num: int, app_fd: str):
                 '当前是否锁',
             ]
             artifact_infos.insert(0, headers)
+            # 只在写出结果时用到，不放在模块导入时
+            import iolite
             iolite.write_csv_lines(
                 logger_folder / 'artifacts.csv',
                 artifact_infos,
@@ -289,12 +658,65 @@ def run_pipeline(max_num: int, app_fd: str):
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--max-num', type=int, default=1800)
+    parser.add_argument(
+        '--record',
+        action='store_true',
+        help='把截图和鼠标事件录制到日志目录下的session文件夹',
+    )
+    parser.add_argument(
+        '--replay',
+        default=None,
+        help='回放已录制的session文件夹，无需游戏和显示器',
+    )
+    parser.add_argument(
+        '--recalibrate',
+        action='store_true',
+        help='忽略已保存的标定档案，重新标定圣遗物页面',
+    )
+    parser.add_argument(
+        '--ocr-workers',
+        type=int,
+        default=0,
+        help='OCR进程数，大于0时识别与翻页同时进行，录制和回放时不生效',
+    )
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='先扫描全部圣遗物的截图，再用所有CPU核心并行识别，最后统一调整锁定状态',
+    )
+    parser.add_argument(
+        '--ocr-daemon',
+        default=DEFAULT_ADDRESS,
+        help='常驻OCR服务的套接字地址，服务不可用时在进程内加载OCR，设为空字符串则不连接',
+    )
+    parser.add_argument(
+        '--no-glyph-ocr',
+        dest='glyph_ocr',
+        action='store_false',
+        help='数值行也交给通用OCR识别，不使用字形模板',
+    )
+    args = parser.parse_args()
+
     app_folder = os.path.join(
         os.path.expanduser("~"),
         'Desktop',
         'GenshinMummy',
     )
 
+    if args.replay:
+        run_pipeline(
+            args.max_num,
+            app_folder,
+            replay_fd=args.replay,
+            ocr_workers=args.ocr_workers,
+            batch=args.batch,
+            ocr_daemon=args.ocr_daemon,
+            glyph_ocr=args.glyph_ocr,
+        )
+        return
+
     system = platform.system()
     is_admin = False
 
@@ -305,7 +727,16 @@ def main():
         is_admin = os.getuid() == 0
 
     if is_admin:
-        run_pipeline(1800, app_folder)
+        run_pipeline(
+            args.max_num,
+            app_folder,
+            record=args.record,
+            recalibrate=args.recalibrate,
+            ocr_workers=args.ocr_workers,
+            batch=args.batch,
+            ocr_daemon=args.ocr_daemon,
+            glyph_ocr=args.glyph_ocr,
+        )
     else:
         print("需要管理员权限打开终端哦~")
 
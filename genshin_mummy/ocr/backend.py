@@ -0,0 +1,146 @@
+"""
+OCR后端。
+
+识别流程只依赖两种操作：对整张截图做文本检测加识别，以及对一组已裁剪的
+文本行只做识别。PaddleBackend直接调用PaddleOCR（或接口相同的OcrClient）；
+GlyphBackend在其之上用字形模板识别数值行，中文行按二值化后的图像缓存文本，
+只有剩下的文本行才交给PaddleOCR。
+"""
+from collections import OrderedDict
+from enum import Enum, unique
+from typing import List, Optional, Sequence, Tuple
+
+import attrs
+import numpy as np
+
+from genshin_mummy.ocr.glyph import GlyphRecognizer, mask_key
+
+# 识别结果，文本与置信度
+Recognition = Tuple[str, float]
+
+
+@unique
+class FieldKind(Enum):
+    # 任意文本，如名称、类型与词条名
+    TEXT = 'text'
+    # 只含数字与符号，如等级、星级与主词条数值
+    NUMERIC = 'numeric'
+    # 中文词条名后接 + 与数值，如副词条
+    SUFFIXED = 'suffixed'
+
+
+class OcrBackend:
+    """OCR后端，返回值的结构与PaddleOCR一致。"""
+
+    def detect(self, image: np.ndarray):
+        """检测并识别整张截图，返回 ``PaddleOCR.ocr(image)`` 的原始结果。"""
+        raise NotImplementedError()
+
+    def recognize(
+        self,
+        crops: List[np.ndarray],
+        kinds: Optional[Sequence[FieldKind]] = None,
+    ) -> List[Recognition]:
+        """只识别一组裁剪好的文本行，按顺序返回文本与置信度。"""
+        raise NotImplementedError()
+
+
+class PaddleBackend(OcrBackend):
+
+    def __init__(self, ocr):
+        self.ocr = ocr
+
+    def detect(self, image: np.ndarray):
+        return self.ocr.ocr(image, cls=False)
+
+    def recognize(self, crops, kinds=None):
+        if not crops:
+            return []
+        # 传入一组裁剪图时PaddleOCR在一个批次中识别
+        results = self.ocr.ocr([crops], det=False, cls=False)[0]
+        return [tuple(result) for result in results or []]
+
+
+def as_backend(ocr) -> OcrBackend:
+    if isinstance(ocr, OcrBackend):
+        return ocr
+    return PaddleBackend(ocr)
+
+
+@attrs.define
+class GlyphBackend(OcrBackend):
+    base: OcrBackend = attrs.field(converter=as_backend)
+    glyphs: GlyphRecognizer = attrs.field(factory=GlyphRecognizer)
+    text_capacity: int = attrs.field(default=1024)
+    # 置信度低的识别结果既不缓存也不用于学习字形
+    min_score: float = attrs.field(default=0.9)
+    glyph_hits: int = attrs.field(init=False, default=0)
+    text_hits: int = attrs.field(init=False, default=0)
+    base_calls: int = attrs.field(init=False, default=0)
+    _texts: OrderedDict = attrs.field(init=False, factory=OrderedDict)
+
+    def detect(self, image):
+        return self.base.detect(image)
+
+    def cached_text(self, key: Optional[str]):
+        if key is None or key not in self._texts:
+            return None
+        self._texts.move_to_end(key)
+        self.text_hits += 1
+        return self._texts[key]
+
+    def cache_text(self, key: Optional[str], result: Recognition):
+        if key is None:
+            return
+        self._texts[key] = result
+        while len(self._texts) > self.text_capacity:
+            self._texts.popitem(last=False)
+
+    def recognize(self, crops, kinds=None):
+        kinds = kinds or [FieldKind.TEXT] * len(crops)
+        results: List[Optional[Recognition]] = [None] * len(crops)
+        # 副词条的数值部分，等词条名识别后再拼接
+        suffixes = {}
+        pending = []
+        for idx, (crop, kind) in enumerate(zip(crops, kinds)):
+            if kind == FieldKind.NUMERIC:
+                results[idx] = self.glyphs.recognize(crop)
+                if results[idx] is None:
+                    pending.append((idx, crop, None))
+                else:
+                    self.glyph_hits += 1
+                continue
+            if kind == FieldKind.SUFFIXED:
+                suffix = self.glyphs.recognize_suffix(crop)
+                if suffix is not None:
+                    self.glyph_hits += 1
+                    text, score, split = suffix
+                    suffixes[idx] = (text, score)
+                    crop = crop[:, :split]
+            key = mask_key(crop)
+            results[idx] = self.cached_text(key)
+            if results[idx] is None:
+                pending.append((idx, crop, key))
+
+        if pending:
+            self.base_calls += 1
+            recognized = self.base.recognize([crop for _, crop, _ in pending])
+            if len(recognized) != len(pending):
+                return []
+            for (idx, crop, key), result in zip(pending, recognized):
+                results[idx] = result
+                if result[1] < self.min_score:
+                    continue
+                text = result[0].strip()
+                if kinds[idx] == FieldKind.NUMERIC:
+                    self.glyphs.learn(crop, text)
+                    continue
+                if kinds[idx] == FieldKind.SUFFIXED and idx not in suffixes:
+                    self.glyphs.learn_suffix(crop, text)
+                    continue
+                self.cache_text(key, result)
+
+        for idx, (suffix, score) in suffixes.items():
+            text, text_score = results[idx]
+            results[idx] = (text.rstrip() + suffix, min(score, text_score))
+        return results
@@ -0,0 +1,280 @@
+"""
+常驻的OCR服务进程。
+
+服务进程持有若干个已预热的OCR实例，通过Unix套接字接收请求，
+多次运行脚本时不必每次重新加载模型。截图放在共享内存中传递，
+套接字上只传JSON描述；返回值与PaddleOCR.ocr的原始结果结构一致，
+可直接交给build_text_chunks_from_paddle_ocr。服务不可用时回退到进程内OCR。
+"""
+import argparse
+import json
+import os
+import queue
+import tempfile
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Client, Listener
+from typing import Any, Callable, List, Optional
+
+import attrs
+import numpy as np
+
+from genshin_mummy.ocr.engine import create_warm_ocr
+
+DEFAULT_ADDRESS = os.path.join(tempfile.gettempdir(), 'genshin_mummy_ocr.sock')
+FAMILY = 'AF_UNIX'
+
+
+class OcrDaemonError(RuntimeError):
+    """服务进程中识别失败，与进程内OCR抛出异常的含义相同。"""
+
+
+def to_builtin(obj):
+    # PaddleOCR的结果中混有numpy数组与标量
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f'{type(obj)} is not JSON serializable')
+
+
+def measure_images(images) -> int:
+    if isinstance(images, np.ndarray):
+        return images.nbytes
+    return sum(measure_images(item) for item in images)
+
+
+def pack_images(images, buf: memoryview, offset: int = 0):
+    """把(嵌套列表中的)图像依次写入缓冲区，返回描述结构与结束位置。"""
+    if isinstance(images, np.ndarray):
+        image = np.ascontiguousarray(images)
+        end = offset + image.nbytes
+        buf[offset:end] = image.reshape(-1).view(np.uint8)
+        layout = {
+            'offset': offset,
+            'shape': list(image.shape),
+            'dtype': image.dtype.str,
+        }
+        return layout, end
+    layouts = []
+    for item in images:
+        layout, offset = pack_images(item, buf, offset)
+        layouts.append(layout)
+    return layouts, offset
+
+
+def unpack_images(layout, buf: memoryview):
+    """按描述结构从缓冲区中拷贝出图像。"""
+    if isinstance(layout, list):
+        return [unpack_images(item, buf) for item in layout]
+    dtype = np.dtype(layout['dtype'])
+    count = int(np.prod(layout['shape']))
+    image = np.frombuffer(buf,
+                          dtype=dtype,
+                          count=count,
+                          offset=layout['offset'])
+    return image.reshape(layout['shape']).copy()
+
+
+def attach_shared_memory(name: str, owner_pid: int):
+    shm = shared_memory.SharedMemory(name=name)
+    # 共享内存归客户端所有，服务进程退出时不能被资源追踪器回收；
+    # 同一进程内的追踪记录属于客户端，不能注销
+    if owner_pid != os.getpid():
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+@attrs.define
+class OcrDaemon:
+    address: str = attrs.field(default=DEFAULT_ADDRESS)
+    num_instances: int = attrs.field(default=1)
+    factory: Callable[[], Any] = attrs.field(default=create_warm_ocr)
+    _instances: queue.Queue = attrs.field(init=False, factory=queue.Queue)
+    _listener: Optional[Listener] = attrs.field(init=False, default=None)
+    _closed: threading.Event = attrs.field(init=False, factory=threading.Event)
+
+    def listen(self):
+        """加载全部实例并开始监听，之后再调用serve_forever。"""
+        if os.path.exists(self.address):
+            if is_daemon_running(self.address):
+                raise RuntimeError(f'OCR服务已在{self.address}运行')
+            # 上次异常退出残留的套接字文件
+            os.unlink(self.address)
+        for _ in range(self.num_instances):
+            self._instances.put(self.factory())
+        self._listener = Listener(self.address, family=FAMILY)
+        return self
+
+    def serve_forever(self):
+        if self._listener is None:
+            self.listen()
+        try:
+            while not self._closed.is_set():
+                conn = self._listener.accept()
+                if self._closed.is_set():
+                    conn.close()
+                    break
+                threading.Thread(
+                    target=self.handle,
+                    args=(conn, ),
+                    daemon=True,
+                ).start()
+        finally:
+            self._listener.close()
+            self._listener = None
+
+    def shutdown(self):
+        self._closed.set()
+        if self._listener is None:
+            return
+        # 在其他线程中关闭监听套接字无法打断accept，用一次空连接唤醒
+        try:
+            Client(self.address, family=FAMILY).close()
+        except OSError:
+            pass
+
+    def handle(self, conn):
+        with conn:
+            while True:
+                try:
+                    request = json.loads(conn.recv_bytes())
+                except (EOFError, OSError):
+                    return
+                response = self.process(request)
+                conn.send_bytes(
+                    json.dumps(response, default=to_builtin).encode('utf-8'))
+
+    def process(self, request: dict):
+        if request.get('op') == 'ping':
+            return {'ok': True}
+        try:
+            shm = attach_shared_memory(request['shm'], request['pid'])
+            try:
+                images = unpack_images(request['images'], shm.buf)
+            finally:
+                shm.close()
+            ocr = self._instances.get()
+            try:
+                result = ocr.ocr(
+                    images,
+                    det=request['det'],
+                    cls=request['cls'],
+                )
+            finally:
+                self._instances.put(ocr)
+        except Exception as error:
+            return {'ok': False, 'error': f'{type(error).__name__}: {error}'}
+        return {'ok': True, 'result': result}
+
+
+def is_daemon_running(address: str = DEFAULT_ADDRESS):
+    try:
+        with Client(address, family=FAMILY) as conn:
+            conn.send_bytes(json.dumps({'op': 'ping'}).encode('utf-8'))
+            return json.loads(conn.recv_bytes()).get('ok', False)
+    except (OSError, EOFError, ValueError):
+        # Windows上没有AF_UNIX时抛出ValueError
+        return False
+
+
+@attrs.define
+class OcrClient:
+    """与PaddleOCR.ocr接口一致的客户端，连接断开后改用fallback创建的实例。"""
+    address: str = attrs.field(default=DEFAULT_ADDRESS)
+    fallback: Optional[Callable[[], Any]] = attrs.field(default=None)
+    _conn: Any = attrs.field(init=False, default=None)
+    _shm: Optional[shared_memory.SharedMemory] = attrs.field(init=False,
+                                                             default=None)
+    _local: Any = attrs.field(init=False, default=None)
+
+    @property
+    def connected(self):
+        return self._conn is not None
+
+    def connect(self):
+        self._conn = Client(self.address, family=FAMILY)
+        self._request({'op': 'ping'})
+        return self
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def _request(self, request: dict):
+        self._conn.send_bytes(json.dumps(request).encode('utf-8'))
+        response = json.loads(self._conn.recv_bytes())
+        if not response['ok']:
+            raise OcrDaemonError(response['error'])
+        return response.get('result')
+
+    def _reserve(self, size: int):
+        # 共享内存按需扩容并在多次请求间复用
+        if self._shm is not None and self._shm.size >= size:
+            return self._shm
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        return self._shm
+
+    def ocr(self, img, det: bool = True, cls: bool = True):
+        if self._local is not None:
+            return self._local.ocr(img, det=det, cls=cls)
+        try:
+            shm = self._reserve(measure_images(img))
+            layout, _ = pack_images(img, shm.buf)
+            return self._request({
+                'op': 'ocr',
+                'shm': shm.name,
+                'pid': os.getpid(),
+                'images': layout,
+                'det': det,
+                'cls': cls,
+            })
+        except (OSError, EOFError):
+            if self.fallback is None:
+                raise
+            self.close()
+            self._local = self.fallback()
+            return self._local.ocr(img, det=det, cls=cls)
+
+
+def connect_or_create_ocr(
+    address: Optional[str] = DEFAULT_ADDRESS,
+    fallback: Callable[[], Any] = create_warm_ocr,
+):
+    """优先连接OCR服务，服务不可用时在进程内创建。"""
+    if address and os.path.exists(address):
+        try:
+            return OcrClient(address, fallback=fallback).connect()
+        except (OSError, EOFError, ValueError, OcrDaemonError):
+            pass
+    return fallback()
+
+
+def main(args: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--address', default=DEFAULT_ADDRESS)
+    parser.add_argument(
+        '--instances',
+        type=int,
+        default=1,
+        help='常驻的OCR实例数，可同时处理的请求数',
+    )
+    args = parser.parse_args(args)
+
+    daemon = OcrDaemon(address=args.address, num_instances=args.instances)
+    daemon.listen()
+    print(f'OCR服务已启动：{args.address}')
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+OCR模型的延迟加载与预热。
+
+导入paddleocr与构建模型都要数秒，首次推理还要额外初始化。
+在后台线程中完成这些工作，与启动倒计时、页面标定同时进行，
+第一次识别前再等待加载结果。
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+import attrs
+import cv2
+import numpy as np
+
+# 预热用的文本，检测与识别模型都会被执行一次
+WARM_UP_TEXT = '+20 15.6%'
+
+
+def create_ocr():
+    # 延迟导入，只导入paddleocr本身就需要数秒
+    from paddleocr import PaddleOCR
+    return PaddleOCR(use_angle_cls=False, lang="ch")
+
+
+def warm_up(ocr):
+    """用一张合成的文本图完成首次推理。"""
+    image = np.full((48, 320, 3), 255, dtype=np.uint8)
+    cv2.putText(
+        image,
+        WARM_UP_TEXT,
+        (8, 34),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        1,
+        (0, 0, 0),
+        2,
+    )
+    ocr.ocr(image, cls=False)
+    return ocr
+
+
+def create_warm_ocr():
+    return warm_up(create_ocr())
+
+
+@attrs.define
+class OcrLoader:
+    factory: Callable[[], Any] = attrs.field(default=create_warm_ocr)
+    _future: Optional[Future] = attrs.field(init=False, default=None)
+
+    @property
+    def started(self):
+        return self._future is not None
+
+    @property
+    def ready(self):
+        return self.started and self._future.done()
+
+    @property
+    def loaded(self):
+        """已成功加载的实例，尚未完成或加载失败时为None。"""
+        if not self.ready or self._future.exception() is not None:
+            return None
+        return self._future.result()
+
+    def start(self):
+        """在后台线程中开始加载，重复调用无效果。"""
+        if self.started:
+            return self
+        executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix='ocr_loader',
+        )
+        self._future = executor.submit(self.factory)
+        # 任务完成后线程自动退出
+        executor.shutdown(wait=False)
+        return self
+
+    def get(self, timeout: Optional[float] = None):
+        """等待加载完成并返回OCR实例，加载失败时抛出原异常。"""
+        self.start()
+        return self._future.result(timeout)
+
+
+def warm_up_pool(executor, num_workers: int):
+    """提交空任务，让进程池提前启动工作进程并执行初始化。"""
+    return [executor.submit(int) for _ in range(num_workers)]
@@ -0,0 +1,228 @@
+"""
+基于字形模板的数值识别。
+
+等级、星级与词条数值只由少量字符组成，且始终使用同一种游戏字体。
+模板从游戏实际渲染的文本中学习：通用OCR识别出的数值行若能切分出
+与文本等长的字形，就把每个字形记为对应字符的样本。之后同类文本行
+只需二值化、按列切分并与模板比较，不再经过通用OCR。
+"""
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+import attrs
+import cv2
+import numpy as np
+
+PLUS_CHAR = '+'
+GLYPH_CHARS = f'0123456789{PLUS_CHAR}%.★·'
+# 未学过的字符会被误认成最像的已知字符，这些字符都学到后才开始识别
+REQUIRED_CHARS = f'0123456789{PLUS_CHAR}%.★'
+# 字形按自身外框归一化后的尺寸（宽，高），不同字号的同一字符形状一致
+GLYPH_SIZE = (12, 16)
+# 最亮与最暗像素差小于该值时认为没有文字
+MIN_CONTRAST = 40
+# 宽高比差异折算为像素差异的权重
+ASPECT_WEIGHT = 0.2
+# 字形在行内的垂直位置与相对高度，用于区分 . 与 · 这类形状相同的字形；
+# 同一字符在纯数字行与带汉字的行中位置略有不同，权重不宜过大
+POSITION_WEIGHT = 0.1
+# 低于行高该比例的字形（. 与 ·）只有几个像素，放大后全是锯齿，只比较外形
+SMALL_GLYPH_RATIO = 0.35
+
+
+@attrs.define
+class Glyph:
+    left: int = attrs.field()
+    right: int = attrs.field()
+    feature: np.ndarray = attrs.field()
+    # 宽高比，以及相对整行的中心高度与高度
+    shape: np.ndarray = attrs.field()
+
+
+def binarize(image: np.ndarray) -> np.ndarray:
+    """返回文字像素为True的掩码，文字颜色深浅不限。"""
+    gray = image
+    if gray.ndim == 3:
+        gray = cv2.cvtColor(gray, cv2.COLOR_RGB2GRAY)
+    if gray.size == 0 or int(gray.max()) - int(gray.min()) < MIN_CONTRAST:
+        return np.zeros(gray.shape[:2], dtype=bool)
+    _, thres = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    mask = thres > 0
+    # 文字像素总是少于背景
+    if np.count_nonzero(mask) * 2 > mask.size:
+        mask = ~mask
+    return mask
+
+
+def find_runs(flags: np.ndarray) -> List[Tuple[int, int]]:
+    """连续为True的区间，左闭右开。"""
+    padded = np.concatenate(([False], flags, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+
+def text_band(mask: np.ndarray) -> Optional[Tuple[int, int]]:
+    """最高的一段连续有文字的行，裁剪框上下可能带入相邻行的残影。"""
+    runs = find_runs(mask.any(axis=1))
+    if not runs:
+        return None
+    return max(runs, key=lambda run: run[1] - run[0])
+
+
+def segment_glyphs(image: np.ndarray) -> List[Glyph]:
+    mask = binarize(image)
+    band = text_band(mask)
+    if band is None:
+        return []
+    top, bottom = band
+    line = mask[top:bottom]
+    line_height = bottom - top
+    glyphs = []
+    for left, right in find_runs(line.any(axis=0)):
+        rows = np.flatnonzero(line[:, left:right].any(axis=1))
+        glyph_top, glyph_bottom = rows[0], rows[-1] + 1
+        height = glyph_bottom - glyph_top
+        if height < SMALL_GLYPH_RATIO * line_height:
+            feature = np.ones(GLYPH_SIZE[0] * GLYPH_SIZE[1], dtype=np.float32)
+        else:
+            feature = cv2.resize(
+                line[glyph_top:glyph_bottom, left:right].astype(np.float32),
+                GLYPH_SIZE,
+                interpolation=cv2.INTER_AREA,
+            ).reshape(-1)
+        shape = np.array([
+            ASPECT_WEIGHT * (right - left) / height,
+            POSITION_WEIGHT * (glyph_top + glyph_bottom) / 2 / line_height,
+            POSITION_WEIGHT * height / line_height,
+        ])
+        glyphs.append(
+            Glyph(left=left, right=right, feature=feature, shape=shape))
+    return glyphs
+
+
+def mask_key(image: np.ndarray) -> Optional[str]:
+    """二值化并去掉空白边后的摘要，同样的文字在不同位置得到相同的键。"""
+    mask = binarize(image)
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    if rows.size == 0:
+        return None
+    mask = mask[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+    digest = hashlib.blake2b(np.packbits(mask).tobytes(),
+                             digest_size=16).hexdigest()
+    return f'{mask.shape[1]}x{mask.shape[0]}:{digest}'
+
+
+@attrs.define
+class GlyphRecognizer:
+    # 平均像素差与外形差异之和超过该值时拒识
+    max_distance: float = attrs.field(default=0.12)
+    _sums: Dict[str, np.ndarray] = attrs.field(init=False, factory=dict)
+    _shape_sums: Dict[str, np.ndarray] = attrs.field(init=False, factory=dict)
+    _counts: Dict[str, int] = attrs.field(init=False, factory=dict)
+    _chars: List[str] = attrs.field(init=False, factory=list)
+    _features: Optional[np.ndarray] = attrs.field(init=False, default=None)
+    _shapes: Optional[np.ndarray] = attrs.field(init=False, default=None)
+
+    @property
+    def known_chars(self):
+        return ''.join(sorted(self._counts))
+
+    @property
+    def ready(self):
+        return all(char in self._counts for char in REQUIRED_CHARS)
+
+    def _rebuild(self):
+        self._chars = list(self._counts)
+        self._features = np.stack(
+            [self._sums[char] / self._counts[char] for char in self._chars])
+        self._shapes = np.stack([
+            self._shape_sums[char] / self._counts[char] for char in self._chars
+        ])
+
+    def match(self, glyphs: List[Glyph]) -> Tuple[List[str], np.ndarray]:
+        """一次比较所有字形，返回各自最像的字符与距离。"""
+        features = np.stack([glyph.feature for glyph in glyphs])
+        shapes = np.stack([glyph.shape for glyph in glyphs])
+        distances = np.abs(features[:, None] -
+                           self._features[None]).mean(axis=2)
+        distances += np.abs(shapes[:, None] - self._shapes[None]).sum(axis=2)
+        indices = distances.argmin(axis=1)
+        chars = [self._chars[idx] for idx in indices]
+        return chars, distances[np.arange(len(glyphs)), indices]
+
+    def distance_to(self, char: str, glyph: Glyph):
+        if char not in self._counts:
+            return 0.0
+        count = self._counts[char]
+        distance = np.abs(self._sums[char] / count - glyph.feature).mean()
+        return distance + np.abs(self._shape_sums[char] / count -
+                                 glyph.shape).sum()
+
+    def _learn_glyphs(self, glyphs: List[Glyph], text: str):
+        if len(glyphs) != len(text) or not all(char in GLYPH_CHARS
+                                               for char in text):
+            return False
+        # 与已有模板明显不符时说明切分或标注有误，整行都不学习
+        if any(
+                self.distance_to(char, glyph) > self.max_distance
+                for char, glyph in zip(text, glyphs)):
+            return False
+        for char, glyph in zip(text, glyphs):
+            if char in self._counts:
+                self._sums[char] += glyph.feature
+                self._shape_sums[char] += glyph.shape
+                self._counts[char] += 1
+            else:
+                self._sums[char] = glyph.feature.copy()
+                self._shape_sums[char] = glyph.shape.copy()
+                self._counts[char] = 1
+        self._rebuild()
+        return True
+
+    def learn(self, image: np.ndarray, text: str):
+        """用一行已知文本的截图学习字形，返回是否被采用。"""
+        return self._learn_glyphs(segment_glyphs(image), text.replace(' ', ''))
+
+    def learn_suffix(self, image: np.ndarray, text: str):
+        """只学习最后一个 + 及其之后的数值，如副词条。"""
+        idx = text.rfind(PLUS_CHAR)
+        if idx < 0:
+            return False
+        suffix = text[idx:].replace(' ', '')
+        glyphs = segment_glyphs(image)
+        if len(glyphs) <= len(suffix):
+            return False
+        return self._learn_glyphs(glyphs[-len(suffix):], suffix)
+
+    def recognize(self, image: np.ndarray) -> Optional[Tuple[str, float]]:
+        """识别整行，有无法匹配的字形时返回None。"""
+        if not self.ready:
+            return None
+        glyphs = segment_glyphs(image)
+        if not glyphs:
+            return None
+        chars, distances = self.match(glyphs)
+        worst = float(distances.max())
+        if worst > self.max_distance:
+            return None
+        return ''.join(chars), 1 - worst
+
+    def recognize_suffix(
+        self,
+        image: np.ndarray,
+    ) -> Optional[Tuple[str, float, int]]:
+        """从右向左识别到 + 为止，返回数值文本、置信度与 + 的左边界。"""
+        if not self.ready:
+            return None
+        glyphs = segment_glyphs(image)
+        if len(glyphs) < 2:
+            return None
+        chars, distances = self.match(glyphs)
+        for idx in range(len(glyphs) - 1, 0, -1):
+            if distances[idx] > self.max_distance:
+                return None
+            if chars[idx] == PLUS_CHAR:
+                worst = float(distances[idx:].max())
+                return ''.join(chars[idx:]), 1 - worst, glyphs[idx].left
+        return None
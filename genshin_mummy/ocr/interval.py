@@ -0,0 +1,107 @@
+"""
+一维区间的重叠查询。
+
+文本块的上下（左右）关联需要对每个文本块找出排序后与之有正长度重叠的
+前一个或后一个文本块。端点离散化后用线段树记录每一小段被哪些区间覆盖过，
+按序号顺序插入并查询，总复杂度 O(n log n)。
+"""
+import math
+from bisect import bisect_left
+from typing import List, Optional, Sequence, Tuple
+
+import attrs
+
+Interval = Tuple[float, float]
+
+
+@attrs.define
+class MinIntervalIndex:
+    """对离散化后的小段做区间取最小值更新与区间最小值查询。"""
+    size: int = attrs.field()
+    # _tags[node] 作用于该节点的整个范围，_mins[node] 为子树内的最小值
+    _tags: List[float] = attrs.field(init=False)
+    _mins: List[float] = attrs.field(init=False)
+
+    def __attrs_post_init__(self):
+        self._tags = [math.inf] * (4 * max(self.size, 1))
+        self._mins = [math.inf] * (4 * max(self.size, 1))
+
+    def update(self, start: int, end: int, value: float):
+        """把 [start, end) 内每一小段的值更新为与value中较小者。"""
+        if start < end:
+            self._update(1, 0, self.size, start, end, value)
+
+    def _update(self, node, lo, hi, start, end, value):
+        if start <= lo and hi <= end:
+            self._tags[node] = min(self._tags[node], value)
+            self._mins[node] = min(self._mins[node], value)
+            return
+        mid = (lo + hi) // 2
+        if start < mid:
+            self._update(2 * node, lo, mid, start, end, value)
+        if mid < end:
+            self._update(2 * node + 1, mid, hi, start, end, value)
+        self._mins[node] = min(self._tags[node], self._mins[2 * node],
+                               self._mins[2 * node + 1])
+
+    def query(self, start: int, end: int) -> float:
+        """[start, end) 内的最小值，没有被更新过时为inf。"""
+        if start >= end:
+            return math.inf
+        return self._query(1, 0, self.size, start, end)
+
+    def _query(self, node, lo, hi, start, end):
+        if start <= lo and hi <= end:
+            return self._mins[node]
+        mid = (lo + hi) // 2
+        result = self._tags[node]
+        if start < mid:
+            result = min(result, self._query(2 * node, lo, mid, start, end))
+        if mid < end:
+            result = min(result, self._query(2 * node + 1, mid, hi, start,
+                                             end))
+        return result
+
+
+def compress(intervals: Sequence[Interval]):
+    """端点离散化，返回每个区间覆盖的小段范围与小段数量。"""
+    coords = sorted({value for interval in intervals for value in interval})
+    spans = []
+    for start, end in intervals:
+        if end > start:
+            spans.append((bisect_left(coords, start), bisect_left(coords,
+                                                                  end)))
+        else:
+            # 长度不为正的区间与任何区间都没有正长度重叠
+            spans.append((0, 0))
+    return spans, max(len(coords) - 1, 0)
+
+
+def first_overlapping_successors(
+        intervals: Sequence[Interval]) -> List[Optional[int]]:
+    """对每个区间，找出序号在其之后、与之重叠的第一个区间的序号。"""
+    spans, size = compress(intervals)
+    index = MinIntervalIndex(size)
+    successors: List[Optional[int]] = [None] * len(spans)
+    # 倒序插入，查询到的最小序号即为之后最近的区间
+    for idx in range(len(spans) - 1, -1, -1):
+        start, end = spans[idx]
+        found = index.query(start, end)
+        if found < math.inf:
+            successors[idx] = int(found)
+        index.update(start, end, idx)
+    return successors
+
+
+def first_overlapping_predecessors(
+        intervals: Sequence[Interval]) -> List[Optional[int]]:
+    """对每个区间，找出序号在其之前、与之重叠的序号最小的区间。"""
+    spans, size = compress(intervals)
+    index = MinIntervalIndex(size)
+    predecessors: List[Optional[int]] = [None] * len(spans)
+    for idx, (start, end) in enumerate(spans):
+        found = index.query(start, end)
+        if found < math.inf:
+            predecessors[idx] = int(found)
+        index.update(start, end, idx)
+    return predecessors
@@ -0,0 +1,137 @@
+"""
+文本块集合的查询索引。
+
+解析一个圣遗物要对同一批文本做多次近似、前缀与正则查询，
+索引在第一次查询时才建立：
+    排序后的文本数组，前缀查询二分定位；
+    字符倒排索引，按共有字符数给出相似度上界，只对可能满足阈值的文本计算相似度；
+    编译后的正则缓存，正则以固定文本开头时先用前缀索引缩小范围。
+集合建立后不再变化，同样的查询直接返回上次的结果。
+"""
+import re
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple, Union
+
+import attrs
+
+# 正则中有特殊含义的字符
+REGEX_META_CHARS = '.^$*+?{}[]\\|()'
+# 跟在字符后面时使该字符可以不出现的量词
+OPTIONAL_QUANTIFIERS = '*?{'
+
+Pattern = Union[str, re.Pattern]
+
+
+@lru_cache(maxsize=256)
+def compile_pattern(pattern: str) -> re.Pattern:
+    return re.compile(pattern)
+
+
+def literal_prefix(pattern: re.Pattern) -> str:
+    """re.match 匹配成功时文本必定以之开头的固定前缀，无法确定时为空。"""
+    if pattern.flags & (re.IGNORECASE | re.VERBOSE):
+        return ''
+    source = pattern.pattern
+    if not isinstance(source, str) or '|' in source:
+        return ''
+    chars = []
+    idx = 0
+    while idx < len(source):
+        char = source[idx]
+        step = 1
+        if char == '\\':
+            # 只有转义的符号是字面字符，\d \w 等是字符类
+            if idx + 1 >= len(source) or source[idx + 1].isalnum():
+                break
+            char = source[idx + 1]
+            step = 2
+        elif char in REGEX_META_CHARS:
+            break
+        following = source[idx + step:idx + step + 1]
+        if following and following in OPTIONAL_QUANTIFIERS:
+            break
+        chars.append(char)
+        idx += step
+    return ''.join(chars)
+
+
+@attrs.define
+class TextIndex:
+    # 文本按首次出现的顺序排列，查询结果按该顺序合并，与逐个遍历一致
+    keys: Sequence[str] = attrs.field()
+    _sorted_keys: List[str] = attrs.field(init=False)
+    _ranks: Dict[str, int] = attrs.field(init=False)
+    _postings: Dict[str, List[Tuple[int, int]]] = attrs.field(init=False)
+    _results: Dict[tuple, List[str]] = attrs.field(init=False, factory=dict)
+
+    def __attrs_post_init__(self):
+        self._ranks = {key: rank for rank, key in enumerate(self.keys)}
+        self._sorted_keys = sorted(self.keys)
+        self._postings = defaultdict(list)
+        for rank, key in enumerate(self.keys):
+            for char, count in Counter(key).items():
+                self._postings[char].append((rank, count))
+
+    def _in_order(self, keys: List[str]) -> List[str]:
+        return sorted(keys, key=self._ranks.__getitem__)
+
+    def _startswith(self, prefix: str) -> List[str]:
+        start = bisect_left(self._sorted_keys, prefix)
+        end = start
+        while end < len(self._sorted_keys):
+            if not self._sorted_keys[end].startswith(prefix):
+                break
+            end += 1
+        return self._sorted_keys[start:end]
+
+    def startswith(self, prefix: str) -> List[str]:
+        query = ('startswith', prefix)
+        if query not in self._results:
+            self._results[query] = self._in_order(self._startswith(prefix))
+        return self._results[query]
+
+    def similar(self, text: str, conf: float) -> List[str]:
+        """SequenceMatcher(a=text, b=key).ratio() 大于conf的文本。"""
+        query = ('similar', text, conf)
+        if query in self._results:
+            return self._results[query]
+        if conf < 0:
+            candidates = range(len(self.keys))
+        else:
+            # 匹配的字符数不会超过两者共有的字符数
+            common = Counter()
+            for char, count in Counter(text).items():
+                for rank, key_count in self._postings.get(char, ()):
+                    common[rank] += min(count, key_count)
+            candidates = []
+            for rank, num in sorted(common.items()):
+                total = len(text) + len(self.keys[rank])
+                if 2 * num / total > conf:
+                    candidates.append(rank)
+        keys = []
+        for rank in candidates:
+            key = self.keys[rank]
+            if SequenceMatcher(a=text, b=key).ratio() > conf:
+                keys.append(key)
+        self._results[query] = keys
+        return keys
+
+    def match(self, pattern: Pattern) -> List[str]:
+        """re.match 能匹配出非空文本的文本。"""
+        if isinstance(pattern, str):
+            pattern = compile_pattern(pattern)
+        query = ('match', pattern)
+        if query in self._results:
+            return self._results[query]
+        prefix = literal_prefix(pattern)
+        candidates = self._startswith(prefix) if prefix else self.keys
+        keys = []
+        for key in candidates:
+            result = pattern.match(key)
+            if result and result.group():
+                keys.append(key)
+        self._results[query] = self._in_order(keys)
+        return self._results[query]
@@ -1,10 +1,13 @@
-import re
 from collections import defaultdict
-from difflib import SequenceMatcher
 from enum import Enum, unique
-from typing import DefaultDict, List, Optional, Sequence
+from typing import DefaultDict, List, Optional, Sequence, Tuple
 
 import attrs
+from genshin_mummy.ocr.interval import (
+    first_overlapping_predecessors,
+    first_overlapping_successors,
+)
+from genshin_mummy.ocr.text_index import Pattern, TextIndex
 from genshin_mummy.type import Box, Direction
 
 
@@ -18,6 +21,31 @@ class TextChunk(Box):
     bottom_text_chunk: Optional['TextChunk'] = attrs.field(default=None)
 
 
+def link_neighbors(
+    sorted_chunks: Sequence[TextChunk],
+    intervals: Sequence[Tuple[float, float]],
+    prev_attr: str,
+    next_attr: str,
+):
+    """按排序关联相邻文本块，intervals为垂直于排序方向的投影区间。
+
+    每个文本块的后继为其后第一个投影有重叠的文本块；被多个文本块选为后继时，
+    前驱取其中最靠后的一个；没有被选为后继的文本块，前驱取其前第一个（最靠前的）
+    投影有重叠的文本块。
+    """
+    successors = first_overlapping_successors(intervals)
+    for idx, succ_idx in enumerate(successors):
+        if succ_idx is None:
+            continue
+        setattr(sorted_chunks[idx], next_attr, sorted_chunks[succ_idx])
+        setattr(sorted_chunks[succ_idx], prev_attr, sorted_chunks[idx])
+    predecessors = first_overlapping_predecessors(intervals)
+    for idx, pred_idx in enumerate(predecessors):
+        if pred_idx is None or getattr(sorted_chunks[idx], prev_attr):
+            continue
+        setattr(sorted_chunks[idx], prev_attr, sorted_chunks[pred_idx])
+
+
 @attrs.define
 class TextChunkCollection:
     text_chunks: Sequence[TextChunk] = attrs.field()
@@ -25,6 +53,9 @@ class TextChunkCollection:
         init=False)
     text_to_text_chunks: DefaultDict[str,
                                      List[TextChunk]] = attrs.field(init=False)
+    # 左右关联默认不建立，需要时再打开
+    link_horizontally: bool = attrs.field(default=False, kw_only=True)
+    _text_index: Optional[TextIndex] = attrs.field(init=False, default=None)
 
     def __attrs_post_init__(self):
         self.text_to_text_chunks = defaultdict(list)
@@ -32,56 +63,48 @@ class TextChunkCollection:
             self.text_to_text_chunks[ck.text].append(ck)
         top_sorted_chunks = sorted(self.text_chunks, key=lambda ck: ck.top)
         self.top_sorted_text_chunks = top_sorted_chunks
-        for outer_idx, outer_ck in enumerate(top_sorted_chunks):
-            for inner_idx, inner_ck in enumerate(top_sorted_chunks):
-                if inner_idx <= outer_idx:
-                    continue
-                overlap = outer_ck.horizontal_edge_overlap(inner_ck)
-                if overlap > 0:
-                    outer_ck.bottom_text_chunk = inner_ck
-                    inner_ck.top_text_chunk = outer_ck
-                    break
-        for outer_idx, outer_ck in enumerate(top_sorted_chunks[::-1]):
-            if outer_ck.top_text_chunk:
-                continue
-            for inner_idx, inner_ck in enumerate(top_sorted_chunks[::-1]):
-                if inner_idx <= outer_idx:
-                    continue
-                overlap = outer_ck.horizontal_edge_overlap(inner_ck)
-                if overlap > 0:
-                    outer_ck.top_text_chunk = inner_ck
-                    if inner_ck.bottom_text_chunk is None:
-                        inner_ck.bottom_text_chunk = outer_ck
+        link_neighbors(
+            top_sorted_chunks,
+            [(ck.left, ck.right) for ck in top_sorted_chunks],
+            prev_attr='top_text_chunk',
+            next_attr='bottom_text_chunk',
+        )
+        if self.link_horizontally:
+            left_sorted_chunks = sorted(self.text_chunks,
+                                        key=lambda ck: ck.left)
+            link_neighbors(
+                left_sorted_chunks,
+                [(ck.top, ck.bottom) for ck in left_sorted_chunks],
+                prev_attr='left_text_chunk',
+                next_attr='right_text_chunk',
+            )
+
+    @property
+    def text_index(self) -> TextIndex:
+        # 第一次查询时才建立索引
+        if self._text_index is None:
+            self._text_index = TextIndex(list(self.text_to_text_chunks))
+        return self._text_index
+
+    def collect(self, keys: List[str]):
+        matched_chunks: List[TextChunk] = []
+        for key in keys:
+            matched_chunks.extend(self.text_to_text_chunks[key])
+        matched_chunks.sort(key=lambda ck: ck.top)
+        return matched_chunks
 
     def find(self, text: str, conf: Optional[float] = None):
         if text in self.text_to_text_chunks:
             return self.text_to_text_chunks[text]
         elif conf:
-            matched_chunks: List[TextChunk] = []
-            for key, chunks in self.text_to_text_chunks.items():
-                matcher = SequenceMatcher(a=text, b=key)
-                if matcher.ratio() > conf:
-                    matched_chunks.extend(chunks)
-            matched_chunks.sort(key=lambda ck: ck.top)
-            return matched_chunks
+            return self.collect(self.text_index.similar(text, conf))
         return []
 
-    def find_pattern(self, pattern: str):
-        matched_chunks: List[TextChunk] = []
-        for text, chunks in self.text_to_text_chunks.items():
-            result = re.match(pattern, text)
-            if result and result.group():
-                matched_chunks.extend(chunks)
-        matched_chunks.sort(key=lambda ck: ck.top)
-        return matched_chunks
+    def find_pattern(self, pattern: Pattern):
+        return self.collect(self.text_index.match(pattern))
 
     def find_startswith(self, prefix: str):
-        matched_chunks: List[TextChunk] = []
-        for text, chunks in self.text_to_text_chunks.items():
-            if text.startswith(prefix):
-                matched_chunks.extend(chunks)
-        matched_chunks.sort(key=lambda ck: ck.top)
-        return matched_chunks
+        return self.collect(self.text_index.startswith(prefix))
 
     def find_by_index(self, direction: Direction, idx: int):
         if direction == Direction.VERT:
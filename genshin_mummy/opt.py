@@ -1,9 +1,11 @@
-from typing import Union
+from typing import List, Optional, Sequence, Tuple, Union
 
+import attrs
+import cv2
 import numpy as np
-import pyautogui
 from PIL.Image import Image as PILImage
 
+from .tools.controller import Controller, create_controller
 from .type import Box, Point
 
 
@@ -11,11 +13,14 @@ def ensure_mouse_in_safe_location(
     loc: Union[Box, Point],
     duration: float = 0.2,
     use_box_center: bool = False,
+    controller: Optional[Controller] = None,
 ):
-    x, y = pyautogui.position()
+    if controller is None:
+        controller = create_controller()
+    x, y = controller.position()
     if isinstance(loc, Box):
         if use_box_center:
-            pyautogui.moveTo(loc.center_x, loc.center_y, duration)
+            controller.moveTo(loc.center_x, loc.center_y, duration)
             return
         safety_ratio = 0.1
         safety_offset = 5
@@ -27,27 +32,146 @@ def ensure_mouse_in_safe_location(
         bottom = loc.bottom - vert_safety_offset
         if left < x < right and top < y < bottom:
             return
-        pyautogui.moveTo(loc.center_x, loc.center_y, duration)
+        controller.moveTo(loc.center_x, loc.center_y, duration)
     elif isinstance(loc, Point):
         if loc.x != x or loc.y != y:
-            pyautogui.moveTo(loc.x, loc.y, duration)
+            controller.moveTo(loc.x, loc.y, duration)
     else:
         raise NotImplementedError()
 
 
+def to_array(image: Union[np.ndarray, PILImage]) -> np.ndarray:
+    if isinstance(image, PILImage):
+        return np.asarray(image)
+    return image
+
+
+@attrs.define
+class ChangeDetector:
+    """两帧之间的变化检测，所有中间结果都写入预分配的缓冲区。
+
+    返回的差异图是内部缓冲区的视图，下一次调用时会被覆盖，需要保留时请自行拷贝。
+    scale 大于 1 时先按最近邻降采样再比较，得到的区域会换算回原图坐标。
+    """
+    # 通道差的最大值超过该值才认为像素发生变化，0 表示任意差异
+    pixel_thres: int = attrs.field(default=0)
+    scale: int = attrs.field(default=1)
+    _abs_diff: Optional[np.ndarray] = attrs.field(init=False, default=None)
+    _channel_max: Optional[np.ndarray] = attrs.field(init=False, default=None)
+    _mask: Optional[np.ndarray] = attrs.field(init=False, default=None)
+    _small: Optional[List[np.ndarray]] = attrs.field(init=False, default=None)
+
+    def _ensure_buffers(self, shape: Tuple[int, ...]):
+        if self._abs_diff is not None and self._abs_diff.shape == shape:
+            return
+        self._abs_diff = np.empty(shape, dtype=np.uint8)
+        self._channel_max = np.empty(shape[:2], dtype=np.uint8)
+        self._mask = np.empty(shape[:2], dtype=np.uint8)
+
+    def _downsample(self, im1: np.ndarray, im2: np.ndarray):
+        height = im1.shape[0] // self.scale
+        width = im1.shape[1] // self.scale
+        shape = (height, width) + im1.shape[2:]
+        if self._small is None or self._small[0].shape != shape:
+            self._small = [np.empty(shape, dtype=np.uint8) for _ in range(2)]
+        for image, small in zip((im1, im2), self._small):
+            cv2.resize(image, (width, height),
+                       dst=small,
+                       interpolation=cv2.INTER_NEAREST)
+        return self._small
+
+    def diff(
+        self,
+        im1: Union[np.ndarray, PILImage],
+        im2: Union[np.ndarray, PILImage],
+    ) -> np.ndarray:
+        im1 = to_array(im1)
+        im2 = to_array(im2)
+        assert im1.shape == im2.shape
+        if self.scale > 1:
+            im1, im2 = self._downsample(im1, im2)
+        self._ensure_buffers(im1.shape)
+        # uint8 直接相减会回绕，absdiff 是饱和的
+        cv2.absdiff(im1, im2, dst=self._abs_diff)
+        if self._abs_diff.ndim == 3:
+            np.maximum(self._abs_diff[..., 0],
+                       self._abs_diff[..., 1],
+                       out=self._channel_max)
+            for channel in range(2, self._abs_diff.shape[2]):
+                np.maximum(self._channel_max,
+                           self._abs_diff[..., channel],
+                           out=self._channel_max)
+        else:
+            self._channel_max[...] = self._abs_diff
+        cv2.threshold(self._channel_max,
+                      self.pixel_thres,
+                      255,
+                      cv2.THRESH_BINARY,
+                      dst=self._mask)
+        return self._mask
+
+    def changed_ratio(
+        self,
+        im1: Union[np.ndarray, PILImage],
+        im2: Union[np.ndarray, PILImage],
+    ) -> float:
+        mask = self.diff(im1, im2)
+        return cv2.countNonZero(mask) / mask.size
+
+    def locate_roi(self, diffs: np.ndarray, diff_thres_ratio: float):
+        """在 diff 得到的差异图上定位变化区域，坐标为原图坐标。"""
+        roi = locate_roi_location_from_diffs(diffs, diff_thres_ratio)
+        if roi is None or self.scale == 1:
+            return roi
+        return Box(
+            left=roi.left * self.scale,
+            top=roi.top * self.scale,
+            width=roi.width * self.scale,
+            height=roi.height * self.scale,
+        )
+
+    def diff_batch(
+        self,
+        pairs: Sequence[Tuple[Union[np.ndarray, PILImage], Union[np.ndarray,
+                                                                 PILImage]]],
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """逐对比较多组帧，差异图堆叠成 (N, H, W) 的数组返回。"""
+        for idx, (im1, im2) in enumerate(pairs):
+            mask = self.diff(im1, im2)
+            if out is None:
+                out = np.empty((len(pairs), ) + mask.shape, dtype=np.uint8)
+            out[idx] = mask
+        return out
+
+    def locate_roi_batch(
+        self,
+        pairs: Sequence[Tuple[Union[np.ndarray, PILImage], Union[np.ndarray,
+                                                                 PILImage]]],
+        diff_thres_ratio: float,
+    ) -> List[Optional[Box]]:
+        return [
+            self.locate_roi(self.diff(im1, im2), diff_thres_ratio)
+            for im1, im2 in pairs
+        ]
+
+
 def diff_two_images(
     im1: Union[np.ndarray, PILImage],
     im2: Union[np.ndarray, PILImage],
 ):
-    if isinstance(im1, PILImage):
-        im1 = np.asarray(im1)
-    if isinstance(im2, PILImage):
-        im2 = np.asarray(im2)
-    assert im1.shape == im2.shape
-    diff = np.sum(im1 - im2, axis=-1)
-    mask = np.full(im1.shape[:2], 255, dtype=np.uint8)
-    mask[diff == 0] = 0
-    return mask
+    # 每次调用都新建缓冲区，频繁调用时请复用 ChangeDetector
+    return ChangeDetector().diff(im1, im2)
+
+
+def first_above(values: np.ndarray, thres: float):
+    """返回首个和最后一个（开区间）大于阈值的下标，不存在时返回None。"""
+    above = values > thres
+    first = int(np.argmax(above))
+    if not above[first]:
+        return None
+    last = len(above) - int(np.argmax(above[::-1]))
+    return first, last
 
 
 def locate_roi_location_from_diffs(
@@ -55,43 +179,21 @@ def locate_roi_location_from_diffs(
     diff_thres_ratio: float,
 ):
     row_num, col_num = diffs.shape[0], diffs.shape[1]
+    binary = (diffs != 0).view(np.uint8)
 
-    col_diff_thres = diff_thres_ratio * col_num
-    col_diffs = np.count_nonzero(diffs, axis=0)
-    roi_left = None
-    for i, col_diff in enumerate(col_diffs):
-        if col_diff > col_diff_thres:
-            roi_left = i
-            break
-    if roi_left is None:
-        return None
-
-    roi_right = None
-    for i, col_diff in enumerate(col_diffs[::-1]):
-        if col_diff > col_diff_thres:
-            roi_right = col_num - i
-            break
-    if roi_right is None:
-        return None
-
-    row_diff_thres = diff_thres_ratio * row_num
-    row_diffs = np.count_nonzero(diffs, axis=1)
-    roi_top = None
-    for i, row_diff in enumerate(row_diffs):
-        if row_diff > row_diff_thres:
-            roi_top = i
-            break
-    if roi_top is None:
+    # 阈值沿用原实现：列投影与列数比较，行投影与行数比较
+    col_diffs = cv2.reduce(binary, 0, cv2.REDUCE_SUM, dtype=cv2.CV_32S)[0]
+    col_bounds = first_above(col_diffs, diff_thres_ratio * col_num)
+    if col_bounds is None:
         return None
 
-    roi_bottom = None
-    for i, row_diff in enumerate(row_diffs[::-1]):
-        if row_diff > row_diff_thres:
-            roi_bottom = row_num - i
-            break
-    if roi_bottom is None:
+    row_diffs = cv2.reduce(binary, 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S)[:, 0]
+    row_bounds = first_above(row_diffs, diff_thres_ratio * row_num)
+    if row_bounds is None:
         return None
 
+    roi_left, roi_right = col_bounds
+    roi_top, roi_bottom = row_bounds
     roi_loc = Box(
         left=roi_left,
         top=roi_top,
@@ -0,0 +1,81 @@
+from collections import deque
+from typing import Optional
+
+import attrs
+import cv2
+import numpy as np
+
+from genshin_mummy.tools.capture import FrameSource, normalize_region
+from genshin_mummy.tools.clock import Clock
+from genshin_mummy.tools.waiter import take_thumbnail
+from genshin_mummy.type import Box
+
+
+@attrs.define
+class BlinkResult:
+    box: Optional[Box] = attrs.field()
+    frames: int = attrs.field()
+    elapsed: float = attrs.field()
+
+
+@attrs.define
+class BlinkDetector:
+    """基于多帧时域方差定位闪烁区域，例如选中圣遗物的外边框。
+
+    在低分辨率下维护一个滚动的帧栈，方差超过阈值的像素视为闪烁像素，
+    取其中面积最大的连通域作为结果。超过 latency_budget 或 max_frames
+    仍未找到则返回空结果，不会无限重试。
+    """
+    frame_source: FrameSource = attrs.field()
+    # 帧栈的长度由 latency_budget 按该时钟决定，需与截图来源配套传入，
+    # 录制与回放时才能截取同样多的帧
+    clock: Clock = attrs.field()
+    scale: float = attrs.field(default=0.5)
+    window: int = attrs.field(default=6)
+    min_frames: int = attrs.field(default=2)
+    max_frames: int = attrs.field(default=60)
+    poll_interval: float = attrs.field(default=0.0)
+    latency_budget: float = attrs.field(default=1.0)
+    var_thres: float = attrs.field(default=1.0)
+
+    def locate_blink(self, frames: deque):
+        stack = np.stack(frames).astype(np.float32)
+        blink_mask = (np.var(stack, axis=0) > self.var_thres)
+        num, _, stats, _ = cv2.connectedComponentsWithStats(
+            blink_mask.astype(np.uint8),
+            connectivity=8,
+        )
+        if num <= 1:
+            return None
+        # 第0个连通域是背景
+        largest = 1 + np.argmax(stats[1:, cv2.CC_STAT_AREA])
+        x, y, w, h, _ = stats[largest]
+        left = int(np.floor(x / self.scale))
+        top = int(np.floor(y / self.scale))
+        right = int(np.ceil((x + w) / self.scale))
+        bottom = int(np.ceil((y + h) / self.scale))
+        return Box(left=left, top=top, width=right - left, height=bottom - top)
+
+    def detect(self, region: Box) -> BlinkResult:
+        region = normalize_region(region)
+        start = self.clock.time()
+        frames = deque(maxlen=self.window)
+        count = 0
+        while True:
+            frames.append(take_thumbnail(self.frame_source, region,
+                                         self.scale))
+            count += 1
+            elapsed = self.clock.time() - start
+            if count >= self.min_frames:
+                box = self.locate_blink(frames)
+                if box is not None:
+                    box = Box(
+                        left=box.left + region.left,
+                        top=box.top + region.top,
+                        width=box.width,
+                        height=box.height,
+                    )
+                    return BlinkResult(box=box, frames=count, elapsed=elapsed)
+            if elapsed >= self.latency_budget or count >= self.max_frames:
+                return BlinkResult(box=None, frames=count, elapsed=elapsed)
+            self.clock.sleep(self.poll_interval)
@@ -0,0 +1,153 @@
+import platform
+from enum import Enum, unique
+from typing import Union
+
+import attrs
+import cv2
+import numpy as np
+
+from genshin_mummy.type import Box, Point
+
+
+@unique
+class CaptureBackend(Enum):
+    AUTO = 'auto'
+    PYAUTOGUI = 'pyautogui'
+    XSHM = 'xshm'
+
+
+@attrs.define
+class RegionFrame:
+    """屏幕局部区域的截图，记录了它在屏幕上的偏移。"""
+    image: np.ndarray = attrs.field()
+    region: Box = attrs.field()
+
+    def to_screen(self, loc: Union[Box, Point]):
+        if isinstance(loc, Box):
+            return Box(
+                left=loc.left + self.region.left,
+                top=loc.top + self.region.top,
+                width=loc.width,
+                height=loc.height,
+            )
+        elif isinstance(loc, Point):
+            return Point(x=loc.x + self.region.left, y=loc.y + self.region.top)
+        else:
+            raise NotImplementedError()
+
+    def to_local(self, loc: Union[Box, Point]):
+        if isinstance(loc, Box):
+            return Box(
+                left=loc.left - self.region.left,
+                top=loc.top - self.region.top,
+                width=loc.width,
+                height=loc.height,
+            )
+        elif isinstance(loc, Point):
+            return Point(x=loc.x - self.region.left, y=loc.y - self.region.top)
+        else:
+            raise NotImplementedError()
+
+
+def normalize_region(region: Box):
+    # 粗略区域是按屏幕比例算出来的浮点数
+    return Box(
+        left=int(region.left),
+        top=int(region.top),
+        width=int(region.width),
+        height=int(region.height),
+    )
+
+
+class FrameSource:
+    """屏幕帧来源，所有截图都应通过它获取。
+
+    返回的帧统一为 ``(height, width, 3)`` 的 RGB ``uint8`` 数组，
+    与 ``np.asarray(pyautogui.screenshot())`` 的像素保持一致。
+    """
+
+    def grab(self) -> np.ndarray:
+        raise NotImplementedError()
+
+    def grab_region(self, region: Box) -> RegionFrame:
+        # 不支持区域截图的后端退化为全屏截图后裁剪
+        region = normalize_region(region)
+        screen = self.grab()
+        image = screen[region.top:region.bottom, region.left:region.right]
+        return RegionFrame(image=image, region=region)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PyAutoGuiFrameSource(FrameSource):
+    """基于 pyautogui/pyscreeze 的截图，Linux 下每帧都会经过外部工具与磁盘。"""
+
+    def __init__(self):
+        import pyautogui
+        self._pyautogui = pyautogui
+
+    def grab(self) -> np.ndarray:
+        return np.asarray(self._pyautogui.screenshot())
+
+    def grab_region(self, region: Box) -> RegionFrame:
+        region = normalize_region(region)
+        image = self._pyautogui.screenshot(region=region.to_tuple())
+        return RegionFrame(image=np.asarray(image), region=region)
+
+
+class XShmFrameSource(FrameSource):
+    """基于 mss 的共享内存截图，直接从 X11 读取像素到内存。"""
+
+    def __init__(self, monitor_idx: int = 1):
+        import mss
+        self._sct = mss.mss()
+        # monitors[0]是所有屏幕的并集，monitors[1]是主屏，与pyautogui一致
+        self._monitor = self._sct.monitors[monitor_idx]
+
+    def _grab(self, monitor: dict) -> np.ndarray:
+        shot = self._sct.grab(monitor)
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8)
+        bgra = bgra.reshape(shot.height, shot.width, 4)
+        return cv2.cvtColor(bgra, cv2.COLOR_BGRA2RGB)
+
+    def grab(self) -> np.ndarray:
+        return self._grab(self._monitor)
+
+    def grab_region(self, region: Box) -> RegionFrame:
+        region = normalize_region(region)
+        monitor = {
+            'left': self._monitor['left'] + region.left,
+            'top': self._monitor['top'] + region.top,
+            'width': region.width,
+            'height': region.height,
+        }
+        return RegionFrame(image=self._grab(monitor), region=region)
+
+    def close(self):
+        self._sct.close()
+
+
+def create_frame_source(
+        backend: CaptureBackend = CaptureBackend.AUTO) -> FrameSource:
+    if backend == CaptureBackend.PYAUTOGUI:
+        return PyAutoGuiFrameSource()
+    elif backend == CaptureBackend.XSHM:
+        return XShmFrameSource()
+    elif backend == CaptureBackend.AUTO:
+        if platform.system() == 'Linux':
+            # 未安装 mss，或连不上 X11 显示（mss 抛出 ScreenShotError 等）时
+            # 都退回 pyautogui
+            try:
+                return XShmFrameSource()
+            except Exception:
+                pass
+        return PyAutoGuiFrameSource()
+    else:
+        raise NotImplementedError()
@@ -0,0 +1,26 @@
+import time
+
+
+class Clock:
+    """等待与计时统一从这里走，测试时可替换成虚拟时钟。"""
+
+    def time(self) -> float:
+        return time.perf_counter()
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """不真正等待，sleep 只推进内部时间，用于无游戏的模拟运行。"""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            self.now += seconds
@@ -0,0 +1,54 @@
+from typing import Tuple
+
+
+class Controller:
+    """鼠标键盘输入，方法名与 pyautogui 保持一致，方便替换调用处。"""
+
+    def size(self) -> Tuple[int, int]:
+        raise NotImplementedError()
+
+    def position(self) -> Tuple[int, int]:
+        raise NotImplementedError()
+
+    def moveTo(self, x: int, y: int, duration: float = 0.0):
+        raise NotImplementedError()
+
+    def leftClick(self, x: int, y: int, duration: float = 0.0):
+        raise NotImplementedError()
+
+    def scroll(self, clicks: int):
+        raise NotImplementedError()
+
+    def press(self, key: str, interval: float = 0.0):
+        raise NotImplementedError()
+
+
+class PyAutoGuiController(Controller):
+
+    def __init__(self):
+        import pyautogui
+        self._pyautogui = pyautogui
+
+    def size(self):
+        width, height = self._pyautogui.size()
+        return width, height
+
+    def position(self):
+        x, y = self._pyautogui.position()
+        return x, y
+
+    def moveTo(self, x: int, y: int, duration: float = 0.0):
+        self._pyautogui.moveTo(x, y, duration)
+
+    def leftClick(self, x: int, y: int, duration: float = 0.0):
+        self._pyautogui.leftClick(x, y, duration=duration)
+
+    def scroll(self, clicks: int):
+        self._pyautogui.scroll(clicks)
+
+    def press(self, key: str, interval: float = 0.0):
+        self._pyautogui.press(key, interval=interval)
+
+
+def create_controller() -> Controller:
+    return PyAutoGuiController()
@@ -0,0 +1,200 @@
+"""
+模板图标的 SIFT 特征库。
+
+所有模板的关键点与描述子预先计算好，存成一个结构化的 .npy 文件，
+配合记录版本与模板指纹的 .json 索引。加载时通过 mmap 映射，
+模板文件的修改时间或内容哈希变化时整体重建。
+"""
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import attrs
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_VERSION = 1
+DESCRIPTOR_SIZE = 128
+FEATURE_DTYPE = np.dtype([
+    ('pt', np.float32, (2, )),
+    ('size', np.float32),
+    ('angle', np.float32),
+    ('response', np.float32),
+    ('octave', np.int32),
+    ('class_id', np.int32),
+    ('descriptor', np.float32, (DESCRIPTOR_SIZE, )),
+])
+
+# 输入模板路径，返回 (原图, 关键点, 描述子)，与 locator.do_sift 一致
+Extractor = Callable[[str], Tuple[np.ndarray, List[cv2.KeyPoint],
+                                  Optional[np.ndarray]]]
+
+
+def file_digest(path: Path):
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+def fingerprint(path: Path):
+    stat = path.stat()
+    return {
+        'mtime': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha1': file_digest(path),
+    }
+
+
+def features_to_records(
+    keypoints: List[cv2.KeyPoint],
+    descriptors: Optional[np.ndarray],
+):
+    if descriptors is None:
+        return np.zeros(0, dtype=FEATURE_DTYPE)
+    records = np.zeros(len(keypoints), dtype=FEATURE_DTYPE)
+    records['pt'] = [kp.pt for kp in keypoints]
+    records['size'] = [kp.size for kp in keypoints]
+    records['angle'] = [kp.angle for kp in keypoints]
+    records['response'] = [kp.response for kp in keypoints]
+    records['octave'] = [kp.octave for kp in keypoints]
+    records['class_id'] = [kp.class_id for kp in keypoints]
+    records['descriptor'] = descriptors
+    return records
+
+
+def records_to_keypoints(records: np.ndarray):
+    return [
+        cv2.KeyPoint(
+            x=float(record['pt'][0]),
+            y=float(record['pt'][1]),
+            size=float(record['size']),
+            angle=float(record['angle']),
+            response=float(record['response']),
+            octave=int(record['octave']),
+            class_id=int(record['class_id']),
+        ) for record in records
+    ]
+
+
+@attrs.define
+class TemplateFeatures:
+    keypoints: List[cv2.KeyPoint] = attrs.field()
+    descriptors: np.ndarray = attrs.field()
+
+
+@attrs.define
+class DescriptorStore:
+    """按 key 提供模板特征，首次访问时加载或重建特征库。"""
+    key_to_path: Dict[str, Path] = attrs.field(converter=lambda paths: {
+        key: Path(path)
+        for key, path in paths.items()
+    })
+    bundle_fp: Path = attrs.field(converter=Path)
+    extractor: Extractor = attrs.field()
+    _records: Optional[np.ndarray] = attrs.field(init=False, default=None)
+    _index: Optional[dict] = attrs.field(init=False, default=None)
+    _cache: Dict[str, TemplateFeatures] = attrs.field(init=False, factory=dict)
+
+    @property
+    def index_fp(self):
+        return self.bundle_fp.with_suffix('.json')
+
+    def get(self, key: str) -> TemplateFeatures:
+        features = self._cache.get(key)
+        if features is None:
+            self.ensure_loaded()
+            entry = self._index['entries'][key]
+            records = self._records[entry['start']:entry['stop']]
+            features = TemplateFeatures(
+                keypoints=records_to_keypoints(records),
+                # 匹配器需要连续内存，按 key 拷贝一次后常驻
+                descriptors=np.ascontiguousarray(records['descriptor']),
+            )
+            self._cache[key] = features
+        return features
+
+    def ensure_loaded(self):
+        if self._records is not None:
+            return
+        if not self.load():
+            self.build()
+
+    def load(self):
+        """加载已有特征库，版本或任一模板指纹不一致时返回False。"""
+        if not self.bundle_fp.exists() or not self.index_fp.exists():
+            return False
+        with open(self.index_fp, 'r', encoding='utf-8') as fin:
+            index = json.load(fin)
+        if (index.get('version') != BUNDLE_VERSION
+                or index.get('opencv') != cv2.__version__
+                or set(index['entries']) != set(self.key_to_path)):
+            return False
+        touched = False
+        for key, path in self.key_to_path.items():
+            entry = index['entries'][key]
+            stat = Path(path).stat()
+            if (entry['mtime'] == stat.st_mtime_ns
+                    and entry['size'] == stat.st_size):
+                continue
+            # 修改时间变了但内容没变时只刷新时间，不必重建
+            if file_digest(Path(path)) != entry['sha1']:
+                return False
+            entry['mtime'] = stat.st_mtime_ns
+            entry['size'] = stat.st_size
+            touched = True
+        self._records = np.load(self.bundle_fp, mmap_mode='r')
+        self._index = index
+        if touched:
+            self._save_index(index)
+        return True
+
+    def build(self):
+        logger.info(f'rebuild descriptor bundle {self.bundle_fp}')
+        chunks = []
+        entries = {}
+        start = 0
+        for key, path in self.key_to_path.items():
+            _, keypoints, descriptors = self.extractor(str(path))
+            records = features_to_records(keypoints, descriptors)
+            chunks.append(records)
+            entries[key] = dict(
+                fingerprint(Path(path)),
+                start=start,
+                stop=start + len(records),
+            )
+            start += len(records)
+        records = np.concatenate(chunks) if chunks else np.zeros(
+            0, dtype=FEATURE_DTYPE)
+        index = {
+            'version': BUNDLE_VERSION,
+            'opencv': cv2.__version__,
+            'entries': entries,
+        }
+        self._records = records
+        self._index = index
+        self._cache.clear()
+        try:
+            self.bundle_fp.parent.mkdir(parents=True, exist_ok=True)
+            tmp_fp = self.bundle_fp.with_suffix('.tmp.npy')
+            np.save(tmp_fp, records)
+            os.replace(tmp_fp, self.bundle_fp)
+        except OSError as error:
+            # 安装目录不可写时只在内存中使用
+            logger.warning(f'cannot save descriptor bundle: {error!r}')
+            return
+        if self._save_index(index):
+            self._records = np.load(self.bundle_fp, mmap_mode='r')
+
+    def _save_index(self, index: dict):
+        tmp_fp = self.index_fp.with_suffix('.tmp')
+        try:
+            with open(tmp_fp, 'w', encoding='utf-8') as fout:
+                json.dump(index, fout, indent=2)
+            os.replace(tmp_fp, self.index_fp)
+        except OSError as error:
+            logger.warning(f'cannot save descriptor index: {error!r}')
+            return False
+        return True
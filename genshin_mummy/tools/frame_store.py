@@ -0,0 +1,82 @@
+"""
+基于内存映射文件的截图存储。
+
+同一尺寸的截图依次追加到一个原始字节文件中，容量不足时按倍数扩容。
+其他进程只需知道文件路径、截图尺寸与序号即可映射读取，不必通过pickle传递图像。
+"""
+from os import PathLike
+from pathlib import Path
+from typing import Optional, Tuple
+
+import attrs
+import numpy as np
+
+
+def read_frame(fp: PathLike, frame_shape: Tuple[int, ...], idx: int):
+    """只读映射单张截图并拷贝出来，供工作进程使用。"""
+    frame_size = int(np.prod(frame_shape))
+    frames = np.memmap(
+        fp,
+        dtype=np.uint8,
+        mode='r',
+        offset=idx * frame_size,
+        shape=tuple(frame_shape),
+    )
+    return np.array(frames)
+
+
+@attrs.define
+class FrameStore:
+    fp: Path = attrs.field(converter=Path)
+    frame_shape: Tuple[int, ...] = attrs.field(converter=tuple)
+    capacity: int = attrs.field(default=256)
+    count: int = attrs.field(init=False, default=0)
+    _frames: Optional[np.memmap] = attrs.field(init=False, default=None)
+
+    def __attrs_post_init__(self):
+        self.fp.parent.mkdir(parents=True, exist_ok=True)
+        self._frames = np.memmap(
+            self.fp,
+            dtype=np.uint8,
+            mode='w+',
+            shape=(self.capacity, ) + self.frame_shape,
+        )
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, idx: int) -> np.ndarray:
+        if not 0 <= idx < self.count:
+            raise IndexError(idx)
+        return self._frames[idx]
+
+    def _grow(self):
+        self._frames.flush()
+        self._frames = None
+        self.capacity *= 2
+        self._frames = np.memmap(
+            self.fp,
+            dtype=np.uint8,
+            mode='r+',
+            shape=(self.capacity, ) + self.frame_shape,
+        )
+
+    def append(self, image: np.ndarray) -> int:
+        if image.shape != self.frame_shape:
+            raise ValueError(f'frame shape {image.shape} != '
+                             f'{self.frame_shape}')
+        if self.count == self.capacity:
+            self._grow()
+        self._frames[self.count] = image
+        self.count += 1
+        return self.count - 1
+
+    def flush(self):
+        self._frames.flush()
+
+    def close(self, delete: bool = False):
+        if self._frames is not None:
+            self._frames.flush()
+            self._frames = None
+        if delete:
+            self.fp.unlink(missing_ok=True)
@@ -0,0 +1,114 @@
+"""
+界面固定图标的位置缓存。
+
+按分辨率记住每个图标上次出现的位置，下次先在其周围的小区域内搜索，
+找不到再退回全屏搜索。hits/misses 记录了缓存的命中情况。
+"""
+import json
+from os import PathLike
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import attrs
+
+from genshin_mummy.type import Box
+
+# 输入搜索区域（None 表示全屏），返回找到的图标区域
+SearchFunc = Callable[[Optional[Box]], Optional[Box]]
+
+
+def cache_key(screen_size: Tuple[int, int], key: str):
+    width, height = screen_size
+    return f'{width}x{height}/{key}'
+
+
+@attrs.define
+class IconPositionCache:
+    # 搜索区域在缓存位置的基础上向四周各扩展图标尺寸的 padding 倍
+    padding: float = attrs.field(default=1.0)
+    cache_fp: Optional[Path] = attrs.field(default=None)
+    hits: int = attrs.field(init=False, default=0)
+    misses: int = attrs.field(init=False, default=0)
+    _boxes: Dict[str, Box] = attrs.field(init=False, factory=dict)
+
+    def __attrs_post_init__(self):
+        if self.cache_fp:
+            self.load(self.cache_fp)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, screen_size: Tuple[int, int], key: str) -> Optional[Box]:
+        return self._boxes.get(cache_key(screen_size, key))
+
+    def search_region(self, screen_size: Tuple[int, int], key: str):
+        box = self.get(screen_size, key)
+        if box is None:
+            return None
+        screen_width, screen_height = screen_size
+        pad_x = int(box.width * self.padding)
+        pad_y = int(box.height * self.padding)
+        left = max(box.left - pad_x, 0)
+        top = max(box.top - pad_y, 0)
+        right = min(box.right + pad_x, screen_width)
+        bottom = min(box.bottom + pad_y, screen_height)
+        return Box(left=left, top=top, width=right - left, height=bottom - top)
+
+    def update(self, screen_size: Tuple[int, int], key: str, box: Box):
+        box = Box(
+            left=int(box.left),
+            top=int(box.top),
+            width=int(box.width),
+            height=int(box.height),
+        )
+        if self._boxes.get(cache_key(screen_size, key)) == box:
+            return
+        self._boxes[cache_key(screen_size, key)] = box
+        if self.cache_fp:
+            self.save(self.cache_fp)
+
+    def invalidate(self, screen_size: Tuple[int, int], key: str):
+        self._boxes.pop(cache_key(screen_size, key), None)
+
+    def locate(
+        self,
+        screen_size: Tuple[int, int],
+        key: str,
+        search: SearchFunc,
+    ) -> Optional[Box]:
+        region = self.search_region(screen_size, key)
+        if region is not None:
+            box = search(region)
+            if box is not None:
+                self.hits += 1
+                self.update(screen_size, key, box)
+                return box
+        self.misses += 1
+        box = search(None)
+        if box is None:
+            self.invalidate(screen_size, key)
+        else:
+            self.update(screen_size, key, box)
+        return box
+
+    def load(self, cache_fp: PathLike):
+        cache_fp = Path(cache_fp)
+        if not cache_fp.exists():
+            return
+        with open(cache_fp, 'r', encoding='utf-8') as fin:
+            data = json.load(fin)
+        for key, (left, top, width, height) in data.items():
+            self._boxes[key] = Box(left=left,
+                                   top=top,
+                                   width=width,
+                                   height=height)
+
+    def save(self, cache_fp: PathLike):
+        data = {
+            key: [box.left, box.top, box.width, box.height]
+            for key, box in self._boxes.items()
+        }
+        with open(cache_fp, 'w', encoding='utf-8') as fout:
+            json.dump(data, fout, indent=2)
@@ -1,15 +1,18 @@
 import logging
-import pickle
+from enum import Enum, unique
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 
 import attrs
 import cv2
 import numpy as np
-import pyautogui
 from PIL.Image import Image as PILImage
 
-from genshin_mummy.type import Box
+from genshin_mummy.tools.capture import create_frame_source, normalize_region
+from genshin_mummy.tools.descriptor_store import DescriptorStore
+from genshin_mummy.tools.icon_cache import IconPositionCache
+from genshin_mummy.tools.template_pyramid import PyramidMatcher
+from genshin_mummy.type import Box, Point
 
 logger = logging.getLogger(__name__)
 logger.setLevel('NOTSET')
@@ -19,11 +22,35 @@ KEY_TO_PATH = {
     'inventory_icon': '../materials/menu_page/inventory_icon.jpg',
     'artifact_icon': '../materials/inventory/artifact_icon.jpg',
     'weapon_icon': '../materials/inventory/weapon_icon.jpg',
+    'development_items_icon':
+    '../materials/inventory/development_items_icon.jpg',
     'lock_icon': '../materials/inventory/locked_icon.jpg',
     'unlock_icon': '../materials/inventory/unlocked_icon.jpg',
 }
 
 ICON_MATCHING_THRES = 0.8
+# SIFT 最近邻与次近邻的距离比阈值
+SIFT_RATIO_THRES = 0.8
+# 有模板的背包页签，InventoryLocator 一次匹配全部找出
+INVENTORY_TAB_ICON_KEYS = (
+    'weapon_icon',
+    'artifact_icon',
+    'development_items_icon',
+)
+
+# 模板路径相对于本文件所在目录
+TEMPLATE_DIR = Path(__file__).parent
+DESCRIPTOR_BUNDLE_FP = TEMPLATE_DIR / '../materials/sift_descriptors.npy'
+
+
+@unique
+class MatcherType(Enum):
+    BF = 'bf'
+    FLANN = 'flann'
+
+
+def template_path(key):
+    return (TEMPLATE_DIR / KEY_TO_PATH[key]).resolve()
 
 
 def do_sift(image_or_path):
@@ -33,6 +60,10 @@ def do_sift(image_or_path):
     elif isinstance(image_or_path, PILImage):
         src_image = np.array(image_or_path, dtype=np.uint8)
         gray = cv2.cvtColor(src_image, cv2.COLOR_RGB2GRAY)
+    elif isinstance(image_or_path, np.ndarray):
+        # FrameSource 截取的 RGB 数组
+        src_image = image_or_path
+        gray = cv2.cvtColor(src_image, cv2.COLOR_RGB2GRAY)
     else:
         raise NotImplementedError()
     # 用线条特征规避图标被选中时的反色影响。
@@ -42,60 +73,115 @@ def do_sift(image_or_path):
     return src_image, kps, descriptors
 
 
-def load_descriptors(image_path):
-    image_fp = Path(image_path)
-    descriptors_fp = image_fp.parent / f"{image_fp.stem}.pkl"
-    if descriptors_fp.exists():
-        with open(descriptors_fp, 'rb') as fout:
-            descriptors = pickle.load(fout)
-        return descriptors
-    return None
+descriptor_store = DescriptorStore(
+    key_to_path={key: template_path(key)
+                 for key in KEY_TO_PATH},
+    bundle_fp=DESCRIPTOR_BUNDLE_FP,
+    extractor=do_sift,
+)
 
+# 固定图标的位置缓存，先在上次位置附近搜索
+icon_cache = IconPositionCache()
 
-def locateOnScreen(
-    image_path,
-    confidence,
-    grayscale: bool = True,
-    debug: bool = False,
-):
-    src_des = load_descriptors(image_path)
-    if src_des is None:
-        _, _, src_des = do_sift(image_path)
-        image_fp = Path(image_path)
-        des_fp = image_fp.parent / f"{image_fp.stem}.pkl"
-        with open(des_fp, 'wb') as fin:
-            pickle.dump(src_des, fin)
+# 多尺度模板匹配，界面缩放与模板不一致时也能找到图标
+pyramid_matcher = PyramidMatcher(
+    key_to_path={key: template_path(key)
+                 for key in KEY_TO_PATH},
+    match_thres=ICON_MATCHING_THRES,
+)
+
+# 所有截图都经过同一个帧来源，为None时在首次截图时创建，selector 与之共用
+frame_source = None
 
-    screen = pyautogui.screenshot()
-    dst_im, dst_kps, dst_des = do_sift(screen)
 
-    bf = cv2.BFMatcher()
-    matches = bf.knnMatch(src_des, dst_des, k=2)
+def get_frame_source():
+    global frame_source
+    if frame_source is None:
+        frame_source = create_frame_source()
+    return frame_source
 
+
+def crop_screen(screen: np.ndarray, region: Optional[Box]):
+    """从全屏截图中裁出 region，返回局部图像与其左上角的屏幕坐标。"""
+    if region is None:
+        return screen, (0, 0)
+    region = normalize_region(region)
+    image = screen[region.top:region.bottom, region.left:region.right]
+    return image, (region.left, region.top)
+
+
+def create_matcher(matcher_type: MatcherType = MatcherType.FLANN):
+    if matcher_type == MatcherType.BF:
+        return cv2.BFMatcher()
+    elif matcher_type == MatcherType.FLANN:
+        # SIFT 描述子是浮点向量，使用 KD 树索引
+        flann_index_kdtree = 1
+        return cv2.FlannBasedMatcher(
+            dict(algorithm=flann_index_kdtree, trees=5),
+            dict(checks=50),
+        )
+    else:
+        raise NotImplementedError()
+
+
+def filter_matches(matches, dst_kps):
+    """比值测试，返回可靠的匹配与其在截图中的坐标。"""
     reliable_matches = []
     reliable_points = []
-    for src_match, dst_match in matches:
-        if src_match.distance > 0.8 * dst_match.distance:
+    for pair in matches:
+        # FLANN 在近邻不足时可能只返回一个结果
+        if len(pair) < 2:
+            continue
+        src_match, dst_match = pair
+        if src_match.distance > SIFT_RATIO_THRES * dst_match.distance:
             continue
         reliable_matches.append([src_match])
         dst_keypoint = dst_kps[src_match.trainIdx]
         reliable_points.append(dst_keypoint.pt)
+    return reliable_matches, reliable_points
+
+
+def locateOnScreen(
+    key,
+    confidence,
+    grayscale: bool = True,
+    debug: bool = False,
+    matcher_type: MatcherType = MatcherType.FLANN,
+    region: Optional[Box] = None,
+    screen: Optional[np.ndarray] = None,
+):
+    src_features = descriptor_store.get(key)
+    src_des = src_features.descriptors
+
+    if screen is None:
+        screen = get_frame_source().grab()
+    image, (offset_x, offset_y) = crop_screen(screen, region)
+    dst_im, dst_kps, dst_des = do_sift(image)
+
+    if len(src_des) < 2 or dst_des is None or len(dst_des) < 2:
+        logger.debug(f'locate {key} by sift: not enough features')
+        return None
+    matcher = create_matcher(matcher_type)
+    matches = matcher.knnMatch(src_des, dst_des, k=2)
+    reliable_matches, reliable_points = filter_matches(matches, dst_kps)
 
     if len(reliable_points) < 3:
-        print('Match Failed.')
+        logger.debug(f'locate {key} by sift: '
+                     f'{len(reliable_points)} reliable matches')
         return None
 
     # TODO: PCA and classify
     reliable_points = np.asarray(reliable_points)
     min_x, min_y = np.min(reliable_points, axis=0)
     max_x, max_y = np.max(reliable_points, axis=0)
-    bbox = Box(left=min_x,
-               top=min_y,
-               width=min(1, max_x - min_x),
+    bbox = Box(left=min_x + offset_x,
+               top=min_y + offset_y,
+               width=max(1, max_x - min_x),
                height=max(1, max_y - min_y))
 
     if debug:
-        src_im, src_kps, src_des = do_sift(image_path)
+        src_im = cv2.imread(str(template_path(key)))
+        src_kps = src_features.keypoints
         dst_im = cv2.cvtColor(dst_im, cv2.COLOR_RGB2BGR)
         debug_image = cv2.drawMatchesKnn(
             src_im,
@@ -111,24 +197,64 @@ def locateOnScreen(
     return bbox.to_tuple()
 
 
-def locate(key, extension_mode: bool = False):
-    image_path = KEY_TO_PATH[key]
+def search_icon(
+    key,
+    region: Optional[Box],
+    extension_mode: bool,
+    screen: Optional[np.ndarray] = None,
+):
     if extension_mode:
-        logger.info(f'locate {key} by sift')
         location = locateOnScreen(
-            image_path,
+            key,
             confidence=ICON_MATCHING_THRES,
             grayscale=True,
+            region=region,
+            screen=screen,
         )
     else:
-        logger.info(f'locate {key} by pyautogui')
-        location = pyautogui.locateOnScreen(
-            image_path,
-            confidence=ICON_MATCHING_THRES,
-            grayscale=True,
-        )
-    if location:
-        return pyautogui.center(location)
+        return search_icons([key], region, screen).get(key)
+    if location is None:
+        return None
+    left, top, width, height = location
+    return Box(left=left, top=top, width=width, height=height)
+
+
+def search_icons(
+    keys,
+    region: Optional[Box] = None,
+    screen: Optional[np.ndarray] = None,
+):
+    """在同一个金字塔上匹配所有图标，screen 为None时通过帧来源截一次全屏。"""
+    if screen is None:
+        screen = get_frame_source().grab()
+    height, width = screen.shape[:2]
+    image, offset = crop_screen(screen, region)
+    matches = pyramid_matcher.locate(
+        image,
+        keys,
+        screen_size=(width, height),
+        offset=offset,
+    )
+    return {key: match.box for key, match in matches.items()}
+
+
+def locate(key, extension_mode: bool = False):
+    if extension_mode:
+        logger.info(f'locate {key} by sift')
+    else:
+        logger.info(f'locate {key} by template pyramid')
+    # 截一次全屏，屏幕尺寸与缓存位置附近的搜索都基于这一帧
+    screen = get_frame_source().grab()
+    height, width = screen.shape[:2]
+    box = icon_cache.locate(
+        screen_size=(width, height),
+        key=key,
+        search=lambda region: search_icon(key, region, extension_mode, screen),
+    )
+    logger.debug(f'icon cache hits {icon_cache.hits}, '
+                 f'misses {icon_cache.misses}')
+    if box:
+        return Point(*box.center)
     return None
 
 
@@ -140,11 +266,13 @@ def is_menu_page(extension_mode: bool = False):
 
 @attrs.define
 class InventoryLocator:
-    image: PILImage = attrs.field()
-    weapon_icon_pos: Optional[Tuple[int, int]] = attrs.field(init=False)
-    artifact_icon_pos: Optional[Tuple[int, int]] = attrs.field(init=False)
-    development_items_icon_pos: Optional[Tuple[int,
-                                               int]] = attrs.field(init=False)
+    """对一张背包截图做一次特征匹配，同时找出所有页签图标的位置。"""
+    image: Union[PILImage, np.ndarray] = attrs.field()
+    matcher_type: MatcherType = attrs.field(default=MatcherType.FLANN)
+    weapon_icon_pos: Optional[Tuple[int, int]] = attrs.field(default=None)
+    artifact_icon_pos: Optional[Tuple[int, int]] = attrs.field(default=None)
+    development_items_icon_pos: Optional[Tuple[int, int]] = attrs.field(
+        default=None)
     food_icon_pos: Optional[Tuple[int, int]] = attrs.field(default=None)
     materials_icon_pos: Optional[Tuple[int, int]] = attrs.field(default=None)
     gadget_icon_pos: Optional[Tuple[int, int]] = attrs.field(default=None)
@@ -153,5 +281,41 @@ class InventoryLocator:
                                             int]] = attrs.field(default=None)
     furnishings_icon_pos: Optional[Tuple[int, int]] = attrs.field(default=None)
 
-    def __init__(self):
-        pass
+    def __attrs_post_init__(self):
+        self.locate_all()
+
+    @classmethod
+    def from_screen(cls, **kwargs):
+        return cls(get_frame_source().grab(), **kwargs)
+
+    def position(self, key: str) -> Optional[Tuple[int, int]]:
+        return getattr(self, f'{key}_pos')
+
+    def locate_all(self):
+        _, dst_kps, dst_des = do_sift(self.image)
+        if dst_des is None or len(dst_des) < 2:
+            logger.info('inventory locator: no features on screen')
+            return
+        keys = []
+        src_des = []
+        for key in INVENTORY_TAB_ICON_KEYS:
+            descriptors = descriptor_store.get(key).descriptors
+            if len(descriptors):
+                keys.append(key)
+                src_des.append(descriptors)
+        if not keys:
+            return
+        # 所有模板的描述子拼在一起，只对截图做一次 knn 匹配
+        matcher = create_matcher(self.matcher_type)
+        matches = matcher.knnMatch(np.concatenate(src_des), dst_des, k=2)
+        start = 0
+        for key, descriptors in zip(keys, src_des):
+            stop = start + len(descriptors)
+            _, points = filter_matches(matches[start:stop], dst_kps)
+            start = stop
+            if len(points) < 3:
+                logger.info(f'inventory locator: {key} not found')
+                continue
+            # 取中位数，少量匹配到相邻页签的点不影响结果
+            x, y = np.median(np.asarray(points), axis=0)
+            setattr(self, f'{key}_pos', (int(x), int(y)))
@@ -107,10 +107,17 @@ class ScreenHandler(Handler):
 
 
 class ExLogger(logging.Logger):
+    # 无显示器（如回放会话）时关闭所有屏幕浮层
+    overlay: bool = True
 
     def __init__(self, name: str, level: int = logging.NOTSET):
         super().__init__(name, level)
 
+    def add_screen_handler(self):
+        if not self.overlay:
+            return
+        self.addHandler(ScreenHandler())
+
     def default_label(self, widget: Tk, message: str):
         screen_width = widget.winfo_screenwidth()
         label = Label(
@@ -125,6 +132,8 @@ class ExLogger(logging.Logger):
         return label
 
     def notify(self, message: str, destory_ms: int = 2000):
+        if not self.overlay:
+            return
         widget = create_widget(position=WidgetPosition.CENTER)
         label = self.default_label(widget, message)
         label.place(relwidth=1, rely=0.5)
@@ -132,6 +141,8 @@ class ExLogger(logging.Logger):
         widget.mainloop()
 
     def notify_countdown(self, seconds: int):
+        if not self.overlay:
+            return
         widget = create_widget(position=WidgetPosition.CENTER)
         label = self.default_label(widget, '倒计时即将开始')
         label.place(relwidth=1, rely=0.5)
@@ -147,6 +158,8 @@ class ExLogger(logging.Logger):
         widget.mainloop()
 
     def show_bbox(self, box: Box, box_name: str = ''):
+        if not self.overlay:
+            return
         widget = create_widget()
 
         canvas = Canvas(
@@ -181,9 +194,14 @@ class ExLogger(logging.Logger):
         widget.mainloop()
 
 
-def create_logger(name: str, logger_folder: PathLike) -> ExLogger:
+def create_logger(
+    name: str,
+    logger_folder: PathLike,
+    overlay: bool = True,
+) -> ExLogger:
     logger = logging.getLogger(name)
     logger.__class__ = ExLogger
+    logger.overlay = overlay
     logger.setLevel(logging.INFO)
     file_handler = FileHandler(logger_folder / 'mummy.log')
     formatter = logging.Formatter('%(levelname)s - %(message)s')
@@ -0,0 +1,135 @@
+"""
+单帧界面状态分类。
+
+把 materials 中的图标缩放成低分辨率的灰度签名并缓存，分类时只对降采样后的
+一帧做几次模板匹配。背包页签被选中时图标反色，归一化相关系数会变为强负相关，
+因此同一次匹配即可区分页签是否被选中。
+"""
+from enum import Enum, unique
+from os import PathLike
+from typing import Dict, Optional
+
+import attrs
+import cv2
+import numpy as np
+
+from genshin_mummy.type import Point
+
+MENU_KEYS = ('exit_icon', 'inventory_icon')
+INVENTORY_TAB_KEYS = ('artifact_icon', 'weapon_icon')
+
+
+@unique
+class ScreenState(Enum):
+    MAIN = 'main'
+    MENU = 'menu'
+    INVENTORY_ARTIFACT = 'inventory_artifact'
+    INVENTORY_WEAPON = 'inventory_weapon'
+    # 背包中的其他页签
+    INVENTORY_OTHER = 'inventory_other'
+    # 没有任何已知图标：主界面没有固定图标，界面切换途中的画面也是如此，
+    # 只凭一帧无法区分
+    UNKNOWN = 'unknown'
+
+
+TAB_TO_STATE = {
+    'artifact_icon': ScreenState.INVENTORY_ARTIFACT,
+    'weapon_icon': ScreenState.INVENTORY_WEAPON,
+}
+
+
+@attrs.define
+class IconMatch:
+    score: float = attrs.field()
+    # 负相关说明图标反色，即页签处于选中状态
+    inverted: bool = attrs.field()
+    center: Point = attrs.field()
+
+
+@attrs.define
+class ScreenClassification:
+    state: ScreenState = attrs.field()
+    # 本帧中找到的图标中心，屏幕坐标，可直接用于点击
+    positions: Dict[str, Point] = attrs.field(factory=dict)
+
+
+def to_small_gray(image: np.ndarray, scale: float):
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    return cv2.resize(
+        image,
+        None,
+        fx=scale,
+        fy=scale,
+        interpolation=cv2.INTER_AREA,
+    )
+
+
+@attrs.define
+class ScreenStateClassifier:
+    key_to_path: Dict[str, PathLike] = attrs.field()
+    scale: float = attrs.field(default=0.5)
+    match_thres: float = attrs.field(default=0.8)
+    _signatures: Dict[str, np.ndarray] = attrs.field(init=False, factory=dict)
+
+    def signature(self, key: str):
+        signature = self._signatures.get(key)
+        if signature is None:
+            template = cv2.imread(str(self.key_to_path[key]))
+            gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+            signature = to_small_gray(gray, self.scale)
+            self._signatures[key] = signature
+        return signature
+
+    def match(self, small_gray: np.ndarray, key: str) -> Optional[IconMatch]:
+        signature = self.signature(key)
+        if (signature.shape[0] > small_gray.shape[0]
+                or signature.shape[1] > small_gray.shape[1]):
+            return None
+        result = cv2.matchTemplate(
+            small_gray,
+            signature,
+            cv2.TM_CCOEFF_NORMED,
+        )
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+        inverted = -min_val > max_val
+        score = -min_val if inverted else max_val
+        if score < self.match_thres:
+            return None
+        x, y = min_loc if inverted else max_loc
+        height, width = signature.shape
+        center = Point(
+            x=int((x + width / 2) / self.scale),
+            y=int((y + height / 2) / self.scale),
+        )
+        return IconMatch(score=score, inverted=inverted, center=center)
+
+    def classify(self, frame: np.ndarray) -> ScreenClassification:
+        small_gray = to_small_gray(frame, self.scale)
+        tab_matches = {}
+        for key in INVENTORY_TAB_KEYS:
+            icon_match = self.match(small_gray, key)
+            if icon_match:
+                tab_matches[key] = icon_match
+        if tab_matches:
+            positions = {
+                key: icon_match.center
+                for key, icon_match in tab_matches.items()
+            }
+            selected = [
+                key for key, icon_match in tab_matches.items()
+                if icon_match.inverted
+            ]
+            if selected:
+                key = max(selected, key=lambda k: tab_matches[k].score)
+                return ScreenClassification(TAB_TO_STATE[key], positions)
+            return ScreenClassification(ScreenState.INVENTORY_OTHER, positions)
+
+        positions = {}
+        for key in MENU_KEYS:
+            icon_match = self.match(small_gray, key)
+            if icon_match and not icon_match.inverted:
+                positions[key] = icon_match.center
+        if positions:
+            return ScreenClassification(ScreenState.MENU, positions)
+        return ScreenClassification(ScreenState.UNKNOWN)
@@ -0,0 +1,139 @@
+from typing import List, Optional, Tuple
+
+import attrs
+import cv2
+import numpy as np
+
+
+def to_gray_float(image: np.ndarray):
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    return image.astype(np.float32)
+
+
+def estimate_vertical_displacement(
+    prev_image: np.ndarray,
+    curr_image: np.ndarray,
+) -> Tuple[float, float]:
+    """用相位相关估计两帧之间内容的纵向位移。
+
+    返回 (位移, 置信度)，内容向上移动（即向下滚动）时位移为正。
+    图像在纵向补零到两倍高度，避免循环卷积把大位移折返成反方向的小位移。
+    """
+    prev_gray = to_gray_float(prev_image)
+    curr_gray = to_gray_float(curr_image)
+    height, width = prev_gray.shape
+    window = cv2.createHanningWindow((width, height), cv2.CV_32F)
+    prev_padded = np.zeros((2 * height, width), dtype=np.float32)
+    curr_padded = np.zeros((2 * height, width), dtype=np.float32)
+    prev_padded[:height] = (prev_gray - prev_gray.mean()) * window
+    curr_padded[:height] = (curr_gray - curr_gray.mean()) * window
+    (_, shift_y), response = cv2.phaseCorrelate(prev_padded, curr_padded)
+    return -shift_y, response
+
+
+def overlap_error(
+    prev_image: np.ndarray,
+    curr_image: np.ndarray,
+    displacement: int,
+) -> float:
+    """按位移对齐两帧后，重叠部分的平均灰度差。"""
+    height = prev_image.shape[0]
+    if abs(displacement) >= height:
+        return float('inf')
+    prev_gray = to_gray_float(prev_image)
+    curr_gray = to_gray_float(curr_image)
+    if displacement >= 0:
+        diff = prev_gray[displacement:] - curr_gray[:height - displacement]
+    else:
+        diff = prev_gray[:height + displacement] - curr_gray[-displacement:]
+    return float(np.abs(diff).mean())
+
+
+@attrs.define
+class ScrollTracker:
+    """测量列表区的滚动位移，并学习每格滚轮对应的像素数。"""
+    min_response: float = attrs.field(default=0.05)
+    # 对齐后重叠部分的平均灰度差超过该值，认为测量结果不可信
+    max_overlap_error: float = attrs.field(default=8.0)
+    px_per_click: Optional[float] = attrs.field(default=None)
+    samples: List[float] = attrs.field(factory=list)
+
+    def expected_displacement(self, clicks: int):
+        if self.px_per_click is None or not clicks:
+            return None
+        return int(round(clicks * self.px_per_click))
+
+    def measure(
+        self,
+        prev_image: np.ndarray,
+        curr_image: np.ndarray,
+        clicks: int = 0,
+    ):
+        """测量滚动位移，无法可靠测量时返回None。
+
+        已学到每格像素数时先按预测位移对齐两帧的重叠部分，只估计残差，
+        这样即使一次翻过大半个列表区也能测准；对齐失败（例如撞到边界导致
+        实际位移远小于预测）时再退回整帧估计。
+        """
+        expected = self.expected_displacement(clicks)
+        height = prev_image.shape[0]
+        if expected and abs(expected) < height:
+            if expected > 0:
+                prev_overlap = prev_image[expected:]
+                curr_overlap = curr_image[:height - expected]
+            else:
+                prev_overlap = prev_image[:height + expected]
+                curr_overlap = curr_image[-expected:]
+            residual, response = estimate_vertical_displacement(
+                prev_overlap,
+                curr_overlap,
+            )
+            displacement = self.verify(
+                prev_image,
+                curr_image,
+                expected + residual,
+                response,
+            )
+            if displacement is not None:
+                return displacement
+        displacement, response = estimate_vertical_displacement(
+            prev_image,
+            curr_image,
+        )
+        return self.verify(prev_image, curr_image, displacement, response)
+
+    def verify(
+        self,
+        prev_image: np.ndarray,
+        curr_image: np.ndarray,
+        displacement: float,
+        response: float,
+    ):
+        """回到像素上核对亚像素位移的上下两个取整，返回可信的整数位移。
+
+        相位相关在重叠很少时可能给出虚假的峰，亚像素结果也可能恰好落在半像素上。
+        """
+        if response < self.min_response:
+            return None
+        candidates = {int(np.floor(displacement)), int(np.ceil(displacement))}
+        errors = {
+            candidate: overlap_error(prev_image, curr_image, candidate)
+            for candidate in candidates
+        }
+        best = min(errors, key=errors.get)
+        if errors[best] > self.max_overlap_error:
+            return None
+        return best
+
+    def learn(self, displacement: Optional[int], clicks: int):
+        # 撞到边界时滚动会被截断，只会让样本偏小，因此取最大值作为估计
+        if not displacement or not clicks:
+            return
+        self.samples.append(abs(displacement) / abs(clicks))
+        self.px_per_click = max(self.samples)
+
+    def clicks_for(self, pixels: int):
+        if self.px_per_click is None:
+            return None
+        return max(int(round(abs(pixels) / self.px_per_click)), 1)
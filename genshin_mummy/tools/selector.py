@@ -1,8 +1,25 @@
 import time
-
-import pyautogui
-
-from .locator import is_menu_page, locate
+from typing import Optional
+
+import numpy as np
+
+from .clock import Clock
+from .controller import create_controller
+from .locator import (
+    INVENTORY_TAB_ICON_KEYS,
+    KEY_TO_PATH,
+    InventoryLocator,
+    get_frame_source,
+    locate,
+    template_path,
+)
+from .screen_state import (
+    TAB_TO_STATE,
+    ScreenClassification,
+    ScreenState,
+    ScreenStateClassifier,
+)
+from .waiter import to_thumbnail, wait_until_stable
 
 LITTLE_MOVE = 5
 
@@ -11,51 +28,197 @@ KEY_PRESS_PAUSE = 0.1
 CLICK_INTERVAL = 3
 
 RENDERING_TIME = 0.5
-
-
-def wait_rendering():
-    time.sleep(RENDERING_TIME)
+# 状态机最多执行的操作数，防止界面无法识别时死循环
+MAX_NAVIGATION_STEPS = 8
+# 操作后界面仍停留在原状态时，最多等待游戏响应的时间，超时才认为操作没有生效
+RESPONSE_TIMEOUT = 2
+# 持续这么久无法识别时认为处于主界面
+UNKNOWN_TIMEOUT = 1
+
+# 模拟运行时替换为VirtualClock与模拟的Controller
+clock = Clock()
+# 为None时在首次操作时创建
+controller = None
+# ADAPTIVE_WAITING关闭时固定等待RENDERING_TIME
+ADAPTIVE_WAITING = True
+classifier = ScreenStateClassifier(
+    key_to_path={key: template_path(key)
+                 for key in KEY_TO_PATH})
+
+# 按分辨率缓存背包页签位置，首次定位后切换页签不再搜索；
+# 只缓存定位成功的结果，按缓存位置点击没有切换到对应页签时丢弃
+inventory_locators = {}
+
+INVENTORY_STATES = (
+    ScreenState.INVENTORY_ARTIFACT,
+    ScreenState.INVENTORY_WEAPON,
+    ScreenState.INVENTORY_OTHER,
+)
+
+
+def get_controller():
+    global controller
+    if controller is None:
+        controller = create_controller()
+    return controller
+
+
+def take_reference(frame: np.ndarray):
+    """操作前的画面转为缩略图，交给 wait_rendering 判断画面是否已经响应。"""
+    if not ADAPTIVE_WAITING:
+        return None
+    return to_thumbnail(frame)
+
+
+def wait_rendering(reference: Optional[np.ndarray] = None):
+    """等画面相对 reference 变化并稳定，没有 reference 时固定等待。"""
+    if reference is None:
+        clock.sleep(RENDERING_TIME)
+        return
+    wait_until_stable(
+        get_frame_source(),
+        clock,
+        timeout=RENDERING_TIME,
+        reference=reference,
+    )
+
+
+def classify_screen():
+    return classifier.classify(get_frame_source().grab())
+
+
+def tab_position(frame, key):
+    """一次匹配找出所有页签，找到 key 时按分辨率缓存结果。"""
+    screen_size = (frame.shape[1], frame.shape[0])
+    inventory_locator = inventory_locators.get(screen_size)
+    if inventory_locator is not None:
+        position = inventory_locator.position(key)
+        if position is not None:
+            return position
+    inventory_locator = InventoryLocator(frame)
+    position = inventory_locator.position(key)
+    if position is not None:
+        inventory_locators[screen_size] = inventory_locator
+    return position
+
+
+def forget_tab_positions(frame):
+    inventory_locators.pop((frame.shape[1], frame.shape[0]), None)
+
+
+def plan_action(state: ScreenState, target: ScreenState):
+    """根据当前状态与目标状态给出下一步操作：
+
+    ('esc', None)、('click', 图标)，或界面无法识别时的 ('wait', None)。
+    """
+    if state == ScreenState.UNKNOWN:
+        return 'wait', None
+    if target == ScreenState.MAIN:
+        return 'esc', None
+    if target == ScreenState.MENU:
+        # 主界面按Esc打开菜单，背包按Esc返回菜单
+        return 'esc', None
+    if state == ScreenState.MAIN:
+        return 'esc', None
+    if state == ScreenState.MENU:
+        return 'click', 'inventory_icon'
+    if target == ScreenState.INVENTORY_ARTIFACT:
+        return 'click', 'artifact_icon'
+    if target == ScreenState.INVENTORY_WEAPON:
+        return 'click', 'weapon_icon'
+    raise NotImplementedError()
+
+
+def icon_position(result: ScreenClassification, frame: np.ndarray, key: str):
+    # 分类时已经找到了图标位置，找不到时才单独搜索
+    position = result.positions.get(key)
+    if position is None and key in INVENTORY_TAB_ICON_KEYS:
+        position = tab_position(frame, key)
+    if position is None:
+        position = locate(key)
+    if position is None:
+        raise RuntimeError(f'找不到图标：{key}')
+    return position
+
+
+def navigate_to(*targets: ScreenState):
+    """每次只做一次单帧分类，按状态决定按键或点击，直到进入任一目标状态。
+
+    操作前的画面作为参考，等画面变化并稳定后再分类；游戏响应较慢、
+    画面仍是原状态时继续等待，不重复操作。无法识别的画面可能处于
+    切换途中，同样只等待，持续 UNKNOWN_TIMEOUT 后才视为主界面。
+    """
+    steps = 0
+    # 上一次操作时的状态与操作完成的时间
+    acted_state = None
+    acted_at = None
+    unknown_since = None
+    # 按 tab_position 的位置点击页签后应进入的状态
+    expected_state = None
+    while True:
+        frame = get_frame_source().grab()
+        result = classifier.classify(frame)
+        now = clock.time()
+        if result.state == ScreenState.UNKNOWN:
+            if unknown_since is None:
+                unknown_since = now
+            if now - unknown_since >= UNKNOWN_TIMEOUT:
+                result = ScreenClassification(ScreenState.MAIN)
+        else:
+            unknown_since = None
+        if result.state in targets:
+            return result
+
+        action, key = plan_action(result.state, targets[0])
+        responding = (result.state == acted_state
+                      and now - acted_at < RESPONSE_TIMEOUT)
+        if action == 'wait' or responding:
+            wait_rendering(take_reference(frame))
+            continue
+        if expected_state is not None and result.state != expected_state:
+            forget_tab_positions(frame)
+        expected_state = None
+        if steps >= MAX_NAVIGATION_STEPS:
+            break
+        steps += 1
+
+        reference = take_reference(frame)
+        if action == 'esc':
+            get_controller().press('esc')
+        else:
+            position = icon_position(result, frame, key)
+            if key not in result.positions:
+                expected_state = TAB_TO_STATE.get(key)
+            get_controller().leftClick(*position, duration=MOUSE_MOVE_TIME)
+        acted_state = result.state
+        acted_at = clock.time()
+        unknown_since = None
+        wait_rendering(reference)
+    raise RuntimeError(f'无法切换到界面：{targets[0].value}')
 
 
 def select_menu_page():
-    pyautogui.press("esc", interval=RENDERING_TIME)
-    while not is_menu_page():
-        pyautogui.press("esc", interval=RENDERING_TIME)
+    navigate_to(ScreenState.MENU)
 
 
 def select_main_page():
-    select_menu_page()
-    pyautogui.press('esc', interval=RENDERING_TIME)
+    navigate_to(ScreenState.MAIN)
 
 
 def select_inventory_page():
-    select_menu_page()
-    key = 'inventory_icon'
-    inventory_icon_pos = locate(key)
-    pyautogui.leftClick(*inventory_icon_pos, duration=MOUSE_MOVE_TIME)
+    navigate_to(*INVENTORY_STATES)
 
 
 def select_artifact_on_inventory_page():
-    key = 'artifact_icon'
-    wait_rendering()
-    artifact_icon_pos = locate(key, True)
-    if artifact_icon_pos is None:
-        locate(key, extension_mode=True)
-    pyautogui.leftClick(*artifact_icon_pos, duration=MOUSE_MOVE_TIME)
+    navigate_to(ScreenState.INVENTORY_ARTIFACT)
 
 
 def select_weapon_on_inventory_page():
-    key = 'weapon_icon'
-    wait_rendering()
-    artifact_icon_pos = locate(key)
-    if artifact_icon_pos is None:
-        locate(key, extension_mode=True)
-    pyautogui.leftClick(*artifact_icon_pos, duration=MOUSE_MOVE_TIME)
+    navigate_to(ScreenState.INVENTORY_WEAPON)
 
 
 def select_artifact_page():
     select_inventory_page()
-    # TODO: init and cache those fixed icons' position.
     select_artifact_on_inventory_page()
 
 
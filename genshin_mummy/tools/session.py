@@ -0,0 +1,284 @@
+"""
+录制与回放一次完整的运行会话。
+
+会话目录包含两个文件：
+    frames.bin  所有截图的原始像素，按出现顺序追加，重复的帧只存一份；
+    index.jsonl 事件索引，首行为会话头，其余每行一个截图、输入或计时事件。
+
+回放时帧数据通过 np.memmap 映射，不需要显示器和游戏即可复现整个流程。
+等待渲染与闪烁检测按时间决定截多少帧，因此计时也要录制：回放时时钟
+返回录制时的读数，每次等待截取的帧数与录制时一致，sleep 不再真正等待。
+"""
+import hashlib
+import json
+import time
+from os import PathLike
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from genshin_mummy.tools.capture import (
+    FrameSource,
+    RegionFrame,
+    normalize_region,
+)
+from genshin_mummy.tools.clock import Clock
+from genshin_mummy.tools.controller import Controller
+from genshin_mummy.type import Box
+
+# 版本2开始录制计时事件
+SESSION_VERSION = 2
+FRAMES_FILENAME = 'frames.bin'
+INDEX_FILENAME = 'index.jsonl'
+
+
+class SessionMismatch(Exception):
+
+    def __init__(self, expected: str, actual: str):
+        self.expected = expected
+        self.actual = actual
+
+    def __str__(self):
+        return f'回放会话与当前流程不一致：期望 {self.expected}，实际 {self.actual}'
+
+
+def region_to_list(region: Optional[Box]):
+    if region is None:
+        return None
+    return [region.left, region.top, region.width, region.height]
+
+
+class SessionWriter:
+
+    def __init__(self, session_fd: PathLike):
+        self.session_folder = Path(session_fd)
+        self.session_folder.mkdir(parents=True, exist_ok=True)
+        self._frames_fp = open(self.session_folder / FRAMES_FILENAME, 'wb')
+        self._index_fp = open(
+            self.session_folder / INDEX_FILENAME,
+            'w',
+            encoding='utf-8',
+        )
+        self._offset = 0
+        self._digest_to_offset: Dict[bytes, int] = {}
+        self._start = time.perf_counter()
+        self._write_line({'version': SESSION_VERSION})
+
+    def _write_line(self, item: dict):
+        self._index_fp.write(json.dumps(item) + '\n')
+
+    def write_event(self, kind: str, **payload):
+        item = {'kind': kind, 't': time.perf_counter() - self._start}
+        item.update(payload)
+        self._write_line(item)
+
+    def write_frame(self, image: np.ndarray, region: Optional[Box] = None):
+        data = np.ascontiguousarray(image, dtype=np.uint8)
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        offset = self._digest_to_offset.get(digest)
+        if offset is None:
+            offset = self._offset
+            self._frames_fp.write(data.tobytes())
+            self._offset += data.nbytes
+            self._digest_to_offset[digest] = offset
+        self.write_event(
+            'frame',
+            offset=offset,
+            shape=list(data.shape),
+            region=region_to_list(region),
+        )
+
+    def close(self):
+        self._frames_fp.close()
+        self._index_fp.close()
+
+
+class SessionReader:
+
+    def __init__(self, session_fd: PathLike):
+        self.session_folder = Path(session_fd)
+        with open(
+                self.session_folder / INDEX_FILENAME,
+                'r',
+                encoding='utf-8',
+        ) as fin:
+            lines = [json.loads(line) for line in fin if line.strip()]
+        header, events = lines[0], lines[1:]
+        if header.get('version') != SESSION_VERSION:
+            raise SessionMismatch(
+                expected=f'version={SESSION_VERSION}',
+                actual=f"version={header.get('version')}",
+            )
+        frames_fp = self.session_folder / FRAMES_FILENAME
+        if frames_fp.stat().st_size > 0:
+            self.frames = np.memmap(frames_fp, dtype=np.uint8, mode='r')
+        else:
+            self.frames = np.zeros(0, dtype=np.uint8)
+        self.frame_events: List[dict] = []
+        self.input_events: List[dict] = []
+        self.clock_events: List[dict] = []
+        for event in events:
+            if event['kind'] == 'frame':
+                self.frame_events.append(event)
+            elif event['kind'] == 'time':
+                self.clock_events.append(event)
+            else:
+                self.input_events.append(event)
+
+    def load_frame(self, event: dict) -> np.ndarray:
+        shape = tuple(event['shape'])
+        size = int(np.prod(shape))
+        offset = event['offset']
+        return self.frames[offset:offset + size].reshape(shape)
+
+
+class RecordingFrameSource(FrameSource):
+
+    def __init__(self, frame_source: FrameSource, writer: SessionWriter):
+        self.frame_source = frame_source
+        self.writer = writer
+
+    def grab(self):
+        image = self.frame_source.grab()
+        self.writer.write_frame(image)
+        return image
+
+    def grab_region(self, region: Box):
+        frame = self.frame_source.grab_region(region)
+        self.writer.write_frame(frame.image, frame.region)
+        return frame
+
+    def close(self):
+        self.frame_source.close()
+
+
+class RecordingController(Controller):
+
+    def __init__(self, controller: Controller, writer: SessionWriter):
+        self.controller = controller
+        self.writer = writer
+
+    def size(self):
+        width, height = self.controller.size()
+        self.writer.write_event('size', value=[width, height])
+        return width, height
+
+    def position(self):
+        x, y = self.controller.position()
+        self.writer.write_event('position', value=[x, y])
+        return x, y
+
+    def moveTo(self, x: int, y: int, duration: float = 0.0):
+        self.writer.write_event('move', x=int(x), y=int(y))
+        self.controller.moveTo(x, y, duration)
+
+    def leftClick(self, x: int, y: int, duration: float = 0.0):
+        self.writer.write_event('click', x=int(x), y=int(y))
+        self.controller.leftClick(x, y, duration=duration)
+
+    def scroll(self, clicks: int):
+        self.writer.write_event('scroll', clicks=int(clicks))
+        self.controller.scroll(clicks)
+
+    def press(self, key: str, interval: float = 0.0):
+        self.writer.write_event('press', key=key)
+        self.controller.press(key, interval=interval)
+
+
+class RecordingClock(Clock):
+
+    def __init__(self, clock: Clock, writer: SessionWriter):
+        self.clock = clock
+        self.writer = writer
+
+    def time(self) -> float:
+        value = self.clock.time()
+        self.writer.write_event('time', value=value)
+        return value
+
+    def sleep(self, seconds: float):
+        self.clock.sleep(seconds)
+
+
+class ReplayFrameSource(FrameSource):
+
+    def __init__(self, reader: SessionReader):
+        self.reader = reader
+        self.cursor = 0
+
+    def _next_event(self, region: Optional[Box]):
+        if self.cursor >= len(self.reader.frame_events):
+            raise SessionMismatch(expected='frame', actual='end of session')
+        event = self.reader.frame_events[self.cursor]
+        self.cursor += 1
+        if event['region'] != region_to_list(region):
+            raise SessionMismatch(
+                expected=f"region={event['region']}",
+                actual=f'region={region_to_list(region)}',
+            )
+        return event
+
+    def grab(self):
+        event = self._next_event(None)
+        return self.reader.load_frame(event)
+
+    def grab_region(self, region: Box):
+        region = normalize_region(region)
+        event = self._next_event(region)
+        return RegionFrame(image=self.reader.load_frame(event), region=region)
+
+
+class ReplayController(Controller):
+    """按录制顺序核对输入事件，查询类事件直接返回录制时的结果。"""
+
+    def __init__(self, reader: SessionReader):
+        self.reader = reader
+        self.cursor = 0
+
+    def _next_event(self, kind: str):
+        if self.cursor >= len(self.reader.input_events):
+            raise SessionMismatch(expected=kind, actual='end of session')
+        event = self.reader.input_events[self.cursor]
+        self.cursor += 1
+        if event['kind'] != kind:
+            raise SessionMismatch(expected=event['kind'], actual=kind)
+        return event
+
+    def size(self):
+        width, height = self._next_event('size')['value']
+        return width, height
+
+    def position(self):
+        x, y = self._next_event('position')['value']
+        return x, y
+
+    def moveTo(self, x: int, y: int, duration: float = 0.0):
+        self._next_event('move')
+
+    def leftClick(self, x: int, y: int, duration: float = 0.0):
+        self._next_event('click')
+
+    def scroll(self, clicks: int):
+        self._next_event('scroll')
+
+    def press(self, key: str, interval: float = 0.0):
+        self._next_event('press')
+
+
+class ReplayClock(Clock):
+    """按顺序返回录制时的时钟读数，sleep 不等待。"""
+
+    def __init__(self, reader: SessionReader):
+        self.reader = reader
+        self.cursor = 0
+
+    def time(self) -> float:
+        if self.cursor >= len(self.reader.clock_events):
+            raise SessionMismatch(expected='time', actual='end of session')
+        event = self.reader.clock_events[self.cursor]
+        self.cursor += 1
+        return event['value']
+
+    def sleep(self, seconds: float):
+        pass
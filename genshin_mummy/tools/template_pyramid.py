@@ -0,0 +1,173 @@
+"""
+多尺度模板匹配。
+
+每帧只把截图转成灰度并降采样一次，再按候选界面缩放比例建立图像金字塔，
+所有请求的模板在同一个金字塔上匹配。每个分辨率命中的缩放比例会被缓存，
+之后的帧只需要构建这一层，找不到时才回退到完整金字塔。
+"""
+from os import PathLike
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import attrs
+import cv2
+import numpy as np
+
+from genshin_mummy.type import Box
+
+# 界面相对模板的缩放比例，按 2 的四分之一次幂递增
+DEFAULT_UI_SCALES = tuple(2**(k / 4) for k in range(-4, 3))
+
+
+def to_gray(image: np.ndarray):
+    if image.ndim == 3:
+        return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    return image
+
+
+@attrs.define
+class TemplateMatch:
+    # 屏幕坐标
+    box: Box = attrs.field()
+    score: float = attrs.field()
+    ui_scale: float = attrs.field()
+
+
+@attrs.define
+class ScreenPyramid:
+    """一帧截图的金字塔，各层按需构建且只构建一次。"""
+    gray: np.ndarray = attrs.field(converter=to_gray)
+    downsample: float = attrs.field(default=0.5)
+    # 截图在屏幕上的偏移
+    offset: Tuple[int, int] = attrs.field(default=(0, 0))
+    _levels: Dict[float, np.ndarray] = attrs.field(init=False, factory=dict)
+    _base: Optional[np.ndarray] = attrs.field(init=False, default=None)
+
+    @property
+    def base(self):
+        if self._base is None:
+            self._base = cv2.resize(
+                self.gray,
+                None,
+                fx=self.downsample,
+                fy=self.downsample,
+                interpolation=cv2.INTER_AREA,
+            )
+        return self._base
+
+    @property
+    def built_levels(self):
+        return len(self._levels)
+
+    def level(self, ui_scale: float):
+        """把截图缩放到界面比例为 1 的大小，模板就不需要缩放。"""
+        image = self._levels.get(ui_scale)
+        if image is None:
+            base = self.base
+            image = cv2.resize(
+                base,
+                (max(1, round(base.shape[1] / ui_scale)),
+                 max(1, round(base.shape[0] / ui_scale))),
+                interpolation=(cv2.INTER_AREA
+                               if ui_scale > 1 else cv2.INTER_LINEAR),
+            )
+            self._levels[ui_scale] = image
+        return image
+
+    def to_screen(self, x: int, y: int, width: int, height: int,
+                  ui_scale: float):
+        factor = ui_scale / self.downsample
+        return Box(
+            left=int(x * factor) + self.offset[0],
+            top=int(y * factor) + self.offset[1],
+            width=int(width * factor),
+            height=int(height * factor),
+        )
+
+
+@attrs.define
+class PyramidMatcher:
+    key_to_path: Dict[str, PathLike] = attrs.field()
+    ui_scales: Sequence[float] = attrs.field(default=DEFAULT_UI_SCALES)
+    downsample: float = attrs.field(default=0.5)
+    match_thres: float = attrs.field(default=0.8)
+    # 各分辨率命中的界面缩放比例
+    scale_cache: Dict[Tuple[int, int], float] = attrs.field(factory=dict)
+    _templates: Dict[str, np.ndarray] = attrs.field(init=False, factory=dict)
+
+    def template(self, key: str):
+        template = self._templates.get(key)
+        if template is None:
+            image = cv2.imread(str(self.key_to_path[key]))
+            template = cv2.resize(
+                cv2.cvtColor(image, cv2.COLOR_BGR2GRAY),
+                None,
+                fx=self.downsample,
+                fy=self.downsample,
+                interpolation=cv2.INTER_AREA,
+            )
+            self._templates[key] = template
+        return template
+
+    def pyramid(self, image: np.ndarray, offset: Tuple[int, int] = (0, 0)):
+        return ScreenPyramid(image, downsample=self.downsample, offset=offset)
+
+    def match_level(
+        self,
+        pyramid: ScreenPyramid,
+        keys: Iterable[str],
+        ui_scale: float,
+    ) -> Dict[str, TemplateMatch]:
+        image = pyramid.level(ui_scale)
+        matches = {}
+        for key in keys:
+            template = self.template(key)
+            height, width = template.shape
+            if height > image.shape[0] or width > image.shape[1]:
+                continue
+            result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+            _, score, _, (x, y) = cv2.minMaxLoc(result)
+            if score < self.match_thres:
+                continue
+            matches[key] = TemplateMatch(
+                box=pyramid.to_screen(x, y, width, height, ui_scale),
+                score=score,
+                ui_scale=ui_scale,
+            )
+        return matches
+
+    def match(
+        self,
+        pyramid: ScreenPyramid,
+        keys: Sequence[str],
+        screen_size: Tuple[int, int],
+    ) -> Dict[str, TemplateMatch]:
+        """在同一个金字塔上匹配所有模板，返回找到的模板。"""
+        cached_scale = self.scale_cache.get(screen_size)
+        best = {}
+        if cached_scale is not None:
+            best = self.match_level(pyramid, keys, cached_scale)
+            if len(best) == len(keys):
+                return best
+        # 缓存尺度上找不到的模板在所有尺度上取得分最高者
+        missing = [key for key in keys if key not in best]
+        for ui_scale in self.ui_scales:
+            if ui_scale == cached_scale:
+                continue
+            for key, match in self.match_level(pyramid, missing,
+                                               ui_scale).items():
+                if key not in best or match.score > best[key].score:
+                    best[key] = match
+        if best:
+            # 以得分最高的模板所在尺度作为该分辨率的缩放比例
+            winner = max(best.values(), key=lambda match: match.score)
+            self.scale_cache[screen_size] = winner.ui_scale
+        return best
+
+    def locate(
+            self,
+            image: np.ndarray,
+            keys: Sequence[str],
+            screen_size: Tuple[int, int],
+            offset: Tuple[int, int] = (0, 0),
+    ) -> Dict[str, TemplateMatch]:
+        return self.match(self.pyramid(image, offset), keys, screen_size)
@@ -0,0 +1,137 @@
+"""
+分块哈希的变化检测。
+
+只关心“区域有没有变化”时不需要完整的差分图：把区域切成固定大小的块，
+每块计算一个随机加权和作为哈希，与上一帧的哈希逐块比较即可。
+逐行带计算哈希，只需要布尔结果时遇到第一个变化的块就返回。
+"""
+from typing import Dict, Set, Tuple
+
+import attrs
+import numpy as np
+
+TILE_SIZE = 32
+
+
+def validate_tile_size(instance, attribute, value):
+    # 每块每行的字节数需要能按 8 字节对齐成 uint64
+    if value <= 0 or value % 8 != 0:
+        raise ValueError(f'tile_size 需为 8 的正整数倍，当前为 {value}')
+
+
+@attrs.define
+class BandLayout:
+    """一行块的字节布局及对应的随机权重。"""
+    tile_words: int = attrs.field()
+    full_tiles: int = attrs.field()
+    word_weights: np.ndarray = attrs.field()
+    tail_weights: np.ndarray = attrs.field()
+    buffer: np.ndarray = attrs.field()
+
+
+@attrs.define
+class TileHasher:
+    tile_size: int = attrs.field(default=TILE_SIZE,
+                                 validator=validate_tile_size)
+    seed: int = attrs.field(default=0)
+    _layouts: Dict[Tuple[int, int], BandLayout] = attrs.field(init=False,
+                                                              factory=dict)
+
+    def _layout(self, row_bytes: int, channels: int):
+        layout = self._layouts.get((row_bytes, channels))
+        if layout is None:
+            tile_bytes = self.tile_size * channels
+            full_tiles = row_bytes // tile_bytes
+            words = full_tiles * tile_bytes // 8
+            tail_bytes = row_bytes - full_tiles * tile_bytes
+            rng = np.random.default_rng(self.seed)
+            # 奇数权重乘法在 2^64 下可逆，单个字的变化不会被抵消
+            layout = BandLayout(
+                tile_words=tile_bytes // 8,
+                full_tiles=full_tiles,
+                word_weights=rng.integers(
+                    0,
+                    2**63,
+                    size=(self.tile_size, words),
+                    dtype=np.uint64,
+                ) | 1,
+                tail_weights=rng.integers(
+                    0,
+                    2**63,
+                    size=(self.tile_size, tail_bytes),
+                    dtype=np.uint64,
+                ) | 1,
+                buffer=np.empty((self.tile_size, words), dtype=np.uint64),
+            )
+            self._layouts[(row_bytes, channels)] = layout
+        return layout
+
+    def grid_shape(self, image: np.ndarray) -> Tuple[int, int]:
+        rows = -(-image.shape[0] // self.tile_size)
+        cols = -(-image.shape[1] // self.tile_size)
+        return rows, cols
+
+    def hash_band(self, image: np.ndarray, row: int) -> np.ndarray:
+        """计算第 row 行块的哈希，返回长度为块列数的数组。"""
+        top = row * self.tile_size
+        band = image[top:top + self.tile_size]
+        height = band.shape[0]
+        band = band.reshape(height, -1)
+        if band.strides[-1] != band.itemsize:
+            # 按通道切片等情况下每行不连续，无法按 uint64 解释
+            band = np.ascontiguousarray(band)
+        row_bytes = band.shape[1]
+        channels = row_bytes // image.shape[1]
+        layout = self._layout(row_bytes, channels)
+        words = layout.word_weights.shape[1]
+        hashes = np.empty(
+            layout.full_tiles + (layout.tail_weights.shape[1] > 0),
+            dtype=np.uint64,
+        )
+        if words:
+            # 按 8 字节一组参与加权，比逐字节快得多
+            band_words = band[:, :words * 8].view(np.uint64)
+            buffer = layout.buffer[:height]
+            np.multiply(band_words, layout.word_weights[:height], out=buffer)
+            word_sums = buffer.sum(axis=0)
+            starts = np.arange(0, words, layout.tile_words)
+            hashes[:layout.full_tiles] = np.add.reduceat(word_sums, starts)
+        if layout.tail_weights.shape[1]:
+            # 宽度不是块大小整数倍时，最右侧不完整的块逐字节计算
+            tail = band[:, words * 8:].astype(np.uint64)
+            tail *= layout.tail_weights[:height]
+            hashes[-1] = tail.sum()
+        return hashes
+
+    def hash(self, image: np.ndarray) -> np.ndarray:
+        """计算所有块的哈希，形状为 (块行数, 块列数)。"""
+        rows, cols = self.grid_shape(image)
+        hashes = np.empty((rows, cols), dtype=np.uint64)
+        for row in range(rows):
+            hashes[row] = self.hash_band(image, row)
+        return hashes
+
+    def changed_tiles(
+        self,
+        reference: np.ndarray,
+        image: np.ndarray,
+    ) -> Set[Tuple[int, int]]:
+        """返回与参考哈希不一致的块坐标 (行, 列)。"""
+        if reference.shape != self.grid_shape(image):
+            raise ValueError('参考哈希与图像的分块数不一致')
+        changed = set()
+        for row in range(reference.shape[0]):
+            cols = np.flatnonzero(self.hash_band(image, row) != reference[row])
+            changed.update((row, int(col)) for col in cols)
+        return changed
+
+    def changed_ratio(self, reference: np.ndarray, image: np.ndarray):
+        return len(self.changed_tiles(reference, image)) / reference.size
+
+    def any_changed(self, reference: np.ndarray, image: np.ndarray) -> bool:
+        if reference.shape != self.grid_shape(image):
+            return True
+        for row in range(reference.shape[0]):
+            if np.any(self.hash_band(image, row) != reference[row]):
+                return True
+        return False
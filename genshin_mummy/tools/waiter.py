@@ -0,0 +1,107 @@
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from genshin_mummy.tools.capture import FrameSource
+from genshin_mummy.tools.clock import Clock
+from genshin_mummy.tools.tile_hash import TileHasher
+from genshin_mummy.type import Box
+
+THUMBNAIL_SCALE = 0.25
+PIXEL_DIFF_THRES = 8
+# 选中圣遗物的闪烁边框一直在变化，允许少量像素不一致
+CHANGED_RATIO_TOLERANCE = 0.02
+
+
+def grab_image(frame_source: FrameSource, region: Optional[Box] = None):
+    if region is None:
+        return frame_source.grab()
+    return frame_source.grab_region(region).image
+
+
+def to_thumbnail(image: np.ndarray, scale: float = THUMBNAIL_SCALE):
+    """已经截取的画面转为缩略图，与 take_thumbnail 的结果可以直接比较。"""
+    gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    return cv2.resize(
+        gray,
+        None,
+        fx=scale,
+        fy=scale,
+        interpolation=cv2.INTER_AREA,
+    )
+
+
+def take_thumbnail(
+    frame_source: FrameSource,
+    region: Optional[Box] = None,
+    scale: float = THUMBNAIL_SCALE,
+):
+    return to_thumbnail(grab_image(frame_source, region), scale)
+
+
+def is_similar(
+    thumbnail_a: np.ndarray,
+    thumbnail_b: np.ndarray,
+    pixel_thres: int = PIXEL_DIFF_THRES,
+    tolerance: float = CHANGED_RATIO_TOLERANCE,
+):
+    if thumbnail_a.shape != thumbnail_b.shape:
+        return False
+    changed = np.count_nonzero(
+        cv2.absdiff(thumbnail_a, thumbnail_b) > pixel_thres)
+    return changed <= tolerance * thumbnail_a.size
+
+
+def wait_until_stable(
+    frame_source: FrameSource,
+    clock: Clock,
+    region: Optional[Box] = None,
+    timeout: float = 0.5,
+    stable_frames: int = 3,
+    poll_interval: float = 0.03,
+    reference: Optional[np.ndarray] = None,
+):
+    """轮询低分辨率画面，连续 stable_frames 帧一致即认为渲染完成。
+
+    给定操作前的缩略图 reference 时，会先等画面发生变化再判断稳定，
+    避免游戏还没开始响应就提前返回。超时返回 False。
+    """
+    deadline = clock.time() + timeout
+    prev = take_thumbnail(frame_source, region)
+    changed = reference is None or not is_similar(prev, reference)
+    matched = 1
+    while True:
+        if changed and matched >= stable_frames:
+            return True
+        if clock.time() >= deadline:
+            return False
+        clock.sleep(poll_interval)
+        curr = take_thumbnail(frame_source, region)
+        if not changed:
+            changed = not is_similar(curr, reference)
+        elif is_similar(curr, prev):
+            matched += 1
+        else:
+            matched = 1
+        prev = curr
+
+
+def wait_until_tiles_changed(
+    frame_source: FrameSource,
+    clock: Clock,
+    hasher: TileHasher,
+    reference: np.ndarray,
+    region: Optional[Box] = None,
+    timeout: float = 0.5,
+    poll_interval: float = 0.01,
+):
+    """等待画面的分块哈希相对 reference 发生变化，发现第一个变化的块即返回。"""
+    deadline = clock.time() + timeout
+    while True:
+        image = grab_image(frame_source, region)
+        if hasher.any_changed(reference, image):
+            return True
+        if clock.time() >= deadline:
+            return False
+        clock.sleep(poll_interval)
@@ -0,0 +1,67 @@
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from genshin_mummy.artifact_helper.batch import scan_artifacts
+from genshin_mummy.artifact_helper.page_manager import ArtifactPage
+from genshin_mummy.artifact_helper.simulator import (
+    SyntheticArtifactPage,
+    random_artifacts,
+)
+from genshin_mummy.tools.frame_store import FrameStore, read_frame
+from genshin_mummy.tools.logger import create_logger
+
+
+def test_frame_store_grows(tmp_path):
+    store_fp = tmp_path / 'frames.bin'
+    store = FrameStore(store_fp, frame_shape=(4, 3, 3), capacity=2)
+    frames = [np.full((4, 3, 3), idx, dtype=np.uint8) for idx in range(5)]
+    for frame in frames:
+        store.append(frame)
+    store.flush()
+    assert len(store) == 5 and store.capacity == 8
+    for idx, frame in enumerate(frames):
+        np.testing.assert_array_equal(store[idx], frame)
+        np.testing.assert_array_equal(read_frame(store_fp, (4, 3, 3), idx),
+                                      frame)
+    store.close(delete=True)
+    assert not store_fp.exists()
+
+
+def test_scan_then_revisit(tmp_path):
+    num = 60
+    sim = SyntheticArtifactPage(random_artifacts(num))
+    page = ArtifactPage(
+        logger=create_logger('batch', Path(tempfile.mkdtemp()), overlay=False),
+        frame_source=sim,
+        controller=sim,
+        clock=sim.clock,
+    )
+    store, scanned = scan_artifacts(page, tmp_path / 'frames.bin')
+    assert len(scanned) >= num
+    locks = sim.state.locks
+    # 末行的空格子停留在最后一个圣遗物上
+    assert sim.state.selected == num - 1
+    np.testing.assert_array_equal(
+        store[scanned[-1].index],
+        sim.grab_region(page.desc_loc).image,
+    )
+
+    targets = {
+        item.cell: idx
+        for idx, item in enumerate(scanned[:num]) if idx % 7 == 2
+    }
+    icon = sim.lock_icon_box()
+    visited = []
+    for cell in page.iter_cells(list(targets)):
+        visited.append(sim.state.selected)
+        assert sim.state.selected == targets[cell]
+        sim.leftClick(sim.desc_box.left + icon.center_x,
+                      sim.desc_box.top + icon.center_y)
+    assert visited == sorted(targets.values())
+    toggled = [
+        idx for idx, (before, after) in enumerate(zip(locks, sim.state.locks))
+        if before != after
+    ]
+    assert toggled == sorted(targets.values())
@@ -0,0 +1,43 @@
+import numpy as np
+
+from genshin_mummy.tools.blink import BlinkDetector
+from genshin_mummy.tools.capture import FrameSource
+from genshin_mummy.tools.clock import VirtualClock
+from genshin_mummy.type import Box
+
+
+class BlinkingFrameSource(FrameSource):
+
+    def __init__(self, clock: VirtualClock, blink_box: Box = None):
+        self.clock = clock
+        self.blink_box = blink_box
+
+    def grab(self):
+        self.clock.sleep(1 / 60)
+        screen = np.full((200, 300, 3), 128, dtype=np.uint8)
+        if self.blink_box:
+            box = self.blink_box
+            value = int(self.clock.time() * 60) % 2 * 255
+            screen[box.top:box.bottom, box.left:box.right] = value
+        return screen
+
+
+def test_locate_blink():
+    clock = VirtualClock()
+    blink_box = Box(left=40, top=60, width=50, height=30)
+    detector = BlinkDetector(BlinkingFrameSource(clock, blink_box), clock)
+    result = detector.detect(Box(left=20, top=20, width=200, height=150))
+    assert result.box == blink_box
+    assert result.frames == detector.min_frames
+
+
+def test_latency_budget():
+    clock = VirtualClock()
+    detector = BlinkDetector(
+        BlinkingFrameSource(clock),
+        clock,
+        latency_budget=0.5,
+    )
+    result = detector.detect(Box(left=20, top=20, width=200, height=150))
+    assert result.box is None
+    assert 0.5 <= result.elapsed < 0.6
@@ -0,0 +1,72 @@
+import numpy as np
+
+from genshin_mummy.tools import capture
+from genshin_mummy.tools.capture import (
+    CaptureBackend,
+    FrameSource,
+    RegionFrame,
+    create_frame_source,
+    normalize_region,
+)
+from genshin_mummy.type import Box, Point
+
+
+class StubFrameSource(FrameSource):
+
+    def __init__(self, width=64, height=48):
+        # 每个像素的值编码了它的坐标，方便检查裁剪位置
+        ys, xs = np.mgrid[0:height, 0:width]
+        self.screen = np.stack([xs, ys, np.zeros_like(xs)],
+                               axis=2).astype(np.uint8)
+
+    def grab(self):
+        return self.screen
+
+
+def test_normalize_region():
+    region = normalize_region(Box(left=10.7, top=5.2, width=20.9, height=8.5))
+    assert region == Box(left=10, top=5, width=20, height=8)
+    assert all(
+        isinstance(value, int)
+        for value in (region.left, region.top, region.width, region.height))
+
+
+def test_grab_region_crops_normalized_region():
+    source = StubFrameSource()
+    frame = source.grab_region(Box(left=10.5, top=4.9, width=6.2, height=3.8))
+    assert frame.region == Box(left=10, top=4, width=6, height=3)
+    assert frame.image.shape == (3, 6, 3)
+    assert frame.image[0, 0, 0] == 10 and frame.image[0, 0, 1] == 4
+    assert frame.image[-1, -1, 0] == 15 and frame.image[-1, -1, 1] == 6
+
+
+def test_region_frame_coordinates():
+    frame = RegionFrame(
+        image=np.zeros((20, 30, 3), dtype=np.uint8),
+        region=Box(left=100, top=50, width=30, height=20),
+    )
+    point = frame.to_screen(Point(x=3, y=4))
+    assert point == Point(x=103, y=54)
+    assert frame.to_local(point) == Point(x=3, y=4)
+
+    box = frame.to_screen(Box(left=1, top=2, width=5, height=6))
+    assert box == Box(left=101, top=52, width=5, height=6)
+    assert frame.to_local(box) == Box(left=1, top=2, width=5, height=6)
+
+    # 屏幕坐标经区域截图裁剪后与局部坐标上的像素一致
+    source = StubFrameSource(width=200, height=100)
+    frame = source.grab_region(frame.region)
+    local = frame.to_local(Point(x=110, y=60))
+    assert tuple(frame.image[local.y, local.x, :2]) == (110, 60)
+
+
+def test_auto_backend_falls_back(monkeypatch):
+
+    def unavailable():
+        raise RuntimeError('Cannot connect to display')
+
+    monkeypatch.setattr(capture.platform, 'system', lambda: 'Linux')
+    monkeypatch.setattr(capture, 'XShmFrameSource', unavailable)
+    monkeypatch.setattr(capture, 'PyAutoGuiFrameSource', StubFrameSource)
+    source = create_frame_source(CaptureBackend.AUTO)
+    assert isinstance(source, StubFrameSource)
@@ -0,0 +1,71 @@
+import os
+import shutil
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from genshin_mummy.tools.descriptor_store import DescriptorStore
+
+MATERIALS_DIR = Path(__file__).parent.parent / 'genshin_mummy' / 'materials'
+
+
+class CountingExtractor:
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, path: str):
+        self.calls += 1
+        image = cv2.imread(path)
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        kps, descriptors = cv2.SIFT_create().detectAndCompute(gray, None)
+        return image, kps, descriptors
+
+
+def create_store(tmp_path: Path, extractor: CountingExtractor):
+    key_to_path = {}
+    for name in ('weapon_icon', 'artifact_icon'):
+        path = tmp_path / f'{name}.jpg'
+        if not path.exists():
+            shutil.copy(MATERIALS_DIR / 'inventory' / f'{name}.jpg', path)
+        key_to_path[name] = path
+    return DescriptorStore(
+        key_to_path=key_to_path,
+        bundle_fp=tmp_path / 'bundle.npy',
+        extractor=extractor,
+    )
+
+
+def test_build_and_mmap(tmp_path):
+    extractor = CountingExtractor()
+    built = create_store(tmp_path, extractor).get('weapon_icon')
+    assert extractor.calls == 2
+
+    store = create_store(tmp_path, extractor)
+    loaded = store.get('weapon_icon')
+    assert extractor.calls == 2
+    assert isinstance(store._records, np.memmap)
+    np.testing.assert_array_equal(built.descriptors, loaded.descriptors)
+    assert [kp.pt
+            for kp in built.keypoints] == [kp.pt for kp in loaded.keypoints]
+
+
+def test_invalidate_by_template(tmp_path):
+    extractor = CountingExtractor()
+    create_store(tmp_path, extractor).get('weapon_icon')
+
+    # 只改修改时间，内容哈希不变，不需要重建
+    template_fp = tmp_path / 'artifact_icon.jpg'
+    stat = template_fp.stat()
+    os.utime(template_fp, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    create_store(tmp_path, extractor).get('weapon_icon')
+    assert extractor.calls == 2
+
+    shutil.copy(tmp_path / 'weapon_icon.jpg', template_fp)
+    store = create_store(tmp_path, extractor)
+    np.testing.assert_array_equal(
+        store.get('artifact_icon').descriptors,
+        store.get('weapon_icon').descriptors,
+    )
+    assert extractor.calls == 4
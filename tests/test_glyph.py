@@ -0,0 +1,124 @@
+import cv2
+import numpy as np
+
+from genshin_mummy.ocr.backend import FieldKind, GlyphBackend
+from genshin_mummy.ocr.glyph import GlyphRecognizer, mask_key, segment_glyphs
+
+BACKGROUND = (230, 220, 200)
+FOREGROUND = (80, 80, 80)
+
+
+def render(text: str, x: int = 6, width: int = 240, height: int = 32):
+    """用Hershey字体模拟游戏字体，星号与中点手工绘制，汉字用方块代替。"""
+    image = np.full((height, width, 3), BACKGROUND, dtype=np.uint8)
+    for char in text:
+        if char == '★':
+            angles = -np.pi / 2 + np.arange(10) * np.pi / 5
+            radius = np.where(np.arange(10) % 2 == 0, 9, 4)
+            points = np.stack([
+                x + 8 + radius * np.cos(angles),
+                16 + radius * np.sin(angles),
+            ],
+                              axis=1)
+            cv2.fillPoly(image, [points.astype(np.int32)], FOREGROUND)
+            x += 20
+        elif char == '·':
+            cv2.circle(image, (x + 3, 15), 2, FOREGROUND, -1)
+            x += 8
+        elif ord(char) > 127:
+            cv2.rectangle(image, (x, 6), (x + 17, 24), FOREGROUND, 2)
+            x += 22
+        else:
+            (char_width, _), _ = cv2.getTextSize(char,
+                                                 cv2.FONT_HERSHEY_SIMPLEX, 0.7,
+                                                 2)
+            cv2.putText(image, char, (x, 24), cv2.FONT_HERSHEY_SIMPLEX, 0.7,
+                        FOREGROUND, 2)
+            x += char_width + 3
+    return image
+
+
+TRAINING_TEXTS = ['+20', '0123456789', '46.6%', '★★★★★']
+
+
+def trained_recognizer():
+    recognizer = GlyphRecognizer()
+    for text in TRAINING_TEXTS:
+        assert not recognizer.ready
+        assert recognizer.learn(render(text), text)
+    assert recognizer.ready
+    return recognizer
+
+
+def test_segment_keeps_dot_positions():
+    glyphs = segment_glyphs(render('3.9%'))
+    assert len(glyphs) == 4
+    # . 贴着底部，· 在中间，归一化后的字形不同
+    dot = segment_glyphs(render('1.'))[1].feature
+    middle_dot = segment_glyphs(render('1·'))[1].feature
+    assert np.abs(dot - middle_dot).mean() > 0.1
+
+
+def test_recognize_after_learning():
+    recognizer = trained_recognizer()
+    for text in ['+16', '311', '5.8%', '★★★★', '97.2%']:
+        result = recognizer.recognize(render(text, x=11))
+        assert result is not None and result[0] == text
+    # 切分与文本长度不一致的行不学习
+    assert not recognizer.learn(render('+20'), '+2')
+    assert recognizer.recognize(np.full((32, 80, 3), 200,
+                                        dtype=np.uint8)) is None
+
+
+def test_recognize_suffix():
+    recognizer = trained_recognizer()
+    image = render('·暴击率+3.9%')
+    text, _, split = recognizer.recognize_suffix(image)
+    assert text == '+3.9%'
+    assert recognizer.recognize_suffix(image[:, :split]) is None
+
+
+def test_mask_key_ignores_position():
+    assert mask_key(render('·暴击率', x=6)) == mask_key(render('·暴击率', x=30))
+    assert mask_key(render('·暴击率')) != mask_key(render('·攻击力+'))
+    assert mask_key(np.zeros((8, 8, 3), dtype=np.uint8)) is None
+
+
+class FakeBackend:
+    """按图像左侧的方块数量返回预设文本，记录每次调用的裁剪图数量。"""
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.calls = []
+
+    def ocr(self, imgs, det=True, cls=False):
+        assert not det
+        crops = imgs[0]
+        self.calls.append(len(crops))
+        return [[(self.texts[mask_key(crop)], 0.99) for crop in crops]]
+
+
+def test_glyph_backend_learns_and_caches():
+    lines = [('·暴击率+3.9%', FieldKind.SUFFIXED), ('+20', FieldKind.NUMERIC),
+             ('46.6%', FieldKind.NUMERIC), ('0123456789', FieldKind.NUMERIC),
+             ('★★★★★', FieldKind.NUMERIC), ('生之花', FieldKind.TEXT)]
+    crops = [render(text) for text, _ in lines]
+    kinds = [kind for _, kind in lines]
+    texts = {mask_key(crop): text for crop, (text, _) in zip(crops, lines)}
+    # 副词条的数值被识别后，只把词条名部分交给通用OCR
+    texts[mask_key(render('·暴击率'))] = '·暴击率'
+    base = FakeBackend(texts)
+    backend = GlyphBackend(base)
+
+    results = backend.recognize(crops, kinds)
+    assert [text for text, _ in results] == [text for text, _ in lines]
+    assert base.calls == [6]
+    assert backend.glyphs.ready
+
+    results = backend.recognize(crops, kinds)
+    assert [text for text, _ in results] == [text for text, _ in lines]
+    # 数值行全部由字形模板识别，只剩副词条的词条名第一次出现
+    assert base.calls == [6, 1]
+    assert backend.recognize(crops, kinds) == results
+    assert base.calls == [6, 1]
+    assert backend.glyph_hits == 10
@@ -0,0 +1,43 @@
+from genshin_mummy.tools.icon_cache import IconPositionCache
+from genshin_mummy.type import Box
+
+SCREEN_SIZE = (1280, 720)
+
+
+class FakeScreen:
+
+    def __init__(self, icon_box: Box):
+        self.icon_box = icon_box
+        self.regions = []
+
+    def search(self, region):
+        self.regions.append(region)
+        if region is None or region.contain(self.icon_box):
+            return self.icon_box
+        return None
+
+
+def test_hit_and_miss(tmp_path):
+    cache_fp = tmp_path / 'icons.json'
+    cache = IconPositionCache(cache_fp=cache_fp)
+    screen = FakeScreen(Box(left=100, top=50, width=40, height=30))
+    assert cache.locate(SCREEN_SIZE, 'exit_icon', screen.search)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    assert cache.locate(SCREEN_SIZE, 'exit_icon', screen.search)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert screen.regions[-1] == Box(left=60, top=20, width=120, height=90)
+
+    # 图标移动后局部搜索落空，退回全屏搜索并更新缓存
+    screen.icon_box = Box(left=600, top=400, width=40, height=30)
+    assert cache.locate(SCREEN_SIZE, 'exit_icon', screen.search)
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert screen.regions[-2:] == [
+        Box(left=60, top=20, width=120, height=90),
+        None,
+    ]
+
+    # 缓存按分辨率区分，并持久化到文件
+    reloaded = IconPositionCache(cache_fp=cache_fp)
+    assert reloaded.get(SCREEN_SIZE, 'exit_icon') == screen.icon_box
+    assert reloaded.get((1920, 1080), 'exit_icon') is None
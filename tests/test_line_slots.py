@@ -0,0 +1,102 @@
+import numpy as np
+
+from genshin_mummy.artifact_helper.line_slots import (
+    ArtifactChunks,
+    LineRole,
+    LineSlotLayout,
+)
+from genshin_mummy.ocr.backend import PaddleBackend
+from genshin_mummy.ocr.type import TextChunk
+
+LINE_HEIGHT = 20
+PITCH = 30
+IMAGE_SHAPE = (600, 400, 3)
+
+
+def chunk(top: float, text: str, left: float = 20.0, width: float = 120.0):
+    return TextChunk(left, top, width, LINE_HEIGHT, text)
+
+
+def create_chunks(subentry_num: int = 4):
+    return ArtifactChunks(
+        name=chunk(10.0, '角斗士的留恋'),
+        type=chunk(60.0, '生之花', width=60.0),
+        entry=chunk(100.0, '生命值', width=60.0),
+        entry_value=chunk(130.0, '4780', width=50.0),
+        stars=chunk(170.0, '★★★★★', width=100.0),
+        level=chunk(220.0, '+20', width=40.0),
+        subentries=[
+            chunk(260.0 + idx * PITCH, f'·暴击率+3.{idx}%')
+            for idx in range(subentry_num)
+        ],
+    )
+
+
+class FakeRecognizer:
+    """只支持 det=False 的批量识别，按顺序返回预设的文本。"""
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.crops = None
+
+    def ocr(self, imgs, det=True, cls=False):
+        assert not det
+        self.crops = imgs[0]
+        return [[(text, 0.99) for text in self.texts]]
+
+
+def learned_layout():
+    layout = LineSlotLayout(learn_count=2)
+    layout.learn(create_chunks())
+    assert not layout.ready
+    # 副词条不足2条时无法推算行距，不计入样本
+    layout.learn(create_chunks(subentry_num=1))
+    assert not layout.ready
+    layout.learn(create_chunks(subentry_num=3))
+    assert layout.ready
+    return layout
+
+
+def test_slot_boxes():
+    layout = learned_layout()
+    boxes = layout.slot_boxes(IMAGE_SHAPE)
+    assert len(boxes) == 10
+    subentry_boxes = [box for role, box in boxes if role == LineRole.SUBENTRY]
+    tops = [box.top for box in subentry_boxes]
+    assert np.diff(tops).tolist() == [PITCH] * 3
+    # 副词条裁剪到右边缘，等级行至少两倍行高宽
+    assert subentry_boxes[0].right == IMAGE_SHAPE[1]
+    level_box = dict(boxes)[LineRole.LEVEL]
+    assert level_box.width >= 2 * LINE_HEIGHT
+
+
+def test_read_and_validate():
+    layout = learned_layout()
+    image = np.zeros(IMAGE_SHAPE, dtype=np.uint8)
+    texts = [
+        '角斗士的留恋', '生之花', '生命值', '4780', '★★★★★', '+20', '·暴击率+3.9%', '·攻击力+19',
+        '·元素精通+23', '角斗士的终幕礼：'
+    ]
+    recognizer = FakeRecognizer(texts)
+    chunks = layout.read(PaddleBackend(recognizer), image)
+    assert len(recognizer.crops) == 10
+    assert [ck.text for ck in chunks.subentries
+            ] == ['·暴击率+3.9%', '·攻击力+19', '·元素精通+23']
+    assert chunks.level.text == '+20'
+
+    # 截断的数值与错位的类型都无法通过校验
+    for idx, text in ((6, '·暴击率+3.'), (1, '4780')):
+        bad_texts = list(texts)
+        bad_texts[idx] = text
+        assert layout.read(PaddleBackend(FakeRecognizer(bad_texts)),
+                           image) is None
+    assert layout.misses == 2
+
+
+def test_relearn_after_failures():
+    layout = learned_layout()
+    image = np.zeros(IMAGE_SHAPE, dtype=np.uint8)
+    for _ in range(layout.relearn_after):
+        assert layout.read(PaddleBackend(FakeRecognizer([''] * 10)),
+                           image) is None
+    assert not layout.ready
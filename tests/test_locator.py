@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from genshin_mummy.tools import locator
+from genshin_mummy.tools.capture import FrameSource
+from genshin_mummy.tools.icon_cache import IconPositionCache
+from genshin_mummy.type import Box
+
+MATERIALS_DIR = Path(__file__).parent.parent / 'genshin_mummy' / 'materials'
+
+
+class StubFrameSource(FrameSource):
+
+    def __init__(self, screen: np.ndarray):
+        self.screen = screen
+        self.grabs = 0
+
+    def grab(self):
+        self.grabs += 1
+        return self.screen
+
+
+def paste(screen: np.ndarray, path: Path, left: int, top: int):
+    icon = cv2.cvtColor(cv2.imread(str(path)), cv2.COLOR_BGR2RGB)
+    height, width = icon.shape[:2]
+    screen[top:top + height, left:left + width] = icon
+    return left + width // 2, top + height // 2
+
+
+def test_locate_through_frame_source(monkeypatch):
+    screen = np.full((720, 1280, 3), 30, dtype=np.uint8)
+    center = paste(screen, MATERIALS_DIR / 'menu_page' / 'exit_icon.jpg', 900,
+                   60)
+    source = StubFrameSource(screen)
+    monkeypatch.setattr(locator, 'frame_source', source)
+    monkeypatch.setattr(locator, 'icon_cache', IconPositionCache())
+
+    point = locator.locate('exit_icon')
+    assert abs(point.x - center[0]) <= 2 and abs(point.y - center[1]) <= 2
+    # 屏幕尺寸与搜索共用同一帧
+    assert source.grabs == 1
+
+    # 区域搜索的结果换算回屏幕坐标
+    boxes = locator.search_icons(['exit_icon'],
+                                 Box(left=800, top=0, width=300, height=200))
+    box = boxes['exit_icon']
+    assert abs(box.center_x - center[0]) <= 2
+    assert abs(box.center_y - center[1]) <= 2
+
+
+def create_inventory_screen(selected: str):
+    """背包顶部的页签栏，选中的页签图标反色。"""
+    screen = np.full((720, 1280, 3), 40, dtype=np.uint8)
+    boxes = {}
+    for idx, key in enumerate(locator.INVENTORY_TAB_ICON_KEYS):
+        icon = cv2.cvtColor(cv2.imread(str(locator.template_path(key))),
+                            cv2.COLOR_BGR2RGB)
+        if key == selected:
+            icon = 255 - icon
+        height, width = icon.shape[:2]
+        left, top = 300 + idx * 110, 30
+        screen[top:top + height, left:left + width] = icon
+        boxes[key] = Box(left=left, top=top, width=width, height=height)
+    return screen, boxes
+
+
+def test_inventory_locator_positions():
+    for selected in ('weapon_icon', 'artifact_icon'):
+        screen, boxes = create_inventory_screen(selected)
+        inventory_locator = locator.InventoryLocator(screen)
+        for key, box in boxes.items():
+            x, y = inventory_locator.position(key)
+            # 点击位置需落在图标中部
+            assert abs(x - box.center_x) <= 0.3 * box.width
+            assert abs(y - box.center_y) <= 0.3 * box.height
+
+    blank = np.full((720, 1280, 3), 40, dtype=np.uint8)
+    inventory_locator = locator.InventoryLocator(blank)
+    for key in locator.INVENTORY_TAB_ICON_KEYS:
+        assert inventory_locator.position(key) is None
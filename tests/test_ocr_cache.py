@@ -0,0 +1,72 @@
+import numpy as np
+
+from genshin_mummy.artifact_helper.ocr_cache import (
+    OcrResultCache,
+    panel_hash,
+)
+from genshin_mummy.artifact_helper.simulator import (
+    SyntheticArtifactPage,
+    random_artifacts,
+)
+from genshin_mummy.artifact_helper.type import (
+    Artifact,
+    ArtifactType,
+    EntryType,
+)
+from genshin_mummy.type import Box
+
+
+def create_artifact(name: str):
+    return Artifact(
+        name=name,
+        type=ArtifactType.FLOWER_OF_LIFE,
+        entry={EntryType.HP: '4780'},
+        stars=5,
+        level=20,
+        subentries={
+            EntryType.CRIT_RATE: '3.9%',
+            None: '19',
+        },
+    )
+
+
+def test_panel_hash():
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 255, size=(600, 300, 3), dtype=np.uint8)
+    same = image.copy()
+    assert panel_hash(image) == panel_hash(same)
+    # 一个数字大小的改动也要反映在哈希里
+    changed = image.copy()
+    changed[300:316, 100:110] = 255
+    assert panel_hash(image) != panel_hash(changed)
+    assert panel_hash(image) != panel_hash(image[:, :299])
+
+
+def test_lru_and_persist(tmp_path):
+    cache_fp = tmp_path / 'ocr_cache.json'
+    cache = OcrResultCache(capacity=2, cache_fp=cache_fp)
+    level_box = Box(left=10, top=200, width=40, height=20)
+    cache.put('a', create_artifact('a'), level_box)
+    cache.put('b', create_artifact('b'), level_box)
+    assert cache.get('a')[0].name == 'a'
+    cache.put('c', create_artifact('c'), level_box)
+    # b 最久未使用，被淘汰
+    assert cache.get('b') is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.save()
+
+    cache = OcrResultCache(capacity=2, cache_fp=cache_fp)
+    assert len(cache) == 2
+    artifact, box = cache.get('a')
+    assert artifact == create_artifact('a')
+    assert box == level_box
+
+
+def test_simulated_panels():
+    sim = SyntheticArtifactPage(random_artifacts(16))
+    first = panel_hash(sim.grab_region(sim.desc_box).image)
+    sim.leftClick(*sim.cell_screen_box(1).center)
+    second = panel_hash(sim.grab_region(sim.desc_box).image)
+    sim.leftClick(*sim.cell_screen_box(0).center)
+    assert first != second
+    assert panel_hash(sim.grab_region(sim.desc_box).image) == first
@@ -0,0 +1,90 @@
+import threading
+
+import numpy as np
+import pytest
+
+from genshin_mummy.ocr.daemon import (
+    OcrClient,
+    OcrDaemon,
+    OcrDaemonError,
+    connect_or_create_ocr,
+    is_daemon_running,
+    pack_images,
+    unpack_images,
+)
+
+
+class FakeOcr:
+    """返回与PaddleOCR相同结构的结果，文本为图像左上角的像素值。"""
+
+    def ocr(self, img, det=True, cls=True):
+        if det:
+            if img.size == 0:
+                raise ValueError('empty image')
+            box = np.array([[0, 0], [4, 0], [4, 2], [0, 2]], dtype=np.float32)
+            return [[[box.tolist(), (str(img[0, 0, 0]), np.float32(0.9))]]]
+        return [[(str(crop[0, 0, 0]), np.float32(0.9)) for crop in img[0]]]
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    daemon = OcrDaemon(address=str(tmp_path / 'ocr.sock'), factory=FakeOcr)
+    daemon.listen()
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    yield daemon
+    daemon.shutdown()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def test_pack_nested_images():
+    images = [[
+        np.full((2, 3, 3), 7, dtype=np.uint8),
+        np.arange(6, dtype=np.float32).reshape(2, 3),
+    ]]
+    buf = memoryview(bytearray(64))
+    layout, end = pack_images(images, buf)
+    assert end == 18 + 24
+    unpacked = unpack_images(layout, buf)
+    assert np.array_equal(unpacked[0][0], images[0][0])
+    assert np.array_equal(unpacked[0][1], images[0][1])
+
+
+def test_client_matches_local_results(daemon):
+    assert is_daemon_running(daemon.address)
+    client = OcrClient(daemon.address).connect()
+    try:
+        image = np.full((8, 8, 3), 3, dtype=np.uint8)
+        result = client.ocr(image, cls=False)
+        assert result[0][0][1][0] == '3'
+        assert result[0][0][0] == FakeOcr().ocr(image)[0][0][0]
+
+        # 裁剪图尺寸变大时共享内存扩容
+        crops = [np.full((4, 40, 3), idx, dtype=np.uint8) for idx in range(3)]
+        result = client.ocr([crops], det=False, cls=False)
+        assert [text for text, _ in result[0]] == ['0', '1', '2']
+
+        with pytest.raises(OcrDaemonError):
+            client.ocr(np.zeros((0, 0, 3), dtype=np.uint8))
+    finally:
+        client.close()
+
+
+def test_fallback_without_daemon(tmp_path):
+    address = str(tmp_path / 'missing.sock')
+    assert not is_daemon_running(address)
+    local = FakeOcr()
+    assert connect_or_create_ocr(address, fallback=lambda: local) is local
+    assert connect_or_create_ocr('', fallback=lambda: local) is local
+
+
+def test_fallback_after_disconnect(daemon):
+    local = FakeOcr()
+    client = connect_or_create_ocr(daemon.address, fallback=lambda: local)
+    assert isinstance(client, OcrClient)
+    daemon.shutdown()
+    client._conn.close()
+    image = np.full((8, 8, 3), 5, dtype=np.uint8)
+    assert client.ocr(image)[0][0][1][0] == '5'
+    assert not client.connected
@@ -0,0 +1,57 @@
+import threading
+
+import numpy as np
+import pytest
+
+from genshin_mummy.ocr.engine import OcrLoader, warm_up
+
+
+class FakeOcr:
+
+    def __init__(self):
+        self.calls = []
+
+    def ocr(self, image, cls=True):
+        self.calls.append(image)
+        return [[]]
+
+
+def test_loader_runs_in_background():
+    release = threading.Event()
+    created = []
+
+    def factory():
+        release.wait()
+        created.append(FakeOcr())
+        return created[-1]
+
+    loader = OcrLoader(factory=factory)
+    assert not loader.started
+    # 加载阻塞时start也要立即返回
+    loader.start()
+    assert loader.started and not loader.ready
+
+    release.set()
+    ocr = loader.get(timeout=5)
+    assert loader.ready
+    assert loader.start().get() is ocr
+    assert created == [ocr]
+
+
+def test_loader_raises_factory_error():
+
+    def factory():
+        raise RuntimeError('no model')
+
+    loader = OcrLoader(factory=factory)
+    with pytest.raises(RuntimeError):
+        loader.get(timeout=5)
+
+
+def test_warm_up_runs_inference():
+    ocr = warm_up(FakeOcr())
+    assert len(ocr.calls) == 1
+    image = ocr.calls[0]
+    assert image.dtype == np.uint8 and image.ndim == 3
+    # 合成图中要有文字
+    assert image.min() < 128
@@ -0,0 +1,42 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from genshin_mummy.artifact_helper.grid import GridCell
+from genshin_mummy.artifact_helper.ocr_pipeline import ArtifactJob, OcrQueue
+from genshin_mummy.tools.capture import RegionFrame
+from genshin_mummy.type import Box
+
+
+def create_job(idx: int):
+    image = np.full((4, 4, 3), idx, dtype=np.uint8)
+    return ArtifactJob(
+        index=idx,
+        cell=GridCell(row_idx=0, col_idx=idx),
+        desc_frame=RegionFrame(image, Box(left=0, top=0, width=4, height=4)),
+        panel_key=str(idx),
+    )
+
+
+def test_bounded_queue_keeps_order():
+    release = threading.Event()
+
+    def recognize(image):
+        release.wait()
+        return int(image[0, 0, 0])
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        queue = OcrQueue(executor=executor, recognize=recognize, max_pending=2)
+        assert queue.submit(create_job(0)) == []
+        assert queue.submit(create_job(1)) == []
+        assert queue.completed() == []
+
+        release.set()
+        # 队列已满，提交前先等到最早的任务
+        finished = queue.submit(create_job(2))
+        assert [job.index for job in finished] == [0]
+        assert len(queue) == 2
+        finished = queue.drain()
+        assert [job.future.result() for job in finished] == [1, 2]
+        assert len(queue) == 0
@@ -0,0 +1,49 @@
+import numpy as np
+
+from genshin_mummy.opt import (
+    ChangeDetector,
+    diff_two_images,
+    locate_roi_location_from_diffs,
+)
+from genshin_mummy.type import Box
+
+
+def create_pair(roi: Box, shape=(120, 160, 3)):
+    rng = np.random.default_rng(0)
+    im1 = rng.integers(0, 256, shape, dtype=np.uint8)
+    im2 = im1.copy()
+    im2[roi.top:roi.bottom, roi.left:roi.right] ^= 0xff
+    return im1, im2
+
+
+def test_diff_does_not_wrap():
+    im1 = np.zeros((2, 2, 3), dtype=np.uint8)
+    im2 = im1.copy()
+    # 逐通道相减再求和时 1 + 255 会回绕成 0
+    im2[0, 0] = (1, 255, 0)
+    im1[0, 0] = (0, 0, 0)
+    mask = diff_two_images(im1, im2)
+    assert mask[0, 0] == 255
+    assert np.count_nonzero(mask) == 1
+
+
+def test_locate_roi():
+    roi = Box(left=30, top=20, width=64, height=48)
+    im1, im2 = create_pair(roi)
+    diffs = diff_two_images(im1, im2)
+    assert locate_roi_location_from_diffs(diffs, 0.1) == roi
+    assert locate_roi_location_from_diffs(np.zeros_like(diffs), 0.1) is None
+
+
+def test_downsampled_and_batch():
+    roi = Box(left=32, top=20, width=64, height=48)
+    im1, im2 = create_pair(roi)
+    detector = ChangeDetector(scale=4)
+    assert detector.locate_roi(detector.diff(im1, im2), 0.1) == roi
+
+    detector = ChangeDetector()
+    masks = detector.diff_batch([(im1, im2), (im1, im1)])
+    assert masks.shape == (2, ) + im1.shape[:2]
+    assert np.count_nonzero(masks[1]) == 0
+    rois = detector.locate_roi_batch([(im1, im2), (im1, im1)], 0.1)
+    assert rois == [roi, None]
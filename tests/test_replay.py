@@ -0,0 +1,180 @@
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from genshin_mummy.tools.blink import BlinkDetector
+from genshin_mummy.tools.capture import FrameSource
+from genshin_mummy.tools.clock import Clock
+
+from genshin_mummy.artifact_helper.simulator import (
+    SyntheticArtifactPage,
+    random_artifacts,
+)
+from genshin_mummy.artifact_helper.unlock_shit_artifact import (
+    create_recording_page,
+    create_replay_page,
+)
+from genshin_mummy.tools.logger import create_logger
+from genshin_mummy.tools.tile_hash import TileHasher
+from genshin_mummy.tools.session import (
+    RecordingClock,
+    RecordingFrameSource,
+    ReplayClock,
+    ReplayFrameSource,
+    SessionReader,
+    SessionWriter,
+)
+from genshin_mummy.tools.waiter import wait_until_tiles_changed
+from genshin_mummy.type import Box, Direction, Point
+
+
+def create_test_logger():
+    return create_logger('replay', Path(tempfile.mkdtemp()), overlay=False)
+
+
+def traverse(page, max_num: int):
+    """与流水线一样，每选中一个圣遗物截取一次描述区。"""
+    visited = []
+    for cell in page.iter_artifacts(max_num):
+        desc_image = page.frame_source.grab_region(page.desc_loc).image
+        visited.append(((cell.row_idx, cell.col_idx), desc_image.copy()))
+    return visited
+
+
+def test_record_and_replay_artifact_page():
+    num = 60
+    session_fd = tempfile.mkdtemp()
+    sim = SyntheticArtifactPage(random_artifacts(num), render_latency=0.1)
+    writer = SessionWriter(session_fd)
+    page = create_recording_page(
+        create_test_logger(),
+        writer,
+        frame_source=sim,
+        controller=sim,
+        clock=sim.clock,
+    )
+    recorded = traverse(page, num)
+    writer.close()
+
+    reader = SessionReader(session_fd)
+    assert reader.clock_events
+    replay_page = create_replay_page(create_test_logger(), reader)
+    assert replay_page.desc_loc == page.desc_loc
+    assert replay_page.list_loc == page.list_loc
+    assert replay_page.first_artifact_loc == page.first_artifact_loc
+    replayed = traverse(replay_page, num)
+
+    assert len(replayed) == len(recorded) == num
+    for (cell, image), (replay_cell, replay_image) in zip(recorded, replayed):
+        assert cell == replay_cell
+        assert np.array_equal(image, replay_image)
+    # 每次等待截取的帧数与录制时一致，会话刚好被完整消费
+    assert replay_page.frame_source.cursor == len(reader.frame_events)
+    assert replay_page.controller.cursor == len(reader.input_events)
+    assert replay_page.clock.cursor == len(reader.clock_events)
+
+
+class StillFrameSource(FrameSource):
+
+    def grab(self):
+        return np.full((120, 160, 3), 128, dtype=np.uint8)
+
+
+def test_replay_blink_detection_with_wall_clock():
+    # 没有闪烁时检测一直持续到 latency_budget，帧数取决于实际耗时
+    session_fd = tempfile.mkdtemp()
+    writer = SessionWriter(session_fd)
+    region = Box(left=10, top=10, width=100, height=80)
+    detector = BlinkDetector(
+        RecordingFrameSource(StillFrameSource(), writer),
+        RecordingClock(Clock(), writer),
+        latency_budget=0.02,
+        max_frames=10000,
+    )
+    recorded = detector.detect(region)
+    writer.close()
+    assert recorded.box is None
+
+    reader = SessionReader(session_fd)
+    frame_source = ReplayFrameSource(reader)
+    detector = BlinkDetector(
+        frame_source,
+        ReplayClock(reader),
+        latency_budget=0.02,
+        max_frames=10000,
+    )
+    replayed = detector.detect(region)
+    assert replayed.frames == recorded.frames
+    assert replayed.elapsed == recorded.elapsed
+    assert frame_source.cursor == len(reader.frame_events)
+
+
+def scroll_to_bottom(page):
+    """从列表顶部滚动到底，返回每次滚动是否到底。"""
+    results = []
+    while not results or not results[-1]:
+        results.append(
+            page.scroll_artifact_list(
+                direction=Direction.DOWN,
+                times=1,
+                only_scrolling=False,
+            ))
+    return results
+
+
+def test_replay_scroll_boundary():
+    session_fd = tempfile.mkdtemp()
+    sim = SyntheticArtifactPage(random_artifacts(60), render_latency=0.1)
+    writer = SessionWriter(session_fd)
+    page = create_recording_page(
+        create_test_logger(),
+        writer,
+        frame_source=sim,
+        controller=sim,
+        clock=sim.clock,
+    )
+    recorded = scroll_to_bottom(page)
+    assert len(recorded) > 1
+    # 点击列表外的空白处，描述区不变，等待一直持续到超时
+    assert not page.click_and_check(Point(x=5, y=5))
+    writer.close()
+
+    reader = SessionReader(session_fd)
+    replay_page = create_replay_page(create_test_logger(), reader)
+    assert scroll_to_bottom(replay_page) == recorded
+    assert not replay_page.click_and_check(Point(x=5, y=5))
+    assert replay_page.frame_source.cursor == len(reader.frame_events)
+    assert replay_page.clock.cursor == len(reader.clock_events)
+
+
+def test_replay_tiles_changed_with_wall_clock():
+    session_fd = tempfile.mkdtemp()
+    writer = SessionWriter(session_fd)
+    hasher = TileHasher()
+    region = Box(left=0, top=0, width=96, height=64)
+    reference = hasher.hash(StillFrameSource().grab()[:64, :96])
+    changed = wait_until_tiles_changed(
+        RecordingFrameSource(StillFrameSource(), writer),
+        RecordingClock(Clock(), writer),
+        hasher,
+        reference,
+        region=region,
+        timeout=0.02,
+        poll_interval=0.001,
+    )
+    writer.close()
+    assert not changed
+
+    reader = SessionReader(session_fd)
+    frame_source = ReplayFrameSource(reader)
+    assert not wait_until_tiles_changed(
+        frame_source,
+        ReplayClock(reader),
+        hasher,
+        reference,
+        region=region,
+        timeout=0.02,
+        poll_interval=0.001,
+    )
+    assert frame_source.cursor == len(reader.frame_events)
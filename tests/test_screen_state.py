@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from genshin_mummy.tools.screen_state import ScreenState, ScreenStateClassifier
+
+MATERIALS_DIR = Path(__file__).parent.parent / 'genshin_mummy' / 'materials'
+KEY_TO_PATH = {
+    'exit_icon': MATERIALS_DIR / 'menu_page' / 'exit_icon.jpg',
+    'inventory_icon': MATERIALS_DIR / 'menu_page' / 'inventory_icon.jpg',
+    'artifact_icon': MATERIALS_DIR / 'inventory' / 'artifact_icon.jpg',
+    'weapon_icon': MATERIALS_DIR / 'inventory' / 'weapon_icon.jpg',
+}
+
+
+def paste(screen: np.ndarray, key: str, left: int, top: int, invert=False):
+    icon = cv2.cvtColor(cv2.imread(str(KEY_TO_PATH[key])), cv2.COLOR_BGR2RGB)
+    if invert:
+        icon = 255 - icon
+    height, width = icon.shape[:2]
+    screen[top:top + height, left:left + width] = icon
+    return left + width // 2, top + height // 2
+
+
+def create_screen():
+    return np.full((720, 1280, 3), 30, dtype=np.uint8)
+
+
+def test_classify_screen_state():
+    classifier = ScreenStateClassifier(key_to_path=KEY_TO_PATH)
+    assert classifier.classify(create_screen()).state == ScreenState.UNKNOWN
+
+    screen = create_screen()
+    paste(screen, 'exit_icon', 40, 40)
+    center = paste(screen, 'inventory_icon', 600, 400)
+    result = classifier.classify(screen)
+    assert result.state == ScreenState.MENU
+    assert abs(result.positions['inventory_icon'].x - center[0]) <= 2
+    assert abs(result.positions['inventory_icon'].y - center[1]) <= 2
+
+    # 被选中的页签图标反色
+    for selected, state in (
+        ('artifact_icon', ScreenState.INVENTORY_ARTIFACT),
+        ('weapon_icon', ScreenState.INVENTORY_WEAPON),
+    ):
+        screen = create_screen()
+        paste(screen, 'weapon_icon', 300, 20, selected == 'weapon_icon')
+        center = paste(screen, 'artifact_icon', 400, 20,
+                       selected == 'artifact_icon')
+        result = classifier.classify(screen)
+        assert result.state == state
+        assert abs(result.positions['artifact_icon'].x - center[0]) <= 2
+
+    screen = create_screen()
+    paste(screen, 'weapon_icon', 300, 20)
+    paste(screen, 'artifact_icon', 400, 20)
+    assert classifier.classify(screen).state == ScreenState.INVENTORY_OTHER
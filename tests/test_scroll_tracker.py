@@ -0,0 +1,47 @@
+from genshin_mummy.artifact_helper.simulator import (
+    SyntheticArtifactPage,
+    random_artifacts,
+)
+from genshin_mummy.tools.scroll_tracker import ScrollTracker
+
+
+def scroll_and_grab(sim: SyntheticArtifactPage, clicks: int):
+    prev_image = sim.grab_region(sim.list_box).image
+    sim.scroll(-clicks)
+    curr_image = sim.grab_region(sim.list_box).image
+    return prev_image, curr_image
+
+
+def create_sim():
+    sim = SyntheticArtifactPage(random_artifacts(200))
+    sim.moveTo(sim.list_box.center_x, sim.list_box.center_y)
+    return sim
+
+
+def test_learn_px_per_click():
+    sim = create_sim()
+    tracker = ScrollTracker()
+    prev_image, curr_image = scroll_and_grab(sim, 3)
+    displacement = tracker.measure(prev_image, curr_image)
+    assert displacement == 3 * sim.list_scroll_px
+    tracker.learn(displacement, 3)
+    assert tracker.px_per_click == sim.list_scroll_px
+    assert tracker.clicks_for(5 * sim.list_scroll_px) == 5
+
+
+def test_large_scroll_with_prediction():
+    sim = create_sim()
+    tracker = ScrollTracker(px_per_click=sim.list_scroll_px)
+    # 大部分内容已移出列表区，只能依靠预测位移对齐
+    clicks = int(sim.list_box.height * 0.8) // sim.list_scroll_px
+    prev_image, curr_image = scroll_and_grab(sim, clicks)
+    displacement = tracker.measure(prev_image, curr_image, clicks=clicks)
+    assert displacement == clicks * sim.list_scroll_px
+
+
+def test_boundary():
+    sim = create_sim()
+    tracker = ScrollTracker(px_per_click=sim.list_scroll_px)
+    # 已在顶部，继续上滚列表不动
+    prev_image, curr_image = scroll_and_grab(sim, -5)
+    assert tracker.measure(prev_image, curr_image, clicks=-5) == 0
@@ -0,0 +1,262 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from genshin_mummy.tools import locator, selector
+from genshin_mummy.tools.capture import FrameSource
+from genshin_mummy.tools.clock import VirtualClock
+from genshin_mummy.tools.controller import Controller
+from genshin_mummy.tools.screen_state import ScreenState
+
+MATERIALS_DIR = Path(__file__).parent.parent / 'genshin_mummy' / 'materials'
+SCREEN_SIZE = (1280, 720)
+# 各界面的背景亮度不同，切换时画面整体变化
+BACKGROUNDS = {
+    ScreenState.MAIN: 90,
+    ScreenState.MENU: 60,
+    ScreenState.INVENTORY_WEAPON: 30,
+    ScreenState.INVENTORY_ARTIFACT: 30,
+}
+# 图标左上角位置
+ICON_LOCATIONS = {
+    'exit_icon': (40, 40),
+    'inventory_icon': (600, 400),
+    'weapon_icon': (300, 20),
+    'artifact_icon': (400, 20),
+}
+ICON_PATHS = {
+    'exit_icon': MATERIALS_DIR / 'menu_page' / 'exit_icon.jpg',
+    'inventory_icon': MATERIALS_DIR / 'menu_page' / 'inventory_icon.jpg',
+    'weapon_icon': MATERIALS_DIR / 'inventory' / 'weapon_icon.jpg',
+    'artifact_icon': MATERIALS_DIR / 'inventory' / 'artifact_icon.jpg',
+}
+
+
+def load_icon(key: str):
+    return cv2.cvtColor(cv2.imread(str(ICON_PATHS[key])), cv2.COLOR_BGR2RGB)
+
+
+class SimulatedGame(FrameSource, Controller):
+    """只有主界面、菜单与背包的模拟游戏，输入在 latency 秒后才生效。"""
+
+    def __init__(self, state: ScreenState, latency: float = 0.0):
+        self.clock = VirtualClock()
+        self.latency = latency
+        self.state = state
+        self.pending = []
+        self.inputs = []
+        self.icons = {key: load_icon(key) for key in ICON_PATHS}
+
+    def update(self):
+        while self.pending and self.pending[0][0] <= self.clock.time():
+            _, state = self.pending.pop(0)
+            self.state = state
+
+    def visible_state(self):
+        self.update()
+        return self.state
+
+    def schedule(self, state: ScreenState):
+        self.pending.append((self.clock.time() + self.latency, state))
+
+    def paste(self, screen: np.ndarray, key: str, invert: bool = False):
+        icon = self.icons[key]
+        if invert:
+            icon = 255 - icon
+        left, top = ICON_LOCATIONS[key]
+        height, width = icon.shape[:2]
+        screen[top:top + height, left:left + width] = icon
+
+    def grab(self):
+        state = self.visible_state()
+        width, height = SCREEN_SIZE
+        screen = np.full((height, width, 3), BACKGROUNDS[state], np.uint8)
+        if state == ScreenState.MENU:
+            self.paste(screen, 'exit_icon')
+            self.paste(screen, 'inventory_icon')
+        elif state != ScreenState.MAIN:
+            self.paste(screen, 'weapon_icon',
+                       state == ScreenState.INVENTORY_WEAPON)
+            self.paste(screen, 'artifact_icon',
+                       state == ScreenState.INVENTORY_ARTIFACT)
+        return screen
+
+    def icon_at(self, x: int, y: int):
+        for key, (left, top) in ICON_LOCATIONS.items():
+            height, width = self.icons[key].shape[:2]
+            if left <= x < left + width and top <= y < top + height:
+                return key
+        return None
+
+    def size(self):
+        return SCREEN_SIZE
+
+    def press(self, key: str, interval: float = 0.0):
+        state = self.visible_state()
+        self.inputs.append((key, state))
+        if key != 'esc':
+            return
+        if state == ScreenState.MAIN:
+            self.schedule(ScreenState.MENU)
+        elif state == ScreenState.MENU:
+            self.schedule(ScreenState.MAIN)
+        else:
+            self.schedule(ScreenState.MENU)
+
+    def leftClick(self, x: int, y: int, duration: float = 0.0):
+        self.clock.sleep(duration)
+        state = self.visible_state()
+        key = self.icon_at(x, y)
+        self.inputs.append((key, state))
+        if state == ScreenState.MENU and key == 'inventory_icon':
+            # 背包默认打开武器页签
+            self.schedule(ScreenState.INVENTORY_WEAPON)
+        elif state in selector.INVENTORY_STATES and key == 'artifact_icon':
+            self.schedule(ScreenState.INVENTORY_ARTIFACT)
+        elif state in selector.INVENTORY_STATES and key == 'weapon_icon':
+            self.schedule(ScreenState.INVENTORY_WEAPON)
+
+
+@pytest.fixture
+def use_game(monkeypatch):
+
+    def use(game: SimulatedGame):
+        monkeypatch.setattr(locator, 'frame_source', game)
+        monkeypatch.setattr(selector, 'controller', game)
+        monkeypatch.setattr(selector, 'clock', game.clock)
+        monkeypatch.setattr(selector, 'inventory_locators', {})
+        return game
+
+    return use
+
+
+def test_plan_action():
+    plan = selector.plan_action
+    assert plan(ScreenState.MAIN,
+                ScreenState.INVENTORY_ARTIFACT) == ('esc', None)
+    assert plan(ScreenState.MENU,
+                ScreenState.INVENTORY_ARTIFACT) == ('click', 'inventory_icon')
+    assert plan(ScreenState.INVENTORY_WEAPON,
+                ScreenState.INVENTORY_ARTIFACT) == ('click', 'artifact_icon')
+    assert plan(ScreenState.INVENTORY_ARTIFACT,
+                ScreenState.INVENTORY_WEAPON) == ('click', 'weapon_icon')
+    assert plan(ScreenState.INVENTORY_ARTIFACT,
+                ScreenState.MENU) == ('esc', None)
+    assert plan(ScreenState.MENU, ScreenState.MAIN) == ('esc', None)
+    # 无法识别的画面只等待，不操作
+    for target in ScreenState:
+        assert plan(ScreenState.UNKNOWN, target) == ('wait', None)
+
+
+@pytest.mark.parametrize('latency', [0.0, 0.1, 1.2])
+def test_navigate_from_main_to_artifact(use_game, latency):
+    game = use_game(SimulatedGame(ScreenState.MAIN, latency=latency))
+    result = selector.navigate_to(ScreenState.INVENTORY_ARTIFACT)
+
+    assert result.state == ScreenState.INVENTORY_ARTIFACT
+    assert game.visible_state() == ScreenState.INVENTORY_ARTIFACT
+    # 每个状态只操作一次，响应慢时不会重复按Esc把菜单关掉
+    assert game.inputs == [
+        ('esc', ScreenState.MAIN),
+        ('inventory_icon', ScreenState.MENU),
+        ('artifact_icon', ScreenState.INVENTORY_WEAPON),
+    ]
+
+
+def test_navigate_waits_for_late_response(use_game):
+    # 响应时间超过单次等待的上限，但在 RESPONSE_TIMEOUT 之内
+    latency = 3 * selector.RENDERING_TIME
+    assert latency < selector.RESPONSE_TIMEOUT
+    game = use_game(SimulatedGame(ScreenState.MENU, latency=latency))
+    selector.select_artifact_page()
+
+    assert game.visible_state() == ScreenState.INVENTORY_ARTIFACT
+    assert [key for key, _ in game.inputs] == [
+        'inventory_icon',
+        'artifact_icon',
+    ]
+
+
+def test_navigate_retries_lost_input(use_game):
+    game = use_game(SimulatedGame(ScreenState.MENU))
+    game.latency = selector.RESPONSE_TIMEOUT + 1
+    selector.navigate_to(*selector.INVENTORY_STATES)
+
+    # 超时仍停留在菜单时认为点击没有生效，再点一次
+    assert [key for key, _ in game.inputs] == [
+        'inventory_icon',
+        'inventory_icon',
+    ]
+
+
+def test_navigate_back_to_main(use_game):
+    game = use_game(SimulatedGame(ScreenState.INVENTORY_ARTIFACT, 0.3))
+    result = selector.navigate_to(ScreenState.MAIN)
+
+    assert result.state == ScreenState.MAIN
+    assert game.visible_state() == ScreenState.MAIN
+    assert game.inputs == [
+        ('esc', ScreenState.INVENTORY_ARTIFACT),
+        ('esc', ScreenState.MENU),
+    ]
+
+
+class FakeInventoryLocator:
+    """依次返回给定的页签位置，模拟失效或定位失败的结果。"""
+    results = []
+    created = 0
+
+    def __init__(self, frame):
+        FakeInventoryLocator.created += 1
+        self.result = FakeInventoryLocator.results.pop(0)
+
+    def position(self, key):
+        return self.result
+
+
+class ClassifierWithoutPositions:
+    """分类时找不到页签位置，只能用 InventoryLocator。"""
+
+    def __init__(self, classifier):
+        self.classifier = classifier
+
+    def classify(self, frame):
+        result = self.classifier.classify(frame)
+        result.positions.clear()
+        return result
+
+
+@pytest.fixture
+def fake_locator(monkeypatch):
+    monkeypatch.setattr(selector, 'InventoryLocator', FakeInventoryLocator)
+    monkeypatch.setattr(FakeInventoryLocator, 'results', [])
+    monkeypatch.setattr(FakeInventoryLocator, 'created', 0)
+    return FakeInventoryLocator
+
+
+def test_tab_position_caches_only_found(monkeypatch, fake_locator):
+    monkeypatch.setattr(selector, 'inventory_locators', {})
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    fake_locator.results = [None, (10, 20)]
+    assert selector.tab_position(frame, 'artifact_icon') is None
+    assert selector.inventory_locators == {}
+    assert selector.tab_position(frame, 'artifact_icon') == (10, 20)
+    assert selector.tab_position(frame, 'artifact_icon') == (10, 20)
+    assert fake_locator.created == 2
+
+
+def test_navigate_drops_stale_tab_positions(use_game, monkeypatch,
+                                            fake_locator):
+    game = use_game(SimulatedGame(ScreenState.INVENTORY_WEAPON, 0.1))
+    monkeypatch.setattr(selector, 'classifier',
+                        ClassifierWithoutPositions(selector.classifier))
+    left, top = ICON_LOCATIONS['artifact_icon']
+    # 第一次定位到的位置已经失效，点到了空白处
+    fake_locator.results = [(5, 5), (left + 10, top + 10)]
+    selector.navigate_to(ScreenState.INVENTORY_ARTIFACT)
+
+    assert game.visible_state() == ScreenState.INVENTORY_ARTIFACT
+    assert [key for key, _ in game.inputs] == [None, 'artifact_icon']
+    assert fake_locator.created == 2
@@ -0,0 +1,86 @@
+import tempfile
+
+import numpy as np
+
+from genshin_mummy.tools.capture import FrameSource
+from genshin_mummy.tools.controller import Controller
+from genshin_mummy.tools.session import (
+    RecordingController,
+    RecordingFrameSource,
+    ReplayController,
+    ReplayFrameSource,
+    SessionMismatch,
+    SessionReader,
+    SessionWriter,
+)
+from genshin_mummy.type import Box
+
+
+class CountingFrameSource(FrameSource):
+
+    def __init__(self):
+        self.count = 0
+
+    def grab(self):
+        # 两帧交替，模拟选中圣遗物边框的闪烁
+        self.count += 1
+        return np.full((30, 40, 3), self.count % 2, dtype=np.uint8)
+
+
+class DummyController(Controller):
+
+    def size(self):
+        return 40, 30
+
+    def position(self):
+        return 1, 2
+
+    def leftClick(self, x, y, duration=0.0):
+        pass
+
+    def scroll(self, clicks):
+        pass
+
+
+def test_record_and_replay():
+    session_fd = tempfile.mkdtemp()
+    writer = SessionWriter(session_fd)
+    frame_source = RecordingFrameSource(CountingFrameSource(), writer)
+    controller = RecordingController(DummyController(), writer)
+
+    recorded = [frame_source.grab() for _ in range(4)]
+    controller.leftClick(3, 4)
+    region_frame = frame_source.grab_region(Box(5, 6, 10, 8))
+    controller.scroll(-5)
+    assert controller.size() == (40, 30)
+    writer.close()
+
+    reader = SessionReader(session_fd)
+    # 交替的两帧只应存储一次
+    assert reader.frames.size == 2 * 30 * 40 * 3 + 10 * 8 * 3
+
+    replay_source = ReplayFrameSource(reader)
+    replay_controller = ReplayController(reader)
+    for frame in recorded:
+        assert np.array_equal(replay_source.grab(), frame)
+    replay_controller.leftClick(3, 4)
+    replay_frame = replay_source.grab_region(Box(5, 6, 10, 8))
+    assert np.array_equal(replay_frame.image, region_frame.image)
+    assert replay_frame.region == region_frame.region
+    replay_controller.scroll(-5)
+    assert replay_controller.size() == (40, 30)
+
+
+def test_replay_mismatch():
+    session_fd = tempfile.mkdtemp()
+    writer = SessionWriter(session_fd)
+    controller = RecordingController(DummyController(), writer)
+    controller.scroll(-5)
+    writer.close()
+
+    replay_controller = ReplayController(SessionReader(session_fd))
+    try:
+        replay_controller.leftClick(3, 4)
+        raise Exception("Should not reach here")
+    except SessionMismatch:
+        pass
@@ -0,0 +1,127 @@
+import json
+import tempfile
+from pathlib import Path
+
+from genshin_mummy.artifact_helper.page_manager import ArtifactPage
+from genshin_mummy.artifact_helper.simulator import (
+    SyntheticArtifactPage,
+    random_artifacts,
+)
+from genshin_mummy.tools.logger import create_logger
+
+
+def create_page(sim: SyntheticArtifactPage, **kwargs):
+    logger = create_logger(
+        'simulator',
+        Path(tempfile.mkdtemp()),
+        overlay=False,
+    )
+    return ArtifactPage(
+        logger=logger,
+        frame_source=sim,
+        controller=sim,
+        clock=sim.clock,
+        **kwargs,
+    )
+
+
+def test_calibration():
+    sim = SyntheticArtifactPage(random_artifacts(60))
+    page = create_page(sim)
+
+    assert page.desc_loc.overlap(sim.desc_box) > 0.9
+    assert page.list_loc.overlap(sim.list_box) > 0.9
+    assert page.first_artifact_loc.overlap(sim.cell_screen_box(0)) > 0.9
+    assert page.x_offset == sim.cell_pitch[0]
+    assert page.y_offset == sim.cell_pitch[1]
+    assert len(page.col_points) == sim.cols
+
+
+def test_iter_artifacts():
+    num = 60
+    sim = SyntheticArtifactPage(random_artifacts(num))
+    page = create_page(sim)
+
+    visited = []
+    for _ in page.iter_artifacts():
+        visited.append(sim.state.selected)
+    # 末行的空格子会重复停留在最后一个圣遗物上
+    assert visited[:num] == list(range(num))
+    assert set(visited[num:]) <= {num - 1}
+
+
+def test_iter_artifacts_with_render_latency():
+    num = 60
+    sim = SyntheticArtifactPage(random_artifacts(num), render_latency=0.2)
+    page = create_page(sim)
+
+    visited = []
+    for _ in page.iter_artifacts():
+        visited.append(sim.state.selected)
+    assert visited[:num] == list(range(num))
+
+
+def test_calibration_profile(tmp_path):
+    profile_fp = tmp_path / 'calibration.json'
+    sim = SyntheticArtifactPage(random_artifacts(60))
+    page = create_page(sim, profile_fp=profile_fp)
+    calibration_time = sim.clock.time()
+    assert profile_fp.exists()
+
+    sim = SyntheticArtifactPage(random_artifacts(60))
+    loaded = create_page(sim, profile_fp=profile_fp)
+    assert sim.scroll_count == 0
+    assert sim.clock.time() < calibration_time / 5
+    assert loaded.desc_loc == page.desc_loc
+    assert loaded.list_loc == page.list_loc
+    assert loaded.col_points == page.col_points
+    assert loaded.y_offset == page.y_offset
+    assert loaded.scroll_tracker.px_per_click == sim.list_scroll_px
+
+    # 布局变化后校验不通过，重新标定
+    sim = SyntheticArtifactPage(random_artifacts(60), list_padding=40)
+    create_page(sim, profile_fp=profile_fp)
+    assert sim.scroll_count > 0
+
+    # 分辨率不同的档案互不影响
+    sim = SyntheticArtifactPage(random_artifacts(60), screen_size=(1920, 1080))
+    create_page(sim, profile_fp=profile_fp)
+    assert sim.scroll_count > 0
+    with open(profile_fp, 'r', encoding='utf-8') as fin:
+        profiles = json.load(fin)
+    assert len(profiles) == 2
+
+    # 强制重新标定只覆盖当前分辨率的档案
+    sim = SyntheticArtifactPage(random_artifacts(60))
+    create_page(sim, profile_fp=profile_fp, recalibrate=True)
+    assert sim.scroll_count > 0
+    with open(profile_fp, 'r', encoding='utf-8') as fin:
+        recalibrated = json.load(fin)
+    assert recalibrated.keys() == profiles.keys()
+    for key, profile in profiles.items():
+        if key.startswith('1920x1080@'):
+            assert recalibrated[key] == profile
+        else:
+            assert recalibrated[key]['list_loc'] != profile['list_loc']
+
+
+def test_revisit_cell_and_before_scroll():
+    num = 60
+    sim = SyntheticArtifactPage(random_artifacts(num))
+    page = create_page(sim)
+    scrolled_at = []
+    page.before_scroll = lambda: scrolled_at.append(sim.state.selected)
+
+    cells = []
+    for cell in page.iter_artifacts(num):
+        cells.append((cell, sim.state.selected))
+        # 回到前一个格子再回来，模拟锁定状态的回头修正
+        if len(cells) > 1 and page.grid.row_fits(
+                page.grid.cell_center_at(cells[-2][0]).y):
+            assert page.select_cell(cells[-2][0])
+            assert sim.state.selected == cells[-2][1]
+            assert page.select_cell(cell)
+    assert [selected for _, selected in cells][:num] == list(range(num))
+    assert [cell.col_idx
+            for cell, _ in cells[:sim.cols]] == list(range(sim.cols))
+    assert scrolled_at
@@ -0,0 +1,62 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from genshin_mummy.tools.template_pyramid import PyramidMatcher
+
+MATERIALS_DIR = Path(__file__).parent.parent / 'genshin_mummy' / 'materials'
+KEY_TO_PATH = {
+    'exit_icon': MATERIALS_DIR / 'menu_page' / 'exit_icon.jpg',
+    'inventory_icon': MATERIALS_DIR / 'menu_page' / 'inventory_icon.jpg',
+}
+
+
+def create_screen(ui_scale: float, positions: dict):
+    screen = np.full((1080, 1920, 3), 30, dtype=np.uint8)
+    boxes = {}
+    for key, (left, top) in positions.items():
+        icon = cv2.cvtColor(cv2.imread(str(KEY_TO_PATH[key])),
+                            cv2.COLOR_BGR2RGB)
+        icon = cv2.resize(icon, None, fx=ui_scale, fy=ui_scale)
+        height, width = icon.shape[:2]
+        screen[top:top + height, left:left + width] = icon
+        boxes[key] = (left, top, width, height)
+    return screen, boxes
+
+
+def test_match_all_scales_in_one_pass():
+    matcher = PyramidMatcher(key_to_path=KEY_TO_PATH)
+    keys = list(KEY_TO_PATH)
+    positions = {'exit_icon': (1700, 60), 'inventory_icon': (400, 500)}
+    screen, boxes = create_screen(1.5, positions)
+
+    pyramid = matcher.pyramid(screen)
+    matches = matcher.match(pyramid, keys, (1920, 1080))
+    assert set(matches) == set(keys)
+    for key, (left, top, width, height) in boxes.items():
+        box = matches[key].box
+        assert abs(box.left - left) <= 4 and abs(box.top - top) <= 4
+        assert abs(box.width - width) <= 8 and abs(box.height - height) <= 8
+    assert pyramid.built_levels == len(matcher.ui_scales)
+    assert matcher.scale_cache[(1920, 1080)] == matches['exit_icon'].ui_scale
+
+    # 同一分辨率的后续帧只构建缓存的那一层
+    screen, _ = create_screen(1.5, positions)
+    pyramid = matcher.pyramid(screen)
+    assert set(matcher.match(pyramid, keys, (1920, 1080))) == set(keys)
+    assert pyramid.built_levels == 1
+
+    # 截图偏移会换算回屏幕坐标
+    left, top, width, height = boxes['exit_icon']
+    region = screen[top - 20:top + height + 20, left - 20:left + width + 20]
+    matches = matcher.locate(region, ['exit_icon'], (1920, 1080),
+                             offset=(left - 20, top - 20))
+    assert abs(matches['exit_icon'].box.left - left) <= 4
+
+
+def test_missing_template():
+    matcher = PyramidMatcher(key_to_path=KEY_TO_PATH)
+    screen, _ = create_screen(1.0, {'exit_icon': (100, 100)})
+    matches = matcher.locate(screen, list(KEY_TO_PATH), (1920, 1080))
+    assert set(matches) == {'exit_icon'}
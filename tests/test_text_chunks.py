@@ -0,0 +1,210 @@
+import random
+import re
+from difflib import SequenceMatcher
+
+from genshin_mummy.artifact_helper.type import SUBENTRY_PATTERN
+from genshin_mummy.ocr.interval import (
+    first_overlapping_predecessors,
+    first_overlapping_successors,
+)
+from genshin_mummy.ocr.text_index import compile_pattern, literal_prefix
+from genshin_mummy.ocr.type import TextChunk, TextChunkCollection
+
+
+def legacy_link(text_chunks):
+    """改写前两层循环的实现，作为对照。"""
+    top_sorted_chunks = sorted(text_chunks, key=lambda ck: ck.top)
+    for outer_idx, outer_ck in enumerate(top_sorted_chunks):
+        for inner_idx, inner_ck in enumerate(top_sorted_chunks):
+            if inner_idx <= outer_idx:
+                continue
+            overlap = outer_ck.horizontal_edge_overlap(inner_ck)
+            if overlap > 0:
+                outer_ck.bottom_text_chunk = inner_ck
+                inner_ck.top_text_chunk = outer_ck
+                break
+    for outer_idx, outer_ck in enumerate(top_sorted_chunks[::-1]):
+        if outer_ck.top_text_chunk:
+            continue
+        for inner_idx, inner_ck in enumerate(top_sorted_chunks[::-1]):
+            if inner_idx <= outer_idx:
+                continue
+            overlap = outer_ck.horizontal_edge_overlap(inner_ck)
+            if overlap > 0:
+                outer_ck.top_text_chunk = inner_ck
+                if inner_ck.bottom_text_chunk is None:
+                    inner_ck.bottom_text_chunk = outer_ck
+
+
+def random_layout(rng: random.Random, num: int, integer: bool):
+    boxes = []
+    for _ in range(num):
+        if integer:
+            # 取值范围小，制造大量相同的上边界与首尾相接的区间
+            left, top = rng.randint(0, 20), rng.randint(0, 10)
+            width, height = rng.randint(0, 8), rng.randint(1, 4)
+        else:
+            left, top = rng.uniform(0, 100), rng.uniform(0, 100)
+            width, height = rng.uniform(0, 30), rng.uniform(1, 10)
+        boxes.append((left, top, width, height))
+    return boxes
+
+
+def create_chunks(boxes, transpose: bool = False):
+    chunks = []
+    for idx, (left, top, width, height) in enumerate(boxes):
+        if transpose:
+            left, top, width, height = top, left, height, width
+        chunks.append(TextChunk(left, top, width, height, str(idx)))
+    return chunks
+
+
+def links(chunks, prev_attr, next_attr):
+    positions = {id(ck): idx for idx, ck in enumerate(chunks)}
+
+    def position(ck):
+        return None if ck is None else positions[id(ck)]
+
+    return [(position(getattr(ck, prev_attr)), position(getattr(ck,
+                                                                next_attr)))
+            for ck in chunks]
+
+
+def test_same_links_as_legacy():
+    rng = random.Random(0)
+    for trial in range(300):
+        boxes = random_layout(rng, rng.randint(0, 40), integer=trial % 2 == 0)
+        expected = create_chunks(boxes)
+        legacy_link(expected)
+        actual = create_chunks(boxes)
+        TextChunkCollection(actual)
+        assert links(actual, 'top_text_chunk',
+                     'bottom_text_chunk') == links(expected, 'top_text_chunk',
+                                                   'bottom_text_chunk')
+        assert links(actual, 'left_text_chunk',
+                     'right_text_chunk') == [(None, None)] * len(boxes)
+
+
+def test_horizontal_links_mirror_vertical():
+    rng = random.Random(1)
+    for trial in range(100):
+        boxes = random_layout(rng, rng.randint(0, 30), integer=trial % 2 == 0)
+        chunks = create_chunks(boxes)
+        TextChunkCollection(chunks, link_horizontally=True)
+        # 交换坐标轴后，左右关联应与上下关联一致
+        transposed = create_chunks(boxes, transpose=True)
+        TextChunkCollection(transposed)
+        assert links(chunks, 'left_text_chunk',
+                     'right_text_chunk') == links(transposed, 'top_text_chunk',
+                                                  'bottom_text_chunk')
+
+
+def test_row_layout():
+    chunks = [
+        TextChunk(0, 0, 40, 10, '攻击力'),
+        TextChunk(60, 0, 20, 10, '+19'),
+        TextChunk(0, 20, 40, 10, '防御力'),
+        TextChunk(60, 20, 20, 10, '+23'),
+    ]
+    TextChunkCollection(chunks, link_horizontally=True)
+    assert chunks[0].right_text_chunk is chunks[1]
+    assert chunks[1].left_text_chunk is chunks[0]
+    assert chunks[0].bottom_text_chunk is chunks[2]
+    assert chunks[3].top_text_chunk is chunks[1]
+    assert chunks[2].right_text_chunk is chunks[3]
+    assert chunks[1].right_text_chunk is None
+
+
+def test_interval_neighbors():
+    intervals = [(0, 10), (10, 20), (5, 15), (0, 0), (12, 30)]
+    # 首尾相接与长度为0的区间不算重叠
+    assert first_overlapping_successors(intervals) == [2, 2, 4, None, None]
+    assert first_overlapping_predecessors(intervals) == [
+        None, None, 0, None, 1
+    ]
+
+
+def legacy_find(collection, text, conf=None):
+    if text in collection.text_to_text_chunks:
+        return collection.text_to_text_chunks[text]
+    elif conf:
+        matched_chunks = []
+        for key, chunks in collection.text_to_text_chunks.items():
+            matcher = SequenceMatcher(a=text, b=key)
+            if matcher.ratio() > conf:
+                matched_chunks.extend(chunks)
+        matched_chunks.sort(key=lambda ck: ck.top)
+        return matched_chunks
+    return []
+
+
+def legacy_find_pattern(collection, pattern):
+    matched_chunks = []
+    for text, chunks in collection.text_to_text_chunks.items():
+        result = re.match(pattern, text)
+        if result and result.group():
+            matched_chunks.extend(chunks)
+    matched_chunks.sort(key=lambda ck: ck.top)
+    return matched_chunks
+
+
+def legacy_find_startswith(collection, prefix):
+    matched_chunks = []
+    for text, chunks in collection.text_to_text_chunks.items():
+        if text.startswith(prefix):
+            matched_chunks.extend(chunks)
+    matched_chunks.sort(key=lambda ck: ck.top)
+    return matched_chunks
+
+
+ALPHABET = '生之花羽死攻击力暴率·+.%★0123'
+PATTERNS = [
+    SUBENTRY_PATTERN,
+    '★+',
+    '\\+\\d+',
+    '生之.',
+    '攻?击',
+    '(攻|暴)击',
+    '.*%',
+    '',
+]
+
+
+def random_text(rng: random.Random):
+    return ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 6)))
+
+
+def test_indexed_find_same_as_legacy():
+    rng = random.Random(2)
+    for _ in range(100):
+        chunks = [
+            TextChunk(0, rng.randint(0, 20), 10, 10, random_text(rng))
+            for _ in range(rng.randint(0, 30))
+        ]
+        collection = TextChunkCollection(chunks)
+        # 每个查询重复两次，第二次来自缓存
+        for _ in range(2):
+            for _ in range(10):
+                text = random_text(rng)
+                conf = rng.choice([None, 0.0, 0.3, 0.5, 0.65, 0.9])
+                assert collection.find(text, conf) == legacy_find(
+                    collection, text, conf)
+                prefix = random_text(rng)[:2]
+                assert collection.find_startswith(
+                    prefix) == legacy_find_startswith(collection, prefix)
+            for pattern in PATTERNS:
+                assert collection.find_pattern(pattern) == legacy_find_pattern(
+                    collection, pattern)
+                assert collection.find_pattern(
+                    compile_pattern(pattern)) == legacy_find_pattern(
+                        collection, pattern)
+
+
+def test_literal_prefix():
+    assert literal_prefix(compile_pattern(SUBENTRY_PATTERN)) == '·'
+    assert literal_prefix(compile_pattern('\\+\\d+')) == '+'
+    assert literal_prefix(compile_pattern('ab*c')) == 'a'
+    assert literal_prefix(compile_pattern('ab+c')) == 'ab'
+    assert literal_prefix(compile_pattern('a|b')) == ''
+    assert literal_prefix(compile_pattern('^abc')) == ''
+    assert literal_prefix(re.compile('abc', re.IGNORECASE)) == ''
@@ -0,0 +1,38 @@
+import numpy as np
+
+from genshin_mummy.tools.tile_hash import TileHasher
+
+
+def test_changed_tiles():
+    rng = np.random.default_rng(0)
+    # 宽高都不是块大小的整数倍，最右侧和最下方是不完整的块
+    image = rng.integers(0, 256, (100, 150, 3), dtype=np.uint8)
+    hasher = TileHasher()
+    reference = hasher.hash(image)
+    assert reference.shape == (4, 5)
+    assert not hasher.any_changed(reference, image.copy())
+
+    changed = image.copy()
+    changed[0, 0, 0] ^= 1
+    changed[99, 149, 2] ^= 0x80
+    changed[40, 70, 1] ^= 0x10
+    assert hasher.any_changed(reference, changed)
+    assert hasher.changed_tiles(reference, changed) == {
+        (0, 0),
+        (3, 4),
+        (1, 2),
+    }
+    assert hasher.changed_ratio(reference, changed) == 3 / 20
+
+
+def test_cropped_and_gray_images():
+    rng = np.random.default_rng(1)
+    screen = rng.integers(0, 256, (200, 300, 3), dtype=np.uint8)
+    hasher = TileHasher()
+    crop = screen[10:110, 7:157]
+    gray = screen[..., 1]
+    crop_reference = hasher.hash(crop)
+    gray_reference = hasher.hash(gray)
+    screen[50, 50] ^= 0xff
+    assert hasher.changed_tiles(crop_reference, crop) == {(1, 1)}
+    assert hasher.changed_tiles(gray_reference, gray) == {(1, 1)}